@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台计算线程
+把耗时的几何与报告计算移出界面主循环, 结果通过队列交回主线程
+"""
+
+import queue
+import threading
+
+
+class LatestRequestWorker:
+    """
+    只处理最新请求的后台计算线程
+
+    - 主线程调用 submit() 提交参数, 尚未开始计算的旧请求会被新请求替换
+    - 计算结果放入队列, 主线程(例如通过 root.after 定时)调用 poll() 取回
+    - 参数已经改变的过期结果在 poll() 中被丢弃
+    """
+
+    def __init__(self, compute, name="projection-worker"):
+        """
+        Args:
+            compute: 计算函数, 接收参数对象并返回结果; 在后台线程中调用, 不能访问界面组件
+            name: 线程名称
+        """
+        self.compute = compute
+        self.results = queue.Queue()
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def latest_generation(self):
+        """最近一次提交的请求编号"""
+        return self._generation
+
+    def submit(self, params):
+        """
+        提交计算请求
+
+        Returns:
+            请求编号
+        """
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, params)
+            self._condition.notify()
+            return self._generation
+
+    def poll(self):
+        """
+        取回最新请求的计算结果(非阻塞)
+
+        Returns:
+            (generation, result, error), 没有可用的最新结果时返回None
+        """
+        latest = None
+        while True:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self._generation:
+                latest = item
+        return latest
+
+    def stop(self):
+        """停止后台线程"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                generation, params = self._pending
+                self._pending = None
+
+            # 开始计算前参数已经改变时直接跳过
+            if generation != self._generation:
+                continue
+            try:
+                self.results.put((generation, self.compute(params), None))
+            except Exception as error:
+                self.results.put((generation, None, error))
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长方体投影度量的解析计算
+斜投影公式 x' = x - kx * z, y' = y - ky * z
+
+对于坐标轴对齐的长方体, 各面投影面积、棱边投影长度和投影尺寸
+都有关于 (L, W, H, kx, ky) 的闭式表达, 无需构造投影多边形。
+所有函数都支持数组广播, 大网格参数扫描只是纯算术运算。
+"""
+
+import numpy as np
+
+from precision import as_float_array, resolve_dtype
+from silhouette import CUBOID_FACES, project_oblique, shadow_area, signed_polygon_area
+
+FACE_NAMES = ["底面", "顶面", "前面", "后面", "左面", "右面"]
+EDGE_NAMES = ["AB", "BC", "CD", "DA"]
+DIMENSION_KEYS = ["base_length", "base_width", "top_length", "top_width", "height_projection"]
+
+
+def analytic_cuboid_metrics(length, width, height, kx, ky, dtype=None):
+    """
+    解析计算长方体的全部投影度量
+
+    Args:
+        length, width, height: 长方体尺寸, 标量或可广播的数组
+        kx, ky: 投影系数, 标量或可广播的数组
+        dtype: 计算精度, 默认使用全局默认精度
+
+    Returns:
+        字典: 与 calculate_dimensions 相同的尺寸键,
+        'face_areas' (各面投影面积), 'edge_lengths' (底面四条边长), 'shadow_area' (整体轮廓面积)
+    """
+    dtype = resolve_dtype(dtype)
+    L, W, H, kx, ky = np.broadcast_arrays(*(np.asarray(v, dtype=dtype)
+                                            for v in (length, width, height, kx, ky)))
+    # 底面和顶面平行于投影面, 投影后保持原尺寸
+    base_area = L * W
+    # 前后面沿y方向被剪切 ky*H, 左右面沿x方向被剪切 kx*H
+    front_area = L * H * np.abs(ky)
+    side_area = W * H * np.abs(kx)
+
+    return {
+        'base_length': L,
+        'base_width': W,
+        'top_length': L,
+        'top_width': W,
+        'height_projection': H * np.hypot(kx, ky),
+        'face_areas': {
+            "底面": base_area,
+            "顶面": base_area,
+            "前面": front_area,
+            "后面": front_area,
+            "左面": side_area,
+            "右面": side_area,
+        },
+        'edge_lengths': {"AB": L, "BC": W, "CD": L, "DA": W},
+        'shadow_area': base_area + front_area + side_area,
+    }
+
+
+def numeric_cuboid_metrics(vertices, kx, ky):
+    """
+    由投影后的顶点数值计算全部投影度量(适用于任意按 get_3d_vertices 顺序排列的六面体)
+
+    Args:
+        vertices: 三维顶点, 形状 (..., 8, 3)
+        kx, ky: 投影系数
+
+    Returns:
+        与 analytic_cuboid_metrics 结构相同的字典
+    """
+    projected = project_oblique(vertices, kx, ky)
+
+    def distance(i, j):
+        return np.linalg.norm(projected[..., j, :] - projected[..., i, :], axis=-1)
+
+    areas = np.abs(signed_polygon_area(projected[..., CUBOID_FACES, :]))
+    return {
+        'base_length': distance(0, 1),
+        'base_width': distance(0, 3),
+        'top_length': distance(4, 5),
+        'top_width': distance(4, 7),
+        'height_projection': distance(0, 4),
+        'face_areas': {name: areas[..., i] for i, name in enumerate(FACE_NAMES)},
+        'edge_lengths': {
+            "AB": distance(0, 1),
+            "BC": distance(1, 2),
+            "CD": distance(2, 3),
+            "DA": distance(3, 0),
+        },
+        'shadow_area': shadow_area(vertices, CUBOID_FACES, kx, ky),
+    }
+
+
+def box_extents(vertices):
+    """返回顶点的 (长, 宽, 高), 即各坐标的最大值减最小值"""
+    vertices = as_float_array(vertices)
+    extents = vertices.max(axis=-2) - vertices.min(axis=-2)
+    return extents[..., 0], extents[..., 1], extents[..., 2]
+
+
+def is_axis_aligned_box(vertices, tol=1e-9):
+    """
+    判断顶点是否为按 get_3d_vertices 顺序排列的坐标轴对齐长方体
+
+    Args:
+        vertices: 三维顶点, 形状 (..., 8, 3)
+
+    Returns:
+        布尔值(批量输入时为布尔数组)
+    """
+    vertices = as_float_array(vertices)
+    if vertices.shape[-2:] != (8, 3):
+        return False
+    lo = vertices.min(axis=-2)
+    hi = vertices.max(axis=-2)
+    # 每个顶点的 (x, y, z) 取最小值(0)或最大值(1)的模式
+    pattern = np.array([
+        [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+        [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+    ], dtype=bool)
+    expected = np.where(pattern, hi[..., None, :], lo[..., None, :])
+    scale = np.maximum(1.0, np.abs(vertices).max(axis=(-2, -1)))
+    return np.all(np.abs(vertices - expected) <= tol * scale[..., None, None], axis=(-2, -1))
+
+
+def _compare(analytic, numeric, rtol, atol, path=""):
+    """逐项比较两条计算路径的结果, 返回不一致的键"""
+    mismatches = []
+    for key, value in analytic.items():
+        if isinstance(value, dict):
+            mismatches += _compare(value, numeric[key], rtol, atol, f"{path}{key}.")
+        elif not np.allclose(value, numeric[key], rtol=rtol, atol=atol):
+            mismatches.append(path + key)
+    return mismatches
+
+
+def cuboid_metrics(vertices, kx, ky, validate=False, rtol=None, atol=None):
+    """
+    计算长方体投影度量, 自动选择计算路径
+
+    坐标轴对齐的长方体使用解析公式, 其他六面体使用数值计算。
+
+    Args:
+        vertices: 三维顶点, 形状 (..., 8, 3)
+        kx, ky: 投影系数
+        validate: 为True时同时运行数值路径并交叉校验
+        rtol, atol: 校验容差, 默认按顶点精度取 sqrt(eps)
+
+    Returns:
+        与 analytic_cuboid_metrics 结构相同的字典
+
+    Raises:
+        ValueError: 校验模式下两条路径结果不一致
+    """
+    vertices = as_float_array(vertices)
+    if not np.all(is_axis_aligned_box(vertices)):
+        return numeric_cuboid_metrics(vertices, kx, ky)
+
+    length, width, height = box_extents(vertices)
+    expand = (Ellipsis,) + (np.newaxis,) * np.ndim(length)
+    kx_b = np.asarray(kx, dtype=vertices.dtype)[expand]
+    ky_b = np.asarray(ky, dtype=vertices.dtype)[expand]
+    metrics = analytic_cuboid_metrics(length, width, height, kx_b, ky_b, vertices.dtype)
+
+    if validate:
+        tolerance = float(np.sqrt(np.finfo(vertices.dtype).eps))
+        rtol = tolerance if rtol is None else rtol
+        atol = tolerance * max(1.0, float(np.abs(vertices).max())) if atol is None else atol
+        numeric = numeric_cuboid_metrics(vertices, kx, ky)
+        mismatches = _compare(metrics, numeric, rtol, atol)
+        if mismatches:
+            raise ValueError(f"解析结果与数值结果不一致: {', '.join(mismatches)}")
+    return metrics
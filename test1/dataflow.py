@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+显式依赖图的增量计算
+
+图由两类节点组成:
+- 参数: 由外部设置的输入值(如 cube_size、angle、elev)
+- 阶段: 由若干参数或其他阶段计算得到的输出(如顶点、投影点、报告文本、图元)
+
+设置参数时, 只有值真正改变才把依赖它的阶段(及其下游)标记为过期; 读取阶段时只重新计算
+过期的部分。阶段可以提供 dispose 回调, 在重新计算前释放旧的输出(如从坐标轴中移除旧图元)。
+
+同一个图只能在一个线程中使用。
+"""
+
+import numpy as np
+
+
+def _same(a, b):
+    """判断参数值是否未改变: 数组按对象比较, 其他值按相等比较"""
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return False
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class Dataflow:
+    """参数 → 阶段 的依赖图, 按需重新计算过期的阶段"""
+
+    def __init__(self):
+        self.params = {}
+        self._stages = {}  # 名称 -> (函数, 依赖, dispose)
+        self._values = {}
+        self._dependents = {}  # 名称 -> 直接依赖它的阶段
+        self._dirty = set()
+        self.compute_counts = {}  # 各阶段的计算次数, 用于检查和调试
+
+    def add_param(self, name, value=None):
+        """添加参数"""
+        if name in self._dependents:
+            raise ValueError(f"名称 {name} 已经定义")
+        self.params[name] = value
+        self._dependents.setdefault(name, [])
+        return self
+
+    def add_stage(self, name, func, deps=(), dispose=None):
+        """
+        添加阶段
+
+        Args:
+            name: 阶段名称
+            func: 计算函数, 按 deps 的顺序接收各依赖的值
+            deps: 依赖的参数或阶段名称(必须已经添加)
+            dispose: 可选, 重新计算或清除之前以旧输出为参数调用
+        """
+        if name in self._dependents:
+            raise ValueError(f"名称 {name} 已经定义")
+        for dep in deps:
+            if dep not in self._dependents:
+                raise KeyError(f"阶段 {name} 的依赖 {dep} 尚未定义")
+        self._stages[name] = (func, tuple(deps), dispose)
+        self._dependents.setdefault(name, [])
+        for dep in deps:
+            self._dependents[dep].append(name)
+        self.compute_counts[name] = 0
+        self._dirty.add(name)
+        return self
+
+    def _mark_dirty(self, name):
+        for stage in self._dependents[name]:
+            if stage not in self._dirty:
+                self._dirty.add(stage)
+                self._mark_dirty(stage)
+
+    def set(self, name, value):
+        """
+        设置参数
+
+        Returns:
+            值是否改变
+        """
+        if name not in self.params:
+            raise KeyError(f"未定义的参数: {name}")
+        if _same(self.params[name], value):
+            return False
+        self.params[name] = value
+        self._mark_dirty(name)
+        return True
+
+    def update(self, **params):
+        """
+        批量设置参数
+
+        Returns:
+            值改变了的参数名称集合
+        """
+        return {name for name, value in params.items() if self.set(name, value)}
+
+    def invalidate(self, name):
+        """强制把阶段(及其下游)标记为过期"""
+        self._dirty.add(name)
+        self._mark_dirty(name)
+
+    def is_dirty(self, name):
+        return name in self._dirty
+
+    def dirty_stages(self):
+        """当前过期的阶段"""
+        return set(self._dirty)
+
+    def _release(self, name):
+        """
+        丢弃阶段及其下游的旧输出(下游先释放)
+
+        下游的输出可能依附于本阶段的输出(如图元依附于坐标轴), 所以在本阶段重新计算之前释放。
+        只在阶段过期时调用, 此时下游也都已过期。
+        """
+        for stage in self._dependents[name]:
+            self._release(stage)
+        if name in self._values:
+            value = self._values.pop(name)
+            dispose = self._stages[name][2]
+            if dispose is not None:
+                dispose(value)
+
+    def get(self, name):
+        """
+        读取参数或阶段的值, 过期的阶段(包括其上游)先重新计算
+        """
+        if name in self.params:
+            return self.params[name]
+        if name not in self._dirty:
+            return self._values[name]
+        func, deps, _ = self._stages[name]
+        args = [self.get(dep) for dep in deps]
+        self._release(name)
+        value = func(*args)
+        self._values[name] = value
+        self._dirty.discard(name)
+        self.compute_counts[name] += 1
+        return value
+
+    def pull(self, *names):
+        """
+        读取若干阶段
+
+        Returns:
+            (值的列表, 本次重新计算了的阶段集合)
+        """
+        dirty = set(self._dirty)
+        values = [self.get(name) for name in names]
+        return values, dirty - self._dirty
+
+    def clear(self, name=None):
+        """丢弃阶段的缓存值(默认全部), 有 dispose 的阶段先释放旧输出"""
+        names = list(self._stages) if name is None else [name]
+        for stage in names:
+            self.invalidate(stage)
+            self._release(stage)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投影误差的蒙特卡洛分析
+基于斜投影公式 x' = x - kx * z, y' = y - ky * z
+
+每次试验对长方体尺寸、投影系数和测量坐标加入随机扰动, 与名义值比较:
+- 投影误差: 观测顶点与名义投影顶点的平均距离(即 calculate_projection_error)
+- 长度误差: 底面边长 AB、BC 和高度投影长度
+- 面积误差: 投影轮廓(影子)面积
+- 变形系数误差: 理论变形系数 1/cos(θ) = √(1 + kx² + ky²), 与测量数据报告中的定义一致
+
+全部试验按块组成数组一次计算; 试验次数较多时各块分配到多个进程并行运行。
+每块使用由主种子派生的独立随机数流, 结果与进程数无关, 可以复现。
+打包成可执行文件时, 入口脚本要在 __main__ 中先调用 multiprocessing.freeze_support(),
+否则子进程会重新启动整个程序。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cuboid_metrics import analytic_cuboid_metrics
+from profiling import profiled
+from projection_core import SIGN_SUBTRACT, project
+from silhouette import CUBOID_FACES, signed_polygon_area
+
+# 长方体顶点相对于 (长, 宽, 高) 的比例(与 get_3d_vertices 的顶点顺序一致)
+UNIT_CUBOID = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+
+METRIC_NAMES = {
+    'projection_error': "投影误差(顶点平均偏差)",
+    'base_length': "底面长度 AB",
+    'base_width': "底面宽度 BC",
+    'height_projection': "高度投影长度",
+    'shadow_area': "轮廓面积",
+    'ratio': "理论变形系数",
+}
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def calculate_projection_error(vertices_3d, vertices_2d, kx, ky):
+    """
+    计算投影误差: 观测的二维顶点与按公式计算的投影点之间的平均距离
+
+    Args:
+        vertices_3d: 原始三维顶点, 形状 (..., N, 3)
+        vertices_2d: 观测到的二维顶点, 形状 (..., N, 2)
+        kx, ky: 投影系数, 标量或与批量维度可广播的数组
+
+    Returns:
+        平均误差, 形状 (...)
+    """
+    kx = np.asarray(kx, dtype=np.float64)[..., np.newaxis]
+    ky = np.asarray(ky, dtype=np.float64)[..., np.newaxis]
+    expected = project(vertices_3d, kx, ky, SIGN_SUBTRACT, width=2, dtype=np.float64, batched=True)
+    delta = np.asarray(vertices_2d, dtype=np.float64) - expected
+    return np.mean(np.hypot(delta[..., 0], delta[..., 1]), axis=-1)
+
+
+def simulate_chunk(nominal, noise, trials, seed):
+    """
+    运行一块试验(纯数组运算, 可在子进程中调用)
+
+    Args:
+        nominal: 名义参数 (length, width, height, kx, ky)
+        noise: 噪声标准差字典: 'dimension' (相对值), 'coefficient' (绝对值), 'coordinate' (绝对值)
+        trials: 本块的试验次数
+        seed: 随机种子(整数或 SeedSequence)
+
+    Returns:
+        字典: 指标名 → 误差样本 (trials,), 误差 = 扰动值 - 名义值
+    """
+    rng = np.random.default_rng(seed)
+    length, width, height, kx, ky = nominal
+
+    dims = np.array([length, width, height], dtype=np.float64)
+    dims = dims * (1 + noise['dimension'] * rng.standard_normal((trials, 3)))
+    k = np.array([kx, ky], dtype=np.float64) + noise['coefficient'] * rng.standard_normal((trials, 2))
+
+    # 扰动后的长方体投影, 再加入测量坐标噪声
+    vertices = UNIT_CUBOID * dims[:, np.newaxis, :]
+    observed = project(vertices, k[:, 0, np.newaxis], k[:, 1, np.newaxis], SIGN_SUBTRACT, width=2, batched=True)
+    if noise['coordinate']:
+        observed += noise['coordinate'] * rng.standard_normal(observed.shape)
+
+    def distance(i, j):
+        return np.hypot(observed[:, j, 0] - observed[:, i, 0], observed[:, j, 1] - observed[:, i, 1])
+
+    reference = analytic_cuboid_metrics(length, width, height, kx, ky, np.float64)
+    nominal_vertices = UNIT_CUBOID * np.array([length, width, height])
+    areas = np.abs(signed_polygon_area(observed[:, CUBOID_FACES, :]))
+
+    return {
+        'projection_error': calculate_projection_error(nominal_vertices, observed, kx, ky),
+        'base_length': distance(0, 1) - reference['base_length'],
+        'base_width': distance(1, 2) - reference['base_width'],
+        'height_projection': distance(0, 4) - reference['height_projection'],
+        'shadow_area': 0.5 * areas.sum(axis=1) - reference['shadow_area'],
+        'ratio': np.sqrt(1 + np.sum(k ** 2, axis=1)) - np.sqrt(1 + kx ** 2 + ky ** 2),
+    }
+
+
+def summarize(samples, percentiles=(5, 50, 95)):
+    """
+    统计误差分布
+
+    Returns:
+        字典: 指标名 → {'mean', 'std', 'rms', 'max_abs', 'p5', 'p50', 'p95', ...}
+    """
+    summary = {}
+    for name, values in samples.items():
+        stats = {
+            'mean': float(np.mean(values)),
+            'std': float(np.std(values)),
+            'rms': float(np.sqrt(np.mean(np.square(values)))),
+            'max_abs': float(np.max(np.abs(values))),
+        }
+        for p, value in zip(percentiles, np.percentile(values, percentiles)):
+            stats[f'p{p:g}'] = float(value)
+        summary[name] = stats
+    return summary
+
+
+@profiled
+def monte_carlo_projection_error(length=10, width=6, height=4, kx=0.5, ky=0.5, trials=100000,
+                                 dimension_noise=0.01, coefficient_noise=0.01, coordinate_noise=0.0,
+                                 seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    蒙特卡洛投影误差分析
+
+    Args:
+        length, width, height: 长方体名义尺寸
+        kx, ky: 名义投影系数
+        trials: 试验次数
+        dimension_noise: 尺寸的相对噪声标准差(0.01 即 1%)
+        coefficient_noise: 投影系数的绝对噪声标准差
+        coordinate_noise: 测量坐标的绝对噪声标准差
+        seed: 随机种子, 相同种子在任意进程数下结果相同
+        chunk_size: 每块的试验次数
+        workers: 进程数; None时只有一块则在本进程运行, 否则使用CPU核数; 1 表示不使用子进程
+
+    Returns:
+        字典: 'samples' (指标名 → 误差样本), 'summary' (summarize 的结果), 'trials'
+
+    Raises:
+        ValueError: 试验次数或每块的试验次数小于1
+    """
+    if trials < 1:
+        raise ValueError(f"试验次数至少为1, 实际为 {trials}")
+    if chunk_size < 1:
+        raise ValueError(f"每块的试验次数至少为1, 实际为 {chunk_size}")
+    nominal = (float(length), float(width), float(height), float(kx), float(ky))
+    noise = {
+        'dimension': float(dimension_noise),
+        'coefficient': float(coefficient_noise),
+        'coordinate': float(coordinate_noise),
+    }
+    sizes = [min(chunk_size, trials - start) for start in range(0, trials, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers is None:
+        workers = 1 if len(sizes) <= 1 else min(len(sizes), os.cpu_count() or 1)
+    if workers <= 1:
+        chunks = [simulate_chunk(nominal, noise, n, s) for n, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(simulate_chunk, [nominal] * len(sizes), [noise] * len(sizes), sizes, seeds))
+
+    samples = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in METRIC_NAMES}
+    return {'samples': samples, 'summary': summarize(samples), 'trials': trials}
+
+
+def format_error_report(summary):
+    """把统计结果格式化为文本报告"""
+    lines = ["=" * 35, "蒙特卡洛误差分析", "=" * 35]
+    for name, label in METRIC_NAMES.items():
+        stats = summary[name]
+        lines.append(f"{label}:")
+        lines.append(f"  均值 {stats['mean']:+.4f}, 标准差 {stats['std']:.4f}, 最大 {stats['max_abs']:.4f}")
+        lines.append(f"  5%~95%: [{stats['p5']:+.4f}, {stats['p95']:+.4f}]")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一般平行投影: 沿任意方向投影到任意平面
+
+投影公式(投影方向 d, 平面法向量 n, 平面上一点 p0):
+    P' = P - d · (n·(P - p0)) / (n·d)
+
+写成齐次矩阵即数学原理文档中的 build_oblique_projection_matrix。
+投影平面为 z=常数 时退化为 x' = x - kx·(z - c), y' = y - ky·(z - c),
+其中 kx = dx/dz, ky = dy/dz, 与 CuboidObliqueProjector 的快速公式一致。
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from precision import as_point_array, output_array
+from projection_core import SIGN_SUBTRACT, project
+
+# 每次矩阵运算处理的点数, 限制大规模点集的临时内存
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+
+def normalize(v):
+    """向量归一化"""
+    v = np.asarray(v, dtype=np.float64)
+    norm = np.linalg.norm(v)
+    return v / norm if norm != 0 else v
+
+
+def plane_basis(proj_plane_normal):
+    """
+    投影平面内的一组正交基 (u, v)
+
+    法向量为z轴方向时返回x轴和y轴, 使平面内坐标与 x'、y' 一致。
+    """
+    n = normalize(proj_plane_normal)
+    if abs(n[0]) < 1e-12 and abs(n[1]) < 1e-12:
+        return np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]) * np.sign(n[2])
+    helper = np.array([0.0, 0.0, 1.0]) if abs(n[2]) < 0.9 else np.array([1.0, 0.0, 0.0])
+    u = normalize(np.cross(helper, n))
+    v = np.cross(n, u)
+    return u, v
+
+
+class ParallelProjection:
+    """
+    沿固定方向投影到固定平面的平行投影
+
+    构造时预先计算投影矩阵, 之后可对任意规模的点集重复调用。
+    通常通过 get_projection() 获取, 相同参数的实例会被缓存复用。
+    """
+
+    def __init__(self, proj_dir, proj_plane_normal=(0, 0, 1), plane_point=(0, 0, 0)):
+        """
+        Args:
+            proj_dir: 投影方向向量
+            proj_plane_normal: 投影平面法向量
+            plane_point: 投影平面上的一点
+
+        Raises:
+            ValueError: 投影方向与投影平面平行
+        """
+        d = np.asarray(proj_dir, dtype=np.float64)
+        n = normalize(proj_plane_normal)
+        p0 = np.asarray(plane_point, dtype=np.float64)
+
+        dot_product = float(np.dot(d, n))
+        if abs(dot_product) < 1e-6 * max(np.linalg.norm(d), 1e-300):
+            raise ValueError("投影方向不能与投影平面平行")
+
+        self.proj_dir = d
+        self.normal = n
+        self.plane_point = p0
+
+        # P' = A·P + b
+        self.linear = np.eye(3) - np.outer(d, n) / dot_product
+        self.offset = d * float(np.dot(n, p0)) / dot_product
+
+        # 平面内二维坐标: (P' - p0)·u, (P' - p0)·v = C·P + c
+        u, v = plane_basis(n)
+        basis = np.stack([u, v])
+        self.basis = basis
+        self.linear_2d = basis @ self.linear
+        self.offset_2d = -self.linear_2d @ p0
+
+        # 投影平面为 z=常数 时使用快速公式
+        self.is_z_plane = abs(n[0]) < 1e-12 and abs(n[1]) < 1e-12 and n[2] > 0
+        self.kx = d[0] / d[2] if self.is_z_plane else None
+        self.ky = d[1] / d[2] if self.is_z_plane else None
+        self.plane_z = float(p0[2])
+
+    def matrix(self):
+        """齐次坐标投影矩阵 (4, 4)"""
+        proj_matrix = np.eye(4)
+        proj_matrix[:3, :3] = self.linear
+        proj_matrix[:3, 3] = self.offset
+        return proj_matrix
+
+    def project(self, points, out=None, coords='3d', dtype=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        投影点集
+
+        Args:
+            points: 点数据 (N, 3), 可以是实现缓冲区协议的对象
+            out: 可选的输出数组, coords='3d' 时为 (N, 3), '2d' 时为 (N, 2)
+            coords: '3d' 返回投影平面上的三维点, '2d' 返回平面内的二维坐标
+            dtype: 计算精度, 默认沿用输入的浮点类型
+            chunk_size: 每批处理的点数
+
+        Returns:
+            投影结果数组
+        """
+        points = as_point_array(points, dtype)
+        dtype = points.dtype
+        width = 3 if coords == '3d' else 2
+        result = output_array(out, (len(points), width), dtype)
+        if np.may_share_memory(points, result):
+            points = points.copy()
+
+        if self.is_z_plane:
+            self._project_z_plane(points, result, dtype)
+            return result
+
+        if coords == '3d':
+            linear, offset = self.linear, self.offset
+        else:
+            linear, offset = self.linear_2d, self.offset_2d
+        linear_t = linear.T.astype(dtype)
+        offset = offset.astype(dtype)
+        for start in range(0, len(points), chunk_size):
+            stop = start + chunk_size
+            np.matmul(points[start:stop], linear_t, out=result[start:stop])
+            result[start:stop] += offset
+        return result
+
+    def _project_z_plane(self, points, result, dtype):
+        """z=常数 平面的快速公式: x' = x - kx·(z - c), y' = y - ky·(z - c)"""
+        if self.plane_z != 0:
+            points = points - np.array([0, 0, self.plane_z], dtype=dtype)
+        project(points, self.kx, self.ky, SIGN_SUBTRACT, out=result, width=result.shape[1], dtype=dtype)
+        if result.shape[1] == 3:
+            result[:, 2] = self.plane_z
+        else:
+            # 平面内坐标以 plane_point 为原点
+            if self.plane_point[0] != 0:
+                result[:, 0] -= dtype.type(self.plane_point[0])
+            if self.plane_point[1] != 0:
+                result[:, 1] -= dtype.type(self.plane_point[1])
+
+
+def _key(vector):
+    """把向量转换为可哈希的缓存键"""
+    return tuple(float(x) for x in np.asarray(vector, dtype=np.float64).ravel())
+
+
+@lru_cache(maxsize=256)
+def _cached_projection(proj_dir, proj_plane_normal, plane_point):
+    return ParallelProjection(proj_dir, proj_plane_normal, plane_point)
+
+
+def get_projection(proj_dir, proj_plane_normal=(0, 0, 1), plane_point=(0, 0, 0)):
+    """获取(缓存的)平行投影实例"""
+    return _cached_projection(_key(proj_dir), _key(proj_plane_normal), _key(plane_point))
+
+
+def build_oblique_projection_matrix(proj_dir, proj_plane_normal=(0, 0, 1), plane_point=(0, 0, 0)):
+    """
+    构建斜投影矩阵
+
+    Args:
+        proj_dir: 投影方向向量
+        proj_plane_normal: 投影平面法向量
+        plane_point: 投影平面上的一点
+
+    Returns:
+        齐次坐标投影矩阵 (4, 4)
+    """
+    return get_projection(proj_dir, proj_plane_normal, plane_point).matrix()
+
+
+def project_points(points, proj_dir, proj_plane_normal=(0, 0, 1), plane_point=(0, 0, 0),
+                   out=None, coords='3d', dtype=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    沿任意方向把点集投影到任意平面
+
+    Args:
+        points: 点数据 (N, 3)
+        proj_dir: 投影方向向量
+        proj_plane_normal: 投影平面法向量
+        plane_point: 投影平面上的一点
+        out, coords, dtype, chunk_size: 见 ParallelProjection.project
+
+    Returns:
+        投影结果数组
+    """
+    projection = get_projection(proj_dir, proj_plane_normal, plane_point)
+    return projection.project(points, out=out, coords=coords, dtype=dtype, chunk_size=chunk_size)
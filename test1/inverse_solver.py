@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+斜投影的反求: 由观测到的二维顶点坐标拟合投影参数
+基于斜投影公式 x' = x - kx * z, y' = y - ky * z
+
+对每份图形(一组观测顶点), 位移 d = P' - P 关于 z 是线性的:
+    dx = -kx·z (+ tx),  dy = -ky·z (+ ty)
+因此 kx、ky 各自是一个一元线性回归, 有闭式最小二乘解, 成千上万份图形可以一次批量求解。
+
+残差平方和关于 (kx, ky) 是各向同性的二次函数:
+    SSE(k) = SSE_min + Szz·|k - k̂|²
+所以把结果映射到预设方向 c (k = tan(θ)·c) 时, 最优的 tan(θ) 就是 k̂ 在 c 上的投影。
+"""
+
+import numpy as np
+
+from precision import as_float_array
+from profiling import profiled
+
+
+def _broadcast_inputs(vertices_3d, vertices_2d):
+    """统一为批量形状 (B, N, 3) 与 (B, N, 2)"""
+    vertices_3d = as_float_array(vertices_3d)
+    vertices_2d = as_float_array(vertices_2d, vertices_3d.dtype)
+    single = vertices_2d.ndim == 2 and vertices_3d.ndim == 2
+    batch = np.broadcast_shapes(vertices_3d.shape[:-2], vertices_2d.shape[:-2])
+    n = vertices_3d.shape[-2]
+    if vertices_2d.shape[-2] != n or vertices_3d.shape[-1] != 3 or vertices_2d.shape[-1] != 2:
+        raise ValueError(f"顶点形状不匹配: {vertices_3d.shape} 与 {vertices_2d.shape}")
+    vertices_3d = np.broadcast_to(vertices_3d, batch + (n, 3)).reshape(-1, n, 3)
+    vertices_2d = np.broadcast_to(vertices_2d, batch + (n, 2)).reshape(-1, n, 2)
+    return vertices_3d, vertices_2d, single
+
+
+def fit_projection_params(vertices_3d, vertices_2d, fit_offset=False):
+    """
+    批量最小二乘拟合投影系数 (kx, ky)
+
+    Args:
+        vertices_3d: 已知的三维顶点, 形状 (N, 3) 或 (B, N, 3)
+        vertices_2d: 观测到的二维顶点, 形状 (N, 2) 或 (B, N, 2)
+        fit_offset: 是否同时拟合整体平移 (tx, ty)(学生图形的原点不在 V0 时使用)
+
+    Returns:
+        字典(单份输入时各项为标量或单个数组):
+        'kx', 'ky': 投影系数, z 没有变化(无法确定系数)时为NaN
+        'offset': 平移 (B, 2)
+        'residuals': 每个顶点的残差 (B, N, 2)
+        'rms': 残差均方根 (B,)
+        'szz': z 的(中心化)平方和, 用于映射到预设方向
+        'sse': 残差平方和 (B,)
+    """
+    vertices_3d, vertices_2d, single = _broadcast_inputs(vertices_3d, vertices_2d)
+    z = vertices_3d[..., 2]
+    d = vertices_2d - vertices_3d[..., :2]
+
+    if fit_offset:
+        z_mean = z.mean(axis=1, keepdims=True)
+        d_mean = d.mean(axis=1, keepdims=True)
+        zc = z - z_mean
+        dc = d - d_mean
+    else:
+        zc, dc = z, d
+
+    szz = np.einsum('bn,bn->b', zc, zc)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        k = -np.einsum('bn,bnc->bc', zc, dc) / szz[:, np.newaxis]
+    k[szz <= np.finfo(z.dtype).tiny] = np.nan
+
+    if fit_offset:
+        offset = (d_mean + k[:, np.newaxis, :] * z_mean[..., np.newaxis])[:, 0, :]
+    else:
+        offset = np.zeros_like(k)
+
+    residuals = d + k[:, np.newaxis, :] * z[..., np.newaxis] - offset[:, np.newaxis, :]
+    sse = np.einsum('bnc,bnc->b', residuals, residuals)
+    result = {
+        'kx': k[:, 0],
+        'ky': k[:, 1],
+        'offset': offset,
+        'residuals': residuals,
+        'rms': np.sqrt(sse / residuals[0].size) if len(residuals) else sse,
+        'szz': szz,
+        'sse': sse,
+    }
+    if single:
+        result = {key: value[0] for key, value in result.items()}
+        result['kx'] = float(result['kx'])
+        result['ky'] = float(result['ky'])
+    return result
+
+
+def match_presets(kx, ky, szz=None, sse=None, n_values=None, presets=None):
+    """
+    把拟合得到的 (kx, ky) 映射到最接近的预设方向
+
+    对每个预设方向 c, 最优 tan(θ) = (k·c)/(c·c); 残差平方和增加 Szz·|k - tan(θ)·c|²。
+
+    Args:
+        kx, ky: 拟合的投影系数, 标量或 (B,)
+        szz, sse: fit_projection_params 返回的 z 平方和与残差平方和; 给出时返回按预设参数重算的残差
+        n_values: 每份图形的坐标个数(2N), 用于把残差平方和换算为均方根
+        presets: 预设方向字典, 默认使用 PROJECTION_PRESETS
+
+    Returns:
+        字典: 'direction' (最佳预设名称), 'angle' (度), 'kx', 'ky' (预设参数下的系数),
+        'distance' (与拟合系数的距离), 'rms' (给出 szz/sse/n_values 时), 'angles' (各方向的最佳角度, (B, D))
+    """
+    if presets is None:
+        from oblique_projection_top_down import PROJECTION_PRESETS
+        presets = PROJECTION_PRESETS
+    names = list(presets)
+    directions = np.array([presets[name] for name in names], dtype=np.float64)  # (D, 2)
+
+    k = np.stack(np.broadcast_arrays(np.asarray(kx, dtype=np.float64), np.asarray(ky, dtype=np.float64)), axis=-1)
+    single = k.ndim == 1
+    k = k.reshape(-1, 2)
+
+    t = (k @ directions.T) / np.einsum('dc,dc->d', directions, directions)  # (B, D)
+    fitted = t[..., np.newaxis] * directions  # (B, D, 2)
+    distance2 = np.sum((k[:, np.newaxis, :] - fitted) ** 2, axis=-1)
+    # NaN系数(无法确定)时统一选第一个方向
+    best = np.argmin(np.where(np.isnan(distance2), np.inf, distance2), axis=1)
+    rows = np.arange(len(k))
+
+    angles = np.degrees(np.arctan(t))
+    result = {
+        'direction': np.array(names, dtype=object)[best],
+        'angle': angles[rows, best],
+        'kx': fitted[rows, best, 0],
+        'ky': fitted[rows, best, 1],
+        'distance': np.sqrt(distance2[rows, best]),
+        'angles': angles,
+    }
+    if szz is not None and sse is not None and n_values is not None:
+        szz = np.asarray(szz, dtype=np.float64).reshape(-1)
+        sse = np.asarray(sse, dtype=np.float64).reshape(-1)
+        result['rms'] = np.sqrt((sse + szz * distance2[rows, best]) / n_values)
+    if single:
+        result = {key: value[0] for key, value in result.items()}
+        for key in ('angle', 'kx', 'ky', 'distance', 'rms'):
+            if key in result:
+                result[key] = float(result[key])
+    return result
+
+
+@profiled
+def solve_projection(vertices_3d, vertices_2d, fit_offset=False, presets=True):
+    """
+    拟合投影系数并映射到预设方向
+
+    Args:
+        vertices_3d: 已知的三维顶点, (N, 3) 或 (B, N, 3)
+        vertices_2d: 观测到的二维顶点, (N, 2) 或 (B, N, 2)
+        fit_offset: 是否同时拟合整体平移
+        presets: True 使用 PROJECTION_PRESETS, 也可以给出预设字典; False 不做映射
+
+    Returns:
+        fit_projection_params 的字典, presets 不为False时增加 'preset' 项(match_presets 的结果)
+    """
+    result = fit_projection_params(vertices_3d, vertices_2d, fit_offset)
+    if presets is not False:
+        n_values = 2 * np.shape(vertices_2d)[-2]
+        result['preset'] = match_presets(result['kx'], result['ky'], result['szz'], result['sse'], n_values,
+                                         None if presets is True else presets)
+    return result
+
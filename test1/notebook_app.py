@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jupyter/ipywidgets 前端
+
+与桌面程序共用 ProjectionExperiment 的计算、依赖图、绘图和测量报告, 只把 Tk 组件换成 ipywidgets:
+- 控件: 投影模式、斜投影角度、透视焦距、仰角、方位角、多视图模式显示的视图
+- 控件事件经过去抖, 连续拖动滑块只在停顿后更新一次
+- 计算结果按参数缓存(最近使用的若干组), 回到之前的参数时不重新计算
+- 视角控件只改变视角; 图形通过依赖图原地更新, 只重建参数改变所影响的图元
+
+在 notebook 中使用:
+
+    from notebook_app import NotebookExperiment
+    NotebookExperiment().show()
+
+依赖 ipywidgets; 安装 ipympl 时图形是可交互的画布(鼠标拖动旋转与滑块同步),
+否则每次更新重新显示一张静态图片。弹簧模式依赖 Tk 的动画定时器, 不在 notebook 中提供。
+"""
+
+import asyncio
+from collections import OrderedDict
+
+import ipywidgets as widgets
+from IPython.display import display
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from projection_experiment import DEFAULT_FOCAL, VIEW_STYLES, ProjectionExperiment, check_dashboard_views
+
+try:
+    from ipympl.backend_nbagg import Canvas, FigureManager
+except ImportError:
+    Canvas = FigureManager = None
+
+# 模式选项(与桌面程序的单选按钮一致, 不含弹簧模式)
+MODE_OPTIONS = [
+    ("正投影", "orthogonal"),
+    ("斜投影", "oblique"),
+    ("对比模式", "both"),
+    ("透视", "perspective"),
+    ("多视图", "dashboard"),
+]
+
+DEBOUNCE_SECONDS = 0.08  # 控件事件的去抖间隔
+SCENE_CACHE_SIZE = 64  # 按参数缓存的计算结果个数
+
+
+class _WidgetValue:
+    """把控件的 value 包装成与 Tk 变量相同的 get/set 接口"""
+
+    def __init__(self, widget):
+        self.widget = widget
+
+    def get(self):
+        return self.widget.value
+
+    def set(self, value):
+        self.widget.value = value
+
+
+class _ReportText:
+    """代替测量数据文本框, 内容写入只读的 Textarea"""
+
+    def __init__(self, widget):
+        self.widget = widget
+
+    def delete(self, *args):
+        pass
+
+    def insert(self, index, text):
+        self.widget.value = text
+
+
+class Debouncer:
+    """
+    把短时间内的多次调用合并为停顿之后的一次调用
+
+    使用 notebook 内核正在运行的事件循环计时; 没有运行中的事件循环时(如普通脚本)立即调用。
+    """
+
+    def __init__(self, func, delay=DEBOUNCE_SECONDS):
+        self.func = func
+        self.delay = delay
+        self._handle = None
+
+    def __call__(self):
+        self.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.func()
+            return
+        self._handle = loop.call_later(self.delay, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        self.func()
+
+    def cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
+class NotebookExperiment(ProjectionExperiment):
+    """notebook 中的投影实验: 控件为 ipywidgets, 其余与桌面程序相同"""
+
+    def __init__(self, figsize=(10, 6), debounce=DEBOUNCE_SECONDS, cache_size=SCENE_CACHE_SIZE, dashboard_views=None):
+        self.init_state(dashboard_views)
+        self.scene_cache = OrderedDict()  # 参数 -> 计算结果
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.pending_scene = False  # 去抖期间是否有需要重新计算的参数改变
+        self.update_later = Debouncer(self.flush, debounce)
+        self.create_widgets(figsize)
+        self.update_plot()
+
+    def create_widgets(self, figsize):
+        """创建控件、测量数据框和画布"""
+        slider = dict(continuous_update=True, readout_format='.1f', layout=widgets.Layout(width='320px'))
+        self.mode_widget = widgets.ToggleButtons(options=MODE_OPTIONS, value="orthogonal", description="投影模式")
+        self.angle_widget = widgets.FloatSlider(value=30.0, min=0, max=60, step=0.5, description="斜投影角度", **slider)
+        self.focal_widget = widgets.FloatSlider(value=DEFAULT_FOCAL, min=2, max=40, step=0.5, description="透视焦距",
+                                                **slider)
+        # 鼠标拖动可以把仰角转到负值, 范围比桌面滑块宽, 避免控件截断后视角跳回
+        self.elev_widget = widgets.FloatSlider(value=20, min=-90, max=90, step=1, description="视角仰角", **slider)
+        self.azim_widget = widgets.FloatSlider(value=45, min=0, max=360, step=1, description="视角方位角", **slider)
+        view_options = [(title, view) for view, (title, _, _) in VIEW_STYLES.items()]
+        self.views_widget = widgets.SelectMultiple(options=view_options, value=tuple(self.dashboard_views),
+                                                   rows=len(VIEW_STYLES), description="多视图")
+        self.report_widget = widgets.Textarea(disabled=True, layout=widgets.Layout(width='360px', height='520px'))
+
+        self.mode_var = _WidgetValue(self.mode_widget)
+        self.angle_var = _WidgetValue(self.angle_widget)
+        self.focal_var = _WidgetValue(self.focal_widget)
+        self.elev_var = _WidgetValue(self.elev_widget)
+        self.azim_var = _WidgetValue(self.azim_widget)
+        self.data_text = _ReportText(self.report_widget)
+
+        self.fig = Figure(figsize=figsize, dpi=100)
+        if Canvas is not None:
+            self.canvas = Canvas(self.fig)
+            self.manager = FigureManager(self.canvas, 0)
+            self.plot_widget = self.canvas
+        else:
+            self.canvas = FigureCanvasAgg(self.fig)
+            self.plot_widget = widgets.Output()
+
+        for widget in (self.mode_widget, self.angle_widget, self.focal_widget):
+            widget.observe(self.on_scene_change, names='value')
+        for widget in (self.elev_widget, self.azim_widget):
+            widget.observe(self.on_view_widget_change, names='value')
+        self.views_widget.observe(self.on_dashboard_views_widget_change, names='value')
+
+        reset = widgets.Button(description="重置视角")
+        reset.on_click(lambda button: self.reset_view())
+        controls = widgets.VBox([self.angle_widget, self.focal_widget, self.elev_widget, self.azim_widget, reset,
+                                 self.views_widget])
+        self.layout = widgets.VBox([
+            self.mode_widget,
+            widgets.HBox([controls, self.report_widget]),
+            self.plot_widget,
+        ])
+
+    def show(self):
+        """在 notebook 中显示界面"""
+        display(self.layout)
+
+    def scene_key(self, params):
+        """计算结果的缓存键: 视角不影响计算; 没有透视视图时焦距也不影响"""
+        mode = params['mode']
+        focal = params['focal'] if "perspective" in self.scene_views(mode, params['dashboard_views']) else None
+        return (params['cube_size'], mode, params['angle'], focal,
+                params['dashboard_views'] if mode == "dashboard" else ())
+
+    def cached_scene(self, params):
+        """按参数取计算结果, 未缓存时计算并按最近使用淘汰"""
+        key = self.scene_key(params)
+        scene = self.scene_cache.get(key)
+        if scene is not None:
+            self.scene_cache.move_to_end(key)
+            self.cache_hits += 1
+            return scene
+        scene = self.compute_scene(params)
+        self.scene_cache[key] = scene
+        if len(self.scene_cache) > self.cache_size:
+            self.scene_cache.popitem(last=False)
+        return scene
+
+    def update_plot(self):
+        """在当前线程中取得计算结果并绘制(notebook 的计算足够快, 不使用后台线程)"""
+        self.pending_scene = False
+        self.render_scene(self.cached_scene(self.snapshot_params()))
+        self.refresh()
+
+    def refresh(self):
+        """没有 ipympl 时重新显示静态图片; 交互画布由 draw_idle 自行更新"""
+        if Canvas is None:
+            self.plot_widget.clear_output(wait=True)
+            with self.plot_widget:
+                display(self.fig)
+
+    def flush(self):
+        """去抖结束: 有参数改变时重新绘制, 否则只更新视角"""
+        if self.pending_scene:
+            self.update_plot()
+        else:
+            self.on_view_change(None)
+
+    def on_scene_change(self, change):
+        """模式、角度或焦距改变"""
+        self.pending_scene = True
+        self.update_later()
+
+    def on_dashboard_views_widget_change(self, change):
+        """多视图模式显示的视图改变; 不允许全部取消(恢复之前的选择)"""
+        if not change['new']:
+            self.views_widget.value = change['old']
+            return
+        self.dashboard_views = check_dashboard_views(change['new'])
+        if self.mode_var.get() == "dashboard":
+            self.on_scene_change(change)
+
+    def on_view_widget_change(self, change):
+        """仰角或方位角改变(包括鼠标拖动同步回来的值, 此时视角已经一致, 不会重绘)"""
+        self.update_later()
+
+    def on_view_change(self, value):
+        """只更新视角"""
+        if self.apply_view(self.elev_var.get(), self.azim_var.get()):
+            self.canvas.draw_idle()
+            self.refresh()
@@ -11,7 +11,50 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import math
+import multiprocessing
+import sys
+from matplotlib.collections import LineCollection
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+from silhouette import CUBOID_DASHED_EDGES, CUBOID_EDGES, silhouette
+from cuboid_metrics import DIMENSION_KEYS, analytic_cuboid_metrics, cuboid_metrics
+from error_analysis import calculate_projection_error, monte_carlo_projection_error
+from general_projection import project_points
+from inverse_solver import solve_projection
+from raster import rasterize_projection, write_png
+from result_cache import cache_key, code_version
+from vector_export import export_projection
+from pose_stream import PoseProjectionStream
+from precision import as_point_array, error_bounds, resolve_dtype
+from projection_core import SIGN_SUBTRACT, angle_coefficients, project, project_homogeneous, projection_direction, shear_matrix
+
+# 单位长方体的顶点(与 get_3d_vertices 的顶点顺序一致), 乘以 (长, 宽, 高) 得到实际顶点
+UNIT_CUBOID_VERTICES = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+])
+
+# 预设投影方向: 投影系数 (kx, ky) = tan(θ) * (cx, cy)
+PROJECTION_PRESETS = {
+    'isometric': (math.cos(math.radians(45)), math.sin(math.radians(45))),  # 斜等测: x和y方向偏移相同
+    'dimetric': (1.0, 0.0),  # 斜二测: 只有x方向偏移
+    'trimetric': (0.75, 0.25),  # 三测: 自定义偏移比例
+}
+
+
+def preset_coefficients(angle_deg, direction='isometric'):
+    """
+    计算预设投影方向的投影系数
+    
+    Args:
+        angle_deg: 投影角度（度）
+        direction: 投影方向类型 ('isometric', 'dimetric', 'trimetric')
+        
+    Returns:
+        (kx, ky)
+    """
+    return angle_coefficients(angle_deg, *PROJECTION_PRESETS[direction])
+
 
 class CuboidObliqueProjector:
     """
@@ -19,7 +62,7 @@ class CuboidObliqueProjector:
     实现斜投影的数学原理：x' = x - kx * z, y' = y - ky * z
     """
     
-    def __init__(self, length=10, width=6, height=4):
+    def __init__(self, length=10, width=6, height=4, dtype=None):
         """
         初始化长方体参数
         
@@ -27,10 +70,12 @@ class CuboidObliqueProjector:
             length: 长方体长度
             width: 长方体宽度  
             height: 长方体高度
+            dtype: 计算精度 ('float32' 或 'float64'), 默认使用全局默认精度
         """
         self.length = length
         self.width = width
         self.height = height
+        self.dtype = resolve_dtype(dtype)
         self.kx = 0.5  # x方向投影系数
         self.ky = 0.5  # y方向投影系数
         
@@ -53,20 +98,8 @@ class CuboidObliqueProjector:
             angle_deg: 投影角度（度）
             direction: 投影方向类型 ('isometric', 'dimetric', 'trimetric')
         """
-        angle_rad = math.radians(angle_deg)
-        
-        if direction == 'isometric':
-            # 斜等测投影：x和y方向偏移相同
-            self.kx = math.tan(angle_rad) * math.cos(math.radians(45))
-            self.ky = math.tan(angle_rad) * math.sin(math.radians(45))
-        elif direction == 'dimetric':
-            # 斜二测投影：只有x方向偏移
-            self.kx = math.tan(angle_rad)
-            self.ky = 0
-        elif direction == 'trimetric':
-            # 三测投影：自定义偏移比例
-            self.kx = math.tan(angle_rad) * 0.75
-            self.ky = math.tan(angle_rad) * 0.25
+        if direction in PROJECTION_PRESETS:
+            self.kx, self.ky = preset_coefficients(angle_deg, direction)
     
     def get_3d_vertices(self):
         """获取长方体的三维顶点"""
@@ -79,65 +112,118 @@ class CuboidObliqueProjector:
             [self.length, 0, self.height],  # V5: 顶面右下
             [self.length, self.width, self.height],  # V6: 顶面右上
             [0, self.width, self.height]   # V7: 顶面左上
-        ])
+        ], dtype=self.dtype)
         return vertices
     
-    def project_vertices(self, vertices_3d=None):
+    def project_vertices(self, vertices_3d=None, out=None):
         """
         对顶点进行斜投影
         
         Args:
-            vertices_3d: 可选的三维顶点数组
+            vertices_3d: 可选的三维顶点, 可以是数组或任意实现缓冲区协议的对象,
+                         精度与投影器一致且内存连续时不会复制
+            out: 可选的输出数组 (N, 2) 或可写缓冲区(如共享内存切片), 结果直接写入其中
             
         Returns:
             投影后的二维顶点数组
         """
         if vertices_3d is None:
             vertices_3d = self.get_3d_vertices()
+        vertices_3d = as_point_array(vertices_3d, self.dtype)
         
-        vertices_2d = []
-        for x, y, z in vertices_3d:
-            # 斜投影公式：x' = x - kx * z, y' = y - ky * z
-            x_proj = x - self.kx * z
-            y_proj = y - self.ky * z
-            vertices_2d.append((x_proj, y_proj))
-        
-        return np.array(vertices_2d)
+        # 斜投影公式：x' = x - kx * z, y' = y - ky * z
+        return project(vertices_3d, self.kx, self.ky, SIGN_SUBTRACT, out=out, width=2)
     
-    def build_projection_matrix(self):
-        """构建斜投影矩阵"""
-        proj_matrix = np.array([
-            [1, 0, self.kx, 0],
-            [0, 1, self.ky, 0],
-            [0, 0, 0, 0],
-            [0, 0, 0, 1]
-        ])
-        return proj_matrix
+    @classmethod
+    def batch_metrics(cls, lengths, widths, heights, kx, ky, dtype=None):
+        """
+        一次计算一批(尺寸和投影参数各不相同的)长方体的投影顶点与全部投影度量
+        
+        与逐个创建投影器调用 project_vertices / calculate_dimensions 的结果相同,
+        但整批只做一次数组运算, 适合合并大量独立请求
+        
+        Args:
+            lengths, widths, heights: 长方体尺寸, 形状 (B,) 或可相互广播
+            kx, ky: 投影系数, 形状与尺寸可广播
+            dtype: 计算精度, 默认使用全局默认精度
+            
+        Returns:
+            与 analytic_cuboid_metrics 结构相同的字典, 另有 'vertices_2d' (B, 8, 2)
+        """
+        dtype = resolve_dtype(dtype)
+        L, W, H, kx, ky = np.broadcast_arrays(*(np.asarray(v, dtype=dtype)
+                                                for v in (lengths, widths, heights, kx, ky)))
+        vertices = UNIT_CUBOID_VERTICES * np.stack([L, W, H], axis=-1)[..., np.newaxis, :]
+        metrics = analytic_cuboid_metrics(L, W, H, kx, ky, dtype)
+        # 每个长方体使用自己的系数: x' = x - kx * z, y' = y - ky * z
+        metrics['vertices_2d'] = project(vertices, kx[..., np.newaxis], ky[..., np.newaxis], SIGN_SUBTRACT,
+                                         width=2, dtype=dtype, batched=True)
+        return metrics
     
-    def project_with_matrix(self, vertices_3d=None):
-        """使用矩阵进行投影"""
+    def project_onto_plane(self, proj_plane_normal=(0, 0, 1), plane_point=(0, 0, 0),
+                           vertices_3d=None, out=None, coords='3d'):
+        """
+        沿当前投影方向 (kx, ky, 1) 把顶点投影到任意平面
+        
+        投影平面为 z=0 时结果与 project_vertices 相同
+        
+        Args:
+            proj_plane_normal: 投影平面法向量
+            plane_point: 投影平面上的一点
+            vertices_3d: 可选的三维顶点
+            out: 可选的输出数组
+            coords: '3d' 返回平面上的三维点, '2d' 返回平面内的二维坐标
+        """
         if vertices_3d is None:
             vertices_3d = self.get_3d_vertices()
+        direction = projection_direction(self.kx, self.ky, SIGN_SUBTRACT)
+        return project_points(vertices_3d, direction, proj_plane_normal, plane_point,
+                              out=out, coords=coords, dtype=self.dtype)
+    
+    def pose_stream(self, capacity=1024, pivot=None):
+        """
+        创建刚体位姿流
         
-        proj_matrix = self.build_projection_matrix()
-        
-        # 添加齐次坐标
-        homogeneous_vertices = np.hstack([
-            vertices_3d, 
-            np.ones((vertices_3d.shape[0], 1))
-        ])
+        批量接收运动数据中的位姿(旋转 + 平移), 与当前斜投影矩阵合成后一次算出投影顶点,
+        写入固定容量的环形缓冲区(stream.frames), 读取时不复制
         
-        # 应用矩阵变换
-        projected_homogeneous = proj_matrix @ homogeneous_vertices.T
+        Args:
+            capacity: 保留的帧数
+            pivot: 旋转中心, 默认为长方体中心
+            
+        Returns:
+            PoseProjectionStream
+        """
+        return PoseProjectionStream(self, capacity, pivot)
+    
+    def fit_projection(self, vertices_2d, fit_offset=False):
+        """
+        反求模式: 由观测到的二维顶点拟合投影参数
         
-        # 转换回二维坐标
-        projected_vertices = []
-        for i in range(projected_homogeneous.shape[1]):
-            x = projected_homogeneous[0, i] / projected_homogeneous[3, i]
-            y = projected_homogeneous[1, i] / projected_homogeneous[3, i]
-            projected_vertices.append((x, y))
+        以当前长方体的三维顶点为已知量, 对每份图形做最小二乘拟合,
+        并映射到最接近的预设方向(isometric/dimetric/trimetric)。不修改当前投影参数,
+        需要时可用 set_projection_params 或 set_projection_angle 应用结果。
         
-        return np.array(projected_vertices)
+        Args:
+            vertices_2d: 观测顶点, 单份 (8, 2) 或批量 (B, 8, 2)
+            fit_offset: 是否同时拟合整体平移
+            
+        Returns:
+            字典: 'kx', 'ky', 'offset', 'residuals', 'rms', 以及 'preset'
+            ('direction', 'angle', 'rms' 等, 见 inverse_solver.match_presets)
+        """
+        return solve_projection(self.get_3d_vertices(), vertices_2d, fit_offset, PROJECTION_PRESETS)
+    
+    def build_projection_matrix(self):
+        """构建斜投影矩阵(与 project_vertices 相同的 x' = x - kx * z 约定)"""
+        return shear_matrix(self.kx, self.ky, SIGN_SUBTRACT, self.dtype)
+    
+    def project_with_matrix(self, vertices_3d=None):
+        """使用矩阵进行投影"""
+        if vertices_3d is None:
+            vertices_3d = self.get_3d_vertices()
+        vertices_3d = as_point_array(vertices_3d, self.dtype)
+        return project_homogeneous(vertices_3d, self.build_projection_matrix(), self.dtype)
     
     def draw_projection(self, show_3d=True, title="长方体从上往下斜投影"):
         """
@@ -152,15 +238,8 @@ class CuboidObliqueProjector:
         """
         vertices_2d = self.project_vertices()
         
-        # 定义棱边连接关系
-        edges = [
-            # 底面棱边
-            (0, 1), (1, 2), (2, 3), (3, 0),
-            # 顶面棱边
-            (4, 5), (5, 6), (6, 7), (7, 4),
-            # 侧面棱边
-            (0, 4), (1, 5), (2, 6), (3, 7)
-        ]
+        # 棱边连接关系
+        edges = CUBOID_EDGES
         
         fig = plt.figure(figsize=(12, 8))
         
@@ -169,12 +248,9 @@ class CuboidObliqueProjector:
             ax1 = fig.add_subplot(121, projection='3d')
             vertices_3d = self.get_3d_vertices()
             
-            # 绘制3D长方体
-            for edge in edges:
-                start, end = edge
-                ax1.plot([vertices_3d[start, 0], vertices_3d[end, 0]],
-                        [vertices_3d[start, 1], vertices_3d[end, 1]],
-                        [vertices_3d[start, 2], vertices_3d[end, 2]], 'b-', linewidth=2)
+            # 绘制3D长方体: 十二条棱边合并为一个图元
+            ax1.add_collection3d(Line3DCollection(vertices_3d[edges], colors='b', linewidths=2))
+            ax1.auto_scale_xyz(vertices_3d[:, 0], vertices_3d[:, 1], vertices_3d[:, 2])
             
             ax1.set_xlabel('X')
             ax1.set_ylabel('Y')
@@ -188,18 +264,12 @@ class CuboidObliqueProjector:
         else:
             ax2 = fig.add_subplot(111)
         
-        # 绘制2D投影
-        for edge in edges:
-            start, end = edge
-            # 底面和侧面用实线，顶面用虚线
-            if start < 4 or end < 4:
-                ax2.plot([vertices_2d[start, 0], vertices_2d[end, 0]],
-                        [vertices_2d[start, 1], vertices_2d[end, 1]], 
-                        'b-', linewidth=2)
-            else:
-                ax2.plot([vertices_2d[start, 0], vertices_2d[end, 0]],
-                        [vertices_2d[start, 1], vertices_2d[end, 1]], 
-                        'r--', linewidth=2)
+        # 绘制2D投影: 底面和侧面用实线，顶面用虚线, 每种线型一个图元
+        segments = vertices_2d[edges]
+        ax2.add_collection(LineCollection(segments[~CUBOID_DASHED_EDGES], colors='b', linewidths=2))
+        ax2.add_collection(LineCollection(segments[CUBOID_DASHED_EDGES], colors='r', linewidths=2,
+                                          linestyles='--'))
+        ax2.autoscale_view()
         
         # 标注顶点
         for i, (x, y) in enumerate(vertices_2d):
@@ -217,28 +287,137 @@ class CuboidObliqueProjector:
         
         return vertices_2d
     
-    def calculate_dimensions(self):
-        """计算投影后的尺寸"""
-        vertices_2d = self.project_vertices()
+    def _cache_key(self, kind, *parts):
+        """缓存键: 几何参数、投影参数、额外输入以及相关代码的版本"""
+        version = code_version(*(sys.modules[name] for name in
+                                 (__name__, 'cuboid_metrics', 'silhouette', 'raster')))
+        return cache_key(kind, self.length, self.width, self.height, str(self.dtype), *parts, version)
+    
+    def angle_sweep(self, angles, direction='isometric', cache=None):
+        """
+        角度扫描: 一次计算一组投影角度下的全部投影度量
+        
+        Args:
+            angles: 投影角度数组（度）
+            direction: 投影方向类型 ('isometric', 'dimetric', 'trimetric')
+            cache: 可选的 result_cache.ResultCache, 给出时结果按输入内容缓存到磁盘
+            
+        Returns:
+            与 analytic_cuboid_metrics 结构相同的字典, 每项的形状与angles相同
+        """
+        angles = np.asarray(angles, dtype=np.float64)
         
-        # 计算底面尺寸
-        base_length = np.linalg.norm(vertices_2d[1] - vertices_2d[0])
-        base_width = np.linalg.norm(vertices_2d[3] - vertices_2d[0])
+        def compute():
+            cx, cy = PROJECTION_PRESETS[direction]
+            t = np.tan(np.radians(angles))
+            return analytic_cuboid_metrics(self.length, self.width, self.height, t * cx, t * cy, self.dtype)
         
-        # 计算顶面尺寸
-        top_length = np.linalg.norm(vertices_2d[5] - vertices_2d[4])
-        top_width = np.linalg.norm(vertices_2d[7] - vertices_2d[4])
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(self._cache_key('angle_sweep', angles, direction), compute)
+    
+    def rasterize(self, size=(128, 128), path=None, cache=None, **style):
+        """
+        不经过matplotlib直接光栅化投影图(适合批量生成缩略图)
         
-        # 计算高度投影
-        height_proj = np.linalg.norm(vertices_2d[4] - vertices_2d[0])
+        与 draw_projection 相同, 底面和侧面棱边画实线, 顶面棱边画虚线
         
-        return {
-            'base_length': base_length,
-            'base_width': base_width,
-            'top_length': top_length,
-            'top_width': top_width,
-            'height_projection': height_proj
-        }
+        Args:
+            size: 图像尺寸 (宽, 高)
+            path: 给出时同时写入PNG文件
+            cache: 可选的 result_cache.ResultCache, 给出时渲染结果缓存到磁盘
+            style: 传给 raster.rasterize_projection 的样式参数
+            
+        Returns:
+            RGB图像数组 (H, W, 3)
+        """
+        def compute():
+            return rasterize_projection(self.project_vertices(), size=size, **style)
+        
+        if cache is None:
+            image = compute()
+        else:
+            key = self._cache_key('rasterize', float(self.kx), float(self.ky), tuple(size), style)
+            image = cache.get_or_compute(key, compute)
+        if path is not None:
+            write_png(path, image)
+        return image
+    
+    def export_drawing(self, path, scale=10.0, labels=True, fmt=None, **style):
+        """
+        把投影图按比例导出为SVG或PDF(不经过matplotlib, 适合打印)
+        
+        与 draw_projection 相同, 底面和侧面棱边画实线, 顶面棱边画虚线, 并标注顶点
+        
+        Args:
+            path: 输出文件路径(.svg 或 .pdf)
+            scale: 每个模型单位对应的毫米数
+            labels: 是否标注顶点
+            fmt: 'svg' 或 'pdf', 默认按扩展名判断
+            style: 传给 vector_export.export_projection 的样式参数
+        """
+        export_projection(path, self.project_vertices(), labels=labels, scale=scale, fmt=fmt, **style)
+    
+    def calculate_dimensions(self, validate=False):
+        """
+        计算投影后的尺寸
+        
+        长方体始终与坐标轴对齐, 因此直接使用解析公式, 无需构造投影多边形
+        
+        Args:
+            validate: 是否与数值投影结果交叉校验
+        """
+        metrics = cuboid_metrics(self.get_3d_vertices(), self.kx, self.ky, validate=validate)
+        return {key: float(metrics[key]) for key in DIMENSION_KEYS}
+    
+    def calculate_projection_error(self, vertices_3d, vertices_2d):
+        """
+        计算投影误差
+        
+        Args:
+            vertices_3d: 原始3D顶点 (N, 3), 或批量 (B, N, 3)
+            vertices_2d: 投影后的2D顶点 (N, 2), 或批量 (B, N, 2)
+            
+        Returns:
+            观测顶点与按当前参数计算的投影点之间的平均距离
+        """
+        error = calculate_projection_error(vertices_3d, vertices_2d, self.kx, self.ky)
+        return float(error) if np.ndim(error) == 0 else error
+    
+    def analyze_errors(self, trials=100000, **options):
+        """
+        蒙特卡洛误差分析: 扰动尺寸、投影系数和测量坐标, 统计各项误差的分布
+        
+        Args:
+            trials: 试验次数
+            options: 传给 error_analysis.monte_carlo_projection_error 的噪声、种子和并行参数
+            
+        Returns:
+            字典: 'samples', 'summary', 'trials'
+        """
+        return monte_carlo_projection_error(self.length, self.width, self.height, self.kx, self.ky,
+                                            trials=trials, **options)
+    
+    def precision_bounds(self):
+        """
+        当前精度下投影结果的误差上界
+        
+        Returns:
+            字典: unit_roundoff、coordinate、length、area 的绝对误差上界
+        """
+        magnitude = max(abs(self.length), abs(self.width), abs(self.height))
+        k = max(abs(self.kx), abs(self.ky))
+        return error_bounds(self.dtype, magnitude, k)
+    
+    def calculate_shadow(self):
+        """
+        计算投影体的整体轮廓(影子)
+        
+        Returns:
+            (polygon, area): 逆时针排列的轮廓多边形顶点与轮廓面积
+        """
+        polygon, count, area = silhouette(self.get_3d_vertices(), self.kx, self.ky)
+        return polygon[:count], float(area)
 
 def demo_oblique_projection():
     """演示斜投影功能"""
@@ -281,6 +460,8 @@ def demo_oblique_projection():
                                           title="长方体从上往下自定义斜投影")
     dimensions = projector.calculate_dimensions()
     print("投影尺寸:", dimensions)
+    _, shadow = projector.calculate_shadow()
+    print(f"投影轮廓(影子)面积: {shadow:.4f}")
     print()
     
     # 4. 投影矩阵验证
@@ -340,6 +521,7 @@ def interactive_demo():
         print(f"发生错误: {e}")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     print("长方体从上往下斜投影程序")
     print("=" * 50)
     
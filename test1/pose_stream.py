@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+刚体位姿流的斜投影
+
+长方体由运动数据流驱动, 每个位姿为旋转 R 与平移 t, 顶点 v 的世界坐标为 R·(v - pivot) + t。
+斜投影矩阵 S 的前两行与位姿合成为一个仿射变换:
+    p' = (S·R)·(v - pivot) + S·t
+一批 B 个位姿先合成 (B, 2, 3) 的矩阵, 再用一次批量矩阵乘法算出全部投影顶点,
+结果直接写入固定容量的环形缓冲区的存储, 界面或导出程序可以不复制地读取。
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from precision import as_float_array
+from ring_buffer import RingBuffer
+from silhouette import convex_hull, hull_area
+
+
+def rotation_matrices(rotations, dtype=None):
+    """
+    把旋转转换为旋转矩阵
+
+    Args:
+        rotations: 旋转矩阵 (B, 3, 3) 或单位四元数 (B, 4), 四元数按 (w, x, y, z) 排列
+
+    Returns:
+        旋转矩阵 (B, 3, 3)
+    """
+    rotations = as_float_array(rotations, dtype)
+    if rotations.shape[-2:] == (3, 3):
+        return rotations
+    if rotations.shape[-1] != 4:
+        raise ValueError(f"旋转应为 (B, 3, 3) 矩阵或 (B, 4) 四元数, 实际形状为 {rotations.shape}")
+    q = rotations / np.linalg.norm(rotations, axis=-1, keepdims=True)
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+
+class PoseProjectionStream:
+    """把刚体位姿批量投影并写入环形缓冲区"""
+
+    def __init__(self, projector, capacity=1024, pivot=None):
+        """
+        Args:
+            projector: CuboidObliqueProjector, 提供顶点、精度和投影矩阵
+            capacity: 环形缓冲区保留的帧数
+            pivot: 物体坐标系原点(旋转中心), 默认为长方体中心
+        """
+        self.projector = projector
+        self.dtype = projector.dtype
+        vertices = projector.get_3d_vertices()
+        pivot = vertices.mean(axis=0) if pivot is None else np.asarray(pivot, dtype=self.dtype)
+        self.body_vertices = vertices - pivot
+        self.frames = RingBuffer(capacity, self.body_vertices.shape[:1] + (2,), self.dtype)
+        self.times = RingBuffer(capacity, (), np.float64)
+
+    def compose(self, rotations, translations):
+        """
+        位姿与斜投影矩阵合成
+
+        Args:
+            rotations: 旋转矩阵 (B, 3, 3) 或四元数 (B, 4)
+            translations: 平移 (B, 3)
+
+        Returns:
+            (linear, offset): 线性部分 (B, 2, 3) 和平移部分 (B, 2)
+        """
+        # 投影矩阵在投影器的参数改变后随之更新
+        shear = self.projector.build_projection_matrix()[:2, :3]
+        linear = shear @ rotation_matrices(rotations, self.dtype)
+        offset = as_float_array(translations, self.dtype) @ shear.T
+        return linear, offset
+
+    def project_poses(self, rotations, translations, out=None):
+        """
+        批量投影, 不写入缓冲区
+
+        Returns:
+            各位姿下的投影顶点 (B, N, 2)
+        """
+        linear, offset = self.compose(rotations, translations)
+        if out is None:
+            out = np.empty((len(linear),) + self.frames.item_shape, dtype=self.dtype)
+        np.matmul(self.body_vertices, linear.transpose(0, 2, 1), out=out)
+        out += offset[:, np.newaxis, :]
+        return out
+
+    def push(self, rotations, translations, timestamps=None):
+        """
+        投影一批位姿并写入缓冲区
+
+        Args:
+            rotations: 旋转矩阵 (B, 3, 3) 或四元数 (B, 4)
+            translations: 平移 (B, 3)
+            timestamps: 各位姿的时刻 (B,), 默认为接收时刻
+
+        Returns:
+            写入的帧数
+        """
+        linear, offset = self.compose(rotations, translations)
+        if timestamps is None:
+            timestamps = np.full(len(linear), time.time())
+        # 超过容量的一批只保留最后 capacity 个位姿
+        linear, offset = linear[-self.frames.capacity:], offset[-self.frames.capacity:]
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.frames.capacity:]
+        with self.frames.lock:
+            start = 0
+            for segment in self.frames.reserve_many(len(linear)):
+                stop = start + len(segment)
+                np.matmul(self.body_vertices, linear[start:stop].transpose(0, 2, 1), out=segment)
+                segment += offset[start:stop, np.newaxis, :]
+                start = stop
+            self.times.extend(timestamps)
+        return len(linear)
+
+    def outlines(self, n=None):
+        """
+        最近 n 帧(默认全部)的投影轮廓与面积
+
+        Returns:
+            (hull, count, area): 凸包顶点 (n, N, 2) (未使用的位置为NaN)、凸包顶点数 (n,)、轮廓面积 (n,)
+        """
+        with self.frames.lock:
+            older, newer = self.frames.views(n)
+            frames = newer if len(older) == 0 else np.concatenate([older, newer])
+            hull, count = convex_hull(frames)
+            area = hull_area(frames)
+        return hull, count, area
+
+
+def main():
+    from oblique_projection_top_down import CuboidObliqueProjector
+
+    print("刚体位姿流的斜投影")
+    print("=" * 50)
+    projector = CuboidObliqueProjector(10, 6, 4)
+    projector.set_projection_angle(45, 'isometric')
+    stream = PoseProjectionStream(projector, capacity=4096)
+
+    rate, batch, seconds = 500, 50, 20
+    rng = np.random.default_rng(0)
+    total = rate * seconds
+    t = np.arange(total) / rate
+    axis = rng.standard_normal(3)
+    axis /= np.linalg.norm(axis)
+    half = 0.5 * 2 * np.pi * 0.25 * t  # 每秒转四分之一圈
+    quaternions = np.column_stack([np.cos(half), np.sin(half)[:, None] * axis])
+    translations = np.column_stack([5 * np.sin(t), 3 * np.cos(t), np.zeros(total)])
+
+    start = time.perf_counter()
+    for i in range(0, total, batch):
+        stream.push(quaternions[i:i + batch], translations[i:i + batch], t[i:i + batch])
+    elapsed = time.perf_counter() - start
+    print(f"{total} 个位姿 ({rate} Hz x {seconds} s), 每批 {batch} 个, 用时 {elapsed * 1000:.1f} ms "
+          f"(每秒 {total / elapsed:,.0f} 个位姿)")
+
+    hull, count, area = stream.outlines(rate)
+    print(f"缓冲区 {len(stream.frames)} 帧, 最近 1 s 的轮廓面积: 最小 {area.min():.2f}, 最大 {area.max():.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投影计算的数值精度设置
+
+整个投影流程(顶点生成、投影、面积计算、导出)使用同一种浮点类型:
+- float64: 默认, 双精度
+- float32: 单精度, 内存占用和内存带宽减半, 适合大规模点云和场景
+
+可以通过环境变量 PROJECTION_DTYPE=float32 或 set_default_dtype() 切换默认精度。
+
+输入的点数据可以是任意实现缓冲区协议的对象(numpy数组、array.array、memoryview、
+共享内存等), 类型正确且内存连续时不会复制; 输出可以写入调用方提供的数组。
+"""
+
+import os
+
+import numpy as np
+
+SUPPORTED_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+_default_dtype = np.dtype(os.environ.get("PROJECTION_DTYPE", "float64"))
+if _default_dtype not in SUPPORTED_DTYPES:
+    raise ValueError(f"不支持的精度类型: {_default_dtype}, 只支持 float32 或 float64")
+
+
+def resolve_dtype(dtype=None):
+    """
+    确定要使用的浮点类型
+
+    Args:
+        dtype: None(使用默认精度)、'float32'、'float64' 或对应的numpy类型
+
+    Returns:
+        numpy.dtype
+    """
+    if dtype is None:
+        return _default_dtype
+    dtype = np.dtype(dtype)
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"不支持的精度类型: {dtype}, 只支持 float32 或 float64")
+    return dtype
+
+
+def set_default_dtype(dtype):
+    """设置全局默认精度"""
+    global _default_dtype
+    _default_dtype = resolve_dtype(dtype)
+
+
+def get_default_dtype():
+    """获取全局默认精度"""
+    return _default_dtype
+
+
+def as_float_array(values, dtype=None):
+    """
+    转换为浮点数组
+
+    已经是 float32/float64 的数组保持原精度(不复制), 整数等其他类型转换为默认精度。
+
+    Args:
+        values: 数组或可转换为数组的对象
+        dtype: 指定精度时强制转换为该精度
+    """
+    if dtype is not None:
+        return np.asarray(values, dtype=resolve_dtype(dtype))
+    array = np.asarray(values)
+    if array.dtype in SUPPORTED_DTYPES:
+        return array
+    return array.astype(_default_dtype)
+
+
+def error_bounds(dtype=None, magnitude=1.0, k=1.0, n_vertices=4):
+    """
+    估计投影流程在给定精度下的绝对误差上界(一阶保守估计)
+
+    设单位舍入误差为 u (float32: 2^-24 ≈ 6.0e-8, float64: 2^-53 ≈ 1.1e-16),
+    坐标绝对值不超过 M, 投影系数绝对值不超过 K:
+    - 投影坐标 x' = x - k·z: 输入舍入 + 乘法 + 减法, 误差 ≤ (2 + 4K)·u·M
+    - 投影边长(两点距离): 误差 ≤ 2√2·e_c + u·(1 + K)·M·2
+    - 投影多边形面积(shoelace, n个顶点): 误差 ≤ n·(2·M'·e_c + 3·u·M'^2), 其中 M' = (1 + K)·M
+
+    Args:
+        dtype: 浮点类型
+        magnitude: 坐标的最大绝对值 M
+        k: 投影系数的最大绝对值 K
+        n_vertices: 多边形顶点数
+
+    Returns:
+        字典: unit_roundoff、coordinate、length、area 的误差上界
+    """
+    dtype = resolve_dtype(dtype)
+    u = float(np.finfo(dtype).eps) / 2
+    M = float(abs(magnitude))
+    K = float(abs(k))
+    projected = (1 + K) * M
+    coordinate = (2 + 4 * K) * u * M
+    return {
+        'unit_roundoff': u,
+        'coordinate': coordinate,
+        'length': 2 * float(np.sqrt(2)) * coordinate + 2 * u * projected,
+        'area': n_vertices * (2 * projected * coordinate + 3 * u * projected * projected),
+    }
+
+
+def _raw_array(data, dtype):
+    """不做类型转换地把数据包装为numpy数组; 无类型的字节缓冲区按dtype解释"""
+    if isinstance(data, np.ndarray):
+        return data
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return np.asarray(data)
+    if view.format in ('B', 'b', 'c'):
+        return np.frombuffer(view, dtype=resolve_dtype(dtype))
+    return np.asarray(view)
+
+
+def as_point_array(points, dtype=None, width=3):
+    """
+    把点数据转换为 (N, width) 的浮点数组
+
+    支持numpy数组、实现缓冲区协议的对象和普通序列; 一维数据(单个点或扁平缓冲区)
+    按每 width 个数一个点重新解释。类型正确的数据不会被复制。
+
+    Args:
+        points: 点数据
+        dtype: 目标精度, None时保持浮点输入的精度
+        width: 每个点的坐标个数
+    """
+    array = as_float_array(_raw_array(points, dtype), dtype)
+    if array.ndim == 1:
+        array = array.reshape(-1, width)
+    if array.ndim != 2 or array.shape[1] != width:
+        raise ValueError(f"点数据形状应为 (N, {width}), 实际为 {array.shape}")
+    return array
+
+
+def output_array(out, shape, dtype):
+    """
+    准备输出数组
+
+    out为None时新建数组; 否则把调用方提供的数组或可写缓冲区(包括共享内存切片)
+    包装为指定形状的视图, 结果直接写入其中。
+
+    Raises:
+        ValueError: 输出的大小、精度不匹配, 不可写, 或无法在不复制的情况下变换形状
+    """
+    dtype = resolve_dtype(dtype)
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    array = _raw_array(out, dtype)
+    if array.dtype != dtype:
+        raise ValueError(f"输出数组精度应为 {dtype}, 实际为 {array.dtype}")
+    if array.size != int(np.prod(shape)):
+        raise ValueError(f"输出数组大小应为 {shape}, 实际为 {array.shape}")
+    if not array.flags.writeable:
+        raise ValueError("输出数组不可写")
+    if array.shape != tuple(shape):
+        array = array.view()
+        try:
+            array.shape = shape
+        except AttributeError:
+            raise ValueError("输出数组内存不连续, 无法不复制地变换形状")
+    return array
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可选的性能分析钩子
+
+用 cProfile 记录调用耗时, 用 tracemalloc 记录内存分配, 每次调用的结果写入文件:
+- <名称>-<时间>-<序号>.prof: pstats 格式, 可用 python -m pstats 或 snakeviz 查看
+- <名称>-<时间>-<序号>.tracemalloc: 内存分配快照, 可用 tracemalloc.Snapshot.load 读取
+
+默认关闭, 关闭时被包装的函数只多一次布尔判断。开启方式:
+- 环境变量 PROJECTION_PROFILE=1 (输出目录由 PROJECTION_PROFILE_DIR 指定, 默认 ./profiles)
+- 程序中调用 profiler.set_enabled(True), 或界面菜单 "工具 > 性能分析"
+
+嵌套调用只记录最外层(内层函数包含在外层的统计中)。
+"""
+
+import collections
+import cProfile
+import functools
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+
+PROFILE_ENV = "PROJECTION_PROFILE"
+PROFILE_DIR_ENV = "PROJECTION_PROFILE_DIR"
+TRACE_DEPTH = 10  # tracemalloc 记录的调用栈深度
+
+
+class Profiler:
+    """按调用记录耗时和内存分配的性能分析器"""
+
+    def __init__(self, enabled=None, output_dir=None, top_n=10, keep=50):
+        """
+        Args:
+            enabled: 是否开启, None时由环境变量 PROJECTION_PROFILE 决定
+            output_dir: 输出目录, None时由环境变量 PROJECTION_PROFILE_DIR 决定
+            top_n: 摘要中保留的函数和分配位置个数
+            keep: 内存中保留的最近记录条数
+        """
+        self.output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV, "profiles")
+        self.top_n = top_n
+        self.records = collections.deque(maxlen=keep)
+        self.enabled = False
+        self._local = threading.local()
+        self._counter = itertools.count(1)
+        self._started_tracing = False
+        if enabled is None:
+            enabled = os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        """开启或关闭性能分析; 开启期间 tracemalloc 保持运行"""
+        enabled = bool(enabled)
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_DEPTH)
+            self._started_tracing = True
+        elif not enabled and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.enabled = enabled
+
+    def wrap(self, func, name=None):
+        """
+        包装函数: 开启时每次调用记录一次性能数据
+
+        Args:
+            func: 被包装的函数或绑定方法
+            name: 记录名称, 默认为函数的限定名
+        """
+        name = name or getattr(func, "__qualname__", repr(func))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or getattr(self._local, "active", False):
+                return func(*args, **kwargs)
+            return self._profile_call(name, func, args, kwargs)
+
+        return wrapper
+
+    def instrument(self, obj, method_names, prefix=None):
+        """把对象的若干方法替换为包装后的版本(在绑定到回调之前调用)"""
+        prefix = prefix or type(obj).__name__
+        for method_name in method_names:
+            setattr(obj, method_name, self.wrap(getattr(obj, method_name), f"{prefix}.{method_name}"))
+
+    def _profile_call(self, name, func, args, kwargs):
+        self._local.active = True
+        profile = cProfile.Profile()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12起同一时刻只能有一个 cProfile 在运行(例如后台线程正在分析), 此时只记录耗时和内存
+                profile = None
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+        finally:
+            elapsed = time.perf_counter() - start
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                memory = (current - before, peak - before)
+            else:
+                snapshot, memory = None, (0, 0)
+            self._local.active = False
+            self._record(name, profile, snapshot, elapsed, memory)
+
+    def _record(self, name, profile, snapshot, elapsed, memory):
+        """写出文件并保存摘要"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        safe_name = re.sub(r"[^\w.-]", "_", name)
+        base = os.path.join(self.output_dir, f"{safe_name}-{stamp}-{next(self._counter)}")
+        top_functions = []
+        if profile is not None:
+            profile.dump_stats(base + ".prof")
+            stats = pstats.Stats(profile)
+            functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            top_functions = [(f"{os.path.basename(filename)}:{line}({function})", calls, cumulative)
+                             for (filename, line, function), (_, calls, _, cumulative, _) in functions[:self.top_n]]
+
+        top_allocations = []
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            snapshot.dump(base + ".tracemalloc")
+            top_allocations = [(str(stat.traceback[0]), stat.size, stat.count)
+                               for stat in snapshot.statistics("lineno")[:self.top_n]]
+
+        self.records.append({
+            'name': name,
+            'elapsed': elapsed,
+            'allocated': memory[0],
+            'peak': memory[1],
+            'top_functions': top_functions,
+            'top_allocations': top_allocations,
+            'files': (base + ".prof" if profile is not None else None,
+                      base + ".tracemalloc" if snapshot is not None else None),
+        })
+
+    def summary_text(self, n=5):
+        """
+        最近记录的简短摘要
+
+        Args:
+            n: 每条记录显示的函数个数
+        """
+        if not self.records:
+            return "尚无性能记录" if self.enabled else "性能分析未开启"
+        by_name = collections.OrderedDict()
+        for record in self.records:
+            by_name.setdefault(record['name'], []).append(record)
+
+        lines = [f"输出目录: {os.path.abspath(self.output_dir)}", ""]
+        for name, records in by_name.items():
+            times = [r['elapsed'] * 1000 for r in records]
+            lines.append(f"{name}: {len(records)} 次, 平均 {sum(times) / len(times):.1f} ms, "
+                         f"最长 {max(times):.1f} ms, 峰值内存 {max(r['peak'] for r in records) / 1024:.0f} KB")
+        last = self.records[-1]
+        lines += ["", f"最近一次 ({last['name']}) 累计耗时最多的函数:"]
+        for label, calls, cumulative in last['top_functions'][:n]:
+            lines.append(f"  {cumulative * 1000:8.1f} ms  {calls:6d} 次  {label}")
+        if last['top_allocations']:
+            lines += ["", "内存分配最多的位置:"]
+            for location, size, count in last['top_allocations'][:n]:
+                lines.append(f"  {size / 1024:8.1f} KB  {count:6d} 块  {location}")
+        return "\n".join(lines)
+
+
+# 进程内共享的分析器
+profiler = Profiler()
+
+
+def profiled(func):
+    """用共享分析器包装批处理入口函数的装饰器"""
+    return profiler.wrap(func, f"{func.__module__}.{func.__qualname__}")
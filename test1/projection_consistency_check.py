@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+各投影入口的一致性(差分)检查
+
+用随机点、随机角度和两种符号约定, 把所有投影入口的结果与逐点公式计算的参考值比较:
+- projection_core.project 及其齐次矩阵形式 shear_matrix
+- 三个实验程序的 orthogonal_projection / oblique_projection, 以及多视图的 project_views
+- CuboidObliqueProjector 的 project_vertices、project_with_matrix、project_onto_plane
+- silhouette.project_oblique、general_projection.project_points 与 z=常数 平面的 ParallelProjection
+- error_analysis.calculate_projection_error 与 simulate_chunk (已知偏移/无噪声时的误差)
+- PoseProjectionStream.outlines 的轮廓面积与 CuboidObliqueProjector.calculate_shadow (恒等位姿和一个旋转位姿)
+
+任一入口的偏差超过容差时以非零状态退出:
+
+    python projection_consistency_check.py --trials 50
+"""
+
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from error_analysis import calculate_projection_error, simulate_chunk
+from general_projection import get_projection, project_points
+from oblique_projection_top_down import CuboidObliqueProjector
+from pose_stream import PoseProjectionStream
+from projection_core import (SIGN_ADD, SIGN_SUBTRACT, project, project_homogeneous,
+                             projection_direction, shear_matrix)
+from projection_experiment import ProjectionExperiment, project_views
+from projection_experiment_complete import ProjectionExperiment as CompleteExperiment
+from projection_experiment_rewritten import ProjectionExperiment as RewrittenExperiment
+from silhouette import project_oblique
+
+# z=常数 投影平面上的一点(检查 ParallelProjection 的快速公式)
+PLANE_POINT = (1.5, -2.0, 3.0)
+
+# 实验程序类 → 使用的符号约定
+EXPERIMENTS = {
+    "projection_experiment": (ProjectionExperiment, SIGN_ADD),
+    "projection_experiment_complete": (CompleteExperiment, SIGN_ADD),
+    "projection_experiment_rewritten": (RewrittenExperiment, SIGN_SUBTRACT),
+}
+
+
+def reference_projection(points, kx, ky, sign):
+    """逐点公式计算的参考结果 (N, 2)"""
+    return np.array([(x + sign * kx * z, y + sign * ky * z) for x, y, z in points.tolist()])
+
+
+def _experiment(cls):
+    """不创建窗口的实验对象, 只用于调用投影方法"""
+    app = cls.__new__(cls)
+    app.dtype = np.dtype(np.float64)
+    return app
+
+
+def entry_points(points, kx, ky, angle):
+    """
+    各入口的投影结果
+
+    Args:
+        points: 三维点 (N, 3)
+        kx, ky: 一般方向的投影系数(用于命令行投影器和通用模块)
+        angle: 实验程序使用的斜投影角度(度), 对应系数 (tan(angle), 0)
+
+    Returns:
+        列表: (名称, kx, ky, 符号约定, 结果 (N, 2))
+    """
+    t = math.tan(math.radians(angle))
+    results = []
+    for sign in (SIGN_SUBTRACT, SIGN_ADD):
+        results.append((f"project[{sign:+d}]", kx, ky, sign, project(points, kx, ky, sign, width=2)))
+        results.append((f"shear_matrix[{sign:+d}]", kx, ky, sign,
+                        project_homogeneous(points, shear_matrix(kx, ky, sign))))
+        direction = projection_direction(kx, ky, sign)
+        results.append((f"project_points[{sign:+d}]", kx, ky, sign, project_points(points, direction)[:, :2]))
+        # 点整体平移到平面上方同样高度, 平面内坐标以 PLANE_POINT 为原点, 结果与参考值相同
+        plane = get_projection(direction, (0, 0, 1), PLANE_POINT)
+        results.append((f"ParallelProjection[z={PLANE_POINT[2]:g}][{sign:+d}]", kx, ky, sign,
+                        plane.project(points + PLANE_POINT, coords='2d')))
+
+    for name, (cls, sign) in EXPERIMENTS.items():
+        app = _experiment(cls)
+        results.append((f"{name}.orthogonal_projection", 0.0, 0.0, sign, app.orthogonal_projection(points)[:, :2]))
+        results.append((f"{name}.oblique_projection", t, 0.0, sign, app.oblique_projection(points, angle)[:, :2]))
+        single = np.array([app.oblique_projection(p, angle)[:2] for p in points])
+        results.append((f"{name}.oblique_projection(单点)", t, 0.0, sign, single))
+        in_place = points.copy()
+        app.oblique_projection(in_place, angle, out=in_place)
+        results.append((f"{name}.oblique_projection(原地)", t, 0.0, sign, in_place[:, :2]))
+
+    views = project_views(points, ["orthogonal", "oblique"], angle)
+    results.append(("project_views[orthogonal]", 0.0, 0.0, SIGN_ADD, views[0, :, :2]))
+    results.append(("project_views[oblique]", t, 0.0, SIGN_ADD, views[1, :, :2]))
+
+    projector = CuboidObliqueProjector(dtype='float64')
+    projector.set_projection_params(kx, ky)
+    results.append(("CuboidObliqueProjector.project_vertices", kx, ky, SIGN_SUBTRACT,
+                    projector.project_vertices(points)))
+    results.append(("CuboidObliqueProjector.project_with_matrix", kx, ky, SIGN_SUBTRACT,
+                    projector.project_with_matrix(points)))
+    results.append(("CuboidObliqueProjector.project_onto_plane", kx, ky, SIGN_SUBTRACT,
+                    projector.project_onto_plane(vertices_3d=points)[:, :2]))
+    results.append(("silhouette.project_oblique", kx, ky, SIGN_SUBTRACT, project_oblique(points, kx, ky)))
+    return results
+
+
+def pose_outline_results(size, kx, ky):
+    """
+    PoseProjectionStream.outlines 的轮廓面积与 calculate_shadow 的比较
+
+    恒等位姿对应原长方体; 绕 x 轴转 90° 的位姿对应长宽高为 (L, H, W) 的长方体(平移不影响面积)
+
+    Args:
+        size: 长方体尺寸 (L, W, H)
+        kx, ky: 投影系数
+
+    Returns:
+        列表: (名称, outlines 的面积, calculate_shadow 的面积)
+    """
+    length, width, height = size
+    projector = CuboidObliqueProjector(length, width, height, dtype='float64')
+    projector.set_projection_params(kx, ky)
+    stream = PoseProjectionStream(projector, capacity=4)
+    half = math.sqrt(0.5)
+    stream.push([[1.0, 0.0, 0.0, 0.0], [half, half, 0.0, 0.0]], np.zeros((2, 3)))
+    area = stream.outlines()[2]
+
+    rotated = CuboidObliqueProjector(length, height, width, dtype='float64')
+    rotated.set_projection_params(kx, ky)
+    return [
+        ("PoseProjectionStream.outlines[恒等]", float(area[0]), projector.calculate_shadow()[1]),
+        ("PoseProjectionStream.outlines[绕x轴90°]", float(area[1]), rotated.calculate_shadow()[1]),
+    ]
+
+
+def error_analysis_results(points, size, kx, ky):
+    """
+    误差分析中的投影与参考投影的比较
+
+    - calculate_projection_error: 观测顶点为参考投影加上偏移 (3, 4) 时, 平均误差应为 5
+      (两组系数一起批量计算)
+    - simulate_chunk: 不加噪声时各项误差应为 0
+
+    Returns:
+        列表: (名称, 结果, 应有值)
+    """
+    coefficients = np.array([[kx, ky], [ky, kx]])
+    observed = np.stack([reference_projection(points, a, b, SIGN_SUBTRACT) for a, b in coefficients]) + (3.0, 4.0)
+    errors = calculate_projection_error(np.stack([points, points]), observed, coefficients[:, 0], coefficients[:, 1])
+    results = [(f"calculate_projection_error[{i}]", float(error), 5.0) for i, error in enumerate(errors)]
+
+    noise = {'dimension': 0.0, 'coefficient': 0.0, 'coordinate': 0.0}
+    for name, values in simulate_chunk((*size, kx, ky), noise, 4, 0).items():
+        results.append((f"simulate_chunk[{name}]", float(np.max(np.abs(values))), 0.0))
+    return results
+
+
+def run_check(trials=50, n_points=64, seed=0, tolerance=1e-9):
+    """
+    运行差分检查
+
+    Returns:
+        (检查的结果数, 不一致项的说明列表)
+    """
+    rng = np.random.default_rng(seed)
+    checked = 0
+    failures = []
+    for trial in range(trials):
+        points = rng.uniform(-10, 10, (n_points, 3))
+        kx, ky = rng.uniform(-2, 2, 2)
+        angle = float(rng.uniform(0, 75))
+        for name, ekx, eky, sign, result in entry_points(points, kx, ky, angle):
+            expected = reference_projection(points, ekx, eky, sign)
+            error = float(np.max(np.abs(np.asarray(result) - expected)))
+            checked += 1
+            if not error <= tolerance * (1 + np.max(np.abs(expected))):
+                failures.append(f"第{trial}组 {name}: 最大偏差 {error:.3e}")
+        size = rng.uniform(1, 10, 3)
+        for name, value, expected in pose_outline_results(size, kx, ky) + error_analysis_results(points, size, kx, ky):
+            checked += 1
+            if not abs(value - expected) <= tolerance * (1 + abs(expected)):
+                failures.append(f"第{trial}组 {name}: 结果 {value:.6g}, 应为 {expected:.6g}")
+    return checked, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="各投影入口的一致性检查")
+    parser.add_argument("--trials", type=int, default=50, help="随机参数组数")
+    parser.add_argument("--points", type=int, default=64, help="每组的点数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="相对容差")
+    args = parser.parse_args(argv)
+
+    checked, failures = run_check(args.trials, args.points, args.seed, args.tolerance)
+    print(f"比较结果: {checked} 项")
+    for failure in failures[:20]:
+        print("不一致:", failure)
+    if len(failures) > 20:
+        print(f"... 共 {len(failures)} 项不一致")
+    print("通过" if not failures else "未通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
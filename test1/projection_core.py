@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共用的平行投影核心
+
+所有实验程序和命令行投影器都通过 project() 计算 xy 平面上的平行投影:
+    x' = x + s·kx·z,  y' = y + s·ky·z
+
+符号约定 s 必须显式给出:
+- SIGN_SUBTRACT (-1): x' = x - kx·z, 数学原理文档、CuboidObliqueProjector、
+  projection_experiment_rewritten 使用, 投射方向为 (kx, ky, 1)
+- SIGN_ADD (+1): x' = x + k·z, projection_experiment 与 projection_experiment_complete 使用,
+  投射方向为 (-kx, -ky, 1)
+
+两种约定只是投射方向相反, 同一组系数在两种约定下的投影关于 z 镜像。
+"""
+
+import math
+
+import numpy as np
+
+from precision import as_float_array, output_array
+
+SIGN_SUBTRACT = -1
+SIGN_ADD = 1
+
+
+def _check_sign(sign):
+    if sign not in (SIGN_SUBTRACT, SIGN_ADD):
+        raise ValueError(f"符号约定只能是 SIGN_SUBTRACT(-1) 或 SIGN_ADD(+1), 实际为 {sign}")
+    return sign
+
+
+def angle_coefficients(angle_deg, cx=1.0, cy=0.0):
+    """
+    投影角度对应的系数 (kx, ky) = tan(θ)·(cx, cy)
+
+    Args:
+        angle_deg: 投影角度（度）
+        cx, cy: 偏移方向, 默认只在x方向偏移
+    """
+    t = math.tan(math.radians(angle_deg))
+    return t * cx, t * cy
+
+
+def projection_direction(kx, ky, sign):
+    """投射方向向量(与 general_projection 的 proj_dir 对应)"""
+    _check_sign(sign)
+    return (-sign * kx, -sign * ky, 1.0)
+
+
+def shear_matrix(kx, ky, sign, dtype=np.float64):
+    """
+    齐次坐标投影矩阵 (4, 4): [x, y, z, 1] → [x', y', 0, 1]
+
+    Args:
+        kx, ky: 投影系数
+        sign: SIGN_SUBTRACT 或 SIGN_ADD
+        dtype: 矩阵精度
+    """
+    _check_sign(sign)
+    return np.array([
+        [1, 0, sign * kx, 0],
+        [0, 1, sign * ky, 0],
+        [0, 0, 0, 0],
+        [0, 0, 0, 1],
+    ], dtype=dtype)
+
+
+def project(points, kx, ky, sign, out=None, width=3, dtype=None, batched=False):
+    """
+    批量平行投影到xy平面
+
+    系数可以是标量, 也可以是同形状的数组(如多个视图或多个角度), 此时结果在最前面
+    增加系数的维度: 形状为 kx.shape + points.shape[:-1] + (width,)。
+    batched=True 时系数改为与点的批量维度 points.shape[:-1] 按广播规则对齐(每组点使用
+    自己的系数), 结果形状为两者广播后的形状 + (width,)。
+
+    Args:
+        points: 三维点, 形状 (..., 3)
+        kx, ky: 投影系数, 标量或可相互广播的数组
+        sign: SIGN_SUBTRACT 或 SIGN_ADD
+        out: 可选的输出数组, 结果直接写入其中(可以与输入共用内存)
+        width: 3 输出 (x', y', 0), 2 只输出 (x', y')
+        dtype: 计算精度, 默认沿用输入的浮点类型
+        batched: 系数是否与点的批量维度对齐, 而不是在最前面增加系数的维度
+
+    Returns:
+        投影结果
+    """
+    _check_sign(sign)
+    points = as_float_array(points, dtype)
+    dtype = points.dtype
+    kx, ky = np.broadcast_arrays(np.asarray(kx, dtype=dtype), np.asarray(ky, dtype=dtype))
+    if batched:
+        shape = np.broadcast_shapes(kx.shape, points.shape[:-1]) + (width,)
+    else:
+        shape = kx.shape + points.shape[:-1] + (width,)
+    result = output_array(out, shape, dtype)
+
+    # 输出与输入共用内存(原地投影)时, 先保留一份输入
+    if np.may_share_memory(points, result):
+        points = points.copy()
+
+    expand = Ellipsis if batched else (Ellipsis,) + (np.newaxis,) * (points.ndim - 1)
+    x, y, z = points[..., 0], points[..., 1], points[..., 2]
+    np.multiply(z, sign * kx[expand], out=result[..., 0])
+    result[..., 0] += x
+    np.multiply(z, sign * ky[expand], out=result[..., 1])
+    result[..., 1] += y
+    if width == 3:
+        result[..., 2] = 0
+    return result
+
+
+def project_homogeneous(points, matrix, dtype=None):
+    """
+    用齐次矩阵投影 (N, 3) 点集, 返回 (N, 2)
+
+    与 project() 等价的矩阵形式, 用于验证和教学演示。
+    """
+    points = as_float_array(points, dtype)
+    matrix = np.asarray(matrix, dtype=points.dtype)
+    projected = points @ matrix[:, :3].T + matrix[:, 3]
+    return projected[:, :2] / projected[:, 3:4]
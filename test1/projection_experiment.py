@@ -11,32 +11,305 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
 import numpy as np
 import math
+import multiprocessing
+import threading
+from background_worker import LatestRequestWorker
+from dataflow import Dataflow
+from oblique_projection_top_down import preset_coefficients
+from precision import as_point_array, resolve_dtype
+from profiling import profiler
+from projection_core import SIGN_ADD, angle_coefficients, project
+from silhouette import CUBOID_EDGES, CUBOID_FACES, hull_area
+from spring_view import SpringAnimationView
+
+# 可用的视图: 名称 -> (标题, 投射线颜色, 投影面颜色)
+VIEW_STYLES = {
+    "orthogonal": ("正投影", 'red', 'lightcoral'),
+    "oblique": ("斜投影", 'green', 'lightgreen'),
+    "cavalier": ("斜投影·全长 (Cavalier)", 'darkorange', 'navajowhite'),
+    "cabinet": ("斜投影·半长 (Cabinet)", 'purple', 'plum'),
+    "isometric": ("斜等测预设", 'teal', 'paleturquoise'),
+    "dimetric": ("斜二测预设", 'olive', 'khaki'),
+    "trimetric": ("三测预设", 'brown', 'rosybrown'),
+    "perspective": ("透视投影", 'royalblue', 'lightsteelblue'),
+}
+
+# 多视图模式默认显示的视图
+DASHBOARD_VIEWS = ["orthogonal", "cavalier", "cabinet", "isometric", "dimetric", "trimetric"]
+
+# 透视投影: 视点到投影面(xy平面)的默认距离(焦距)和近裁剪面距离
+DEFAULT_FOCAL = 15.0
+NEAR_PLANE = 0.5
+
+# 投影图形的棱边按线型分组(顶点索引): 底面轮廓加粗, 顶面和侧面棱边普通, 底面对角线为虚线
+BOTTOM_EDGES = CUBOID_EDGES[:4]
+TOP_SIDE_EDGES = CUBOID_EDGES[4:]
+BOTTOM_DIAGONALS = np.array([[0, 2], [1, 3]])
+
+# 斜投影时坐标轴需要容纳的最大投射角度
+MAX_PROJECTION_ANGLE = 60
+
+
+def check_dashboard_views(views):
+    """检查多视图模式的视图列表(VIEW_STYLES 中的名称, 非空且不重复), 返回列表"""
+    views = list(views)
+    if not views:
+        raise ValueError("多视图模式至少需要一个视图")
+    unknown = [view for view in views if view not in VIEW_STYLES]
+    if unknown:
+        raise ValueError(f"未知的视图: {', '.join(map(str, unknown))}, 可用的视图: {', '.join(VIEW_STYLES)}")
+    if len(set(views)) != len(views):
+        raise ValueError(f"视图重复: {', '.join(views)}")
+    return views
+
+
+def view_coefficients(view, angle_deg):
+    """视图的投影系数 (kx, ky), 投影公式: P(x,y,z) → P'(x+kx·z, y+ky·z, 0)"""
+    if view == "orthogonal":
+        return 0.0, 0.0
+    if view == "oblique":
+        return angle_coefficients(angle_deg)
+    if view == "cavalier":
+        # 后退轴与水平成45°, 按原长绘制
+        return math.cos(math.radians(45)), math.sin(math.radians(45))
+    if view == "cabinet":
+        # 后退轴与水平成45°, 按一半长度绘制
+        return 0.5 * math.cos(math.radians(45)), 0.5 * math.sin(math.radians(45))
+    return preset_coefficients(angle_deg, view)
+
+
+def perspective_matrix(focal, center=(0.0, 0.0)):
+    """
+    透视投影的齐次矩阵
+    
+    视点位于 (cx, cy, focal), 投影面为xy平面:
+    [x, y, z, 1] → [f·x - cx·z, f·y - cy·z, 0, f - z], 齐次除法后
+    x' = cx + (x - cx)·f/(f - z), y' = cy + (y - cy)·f/(f - z)
+    
+    Args:
+        focal: 视点到投影面的距离
+        center: 视点在投影面上的垂足 (cx, cy)
+        
+    Returns:
+        4x4 齐次矩阵
+    """
+    cx, cy = center
+    return np.array([
+        [focal, 0, -cx, 0],
+        [0, focal, -cy, 0],
+        [0, 0, 0, 0],
+        [0, 0, -1, focal],
+    ], dtype=np.float64)
+
+
+def perspective_divide(projected, z, focal, near=NEAR_PLANE):
+    """
+    原地完成齐次除法; 近裁剪面之外的顶点没有投影, 置为NaN
+    
+    与这些顶点相连的棱和面不应整条丢弃, 用 clip_segments_near / clip_polygon_near
+    在近裁剪面处截断后再投影。
+    
+    Args:
+        projected: 齐次坐标的前三个分量 (N, 3), 结果直接写回
+        z: 原始顶点的z坐标 (N,)
+        focal: 视点到投影面的距离
+        near: 近裁剪面到视点的距离, 深度 w = f - z 小于该值的点(包括视点后方的点)置为NaN
+    
+    Returns:
+        近裁剪面之外的点的布尔掩码 (N,)
+    """
+    w = focal - z
+    outside = w < near
+    projected /= np.where(outside, 1, w)[:, np.newaxis]
+    projected[outside] = np.nan
+    return outside
+
+
+def clip_segments_near(segments, focal, near=NEAR_PLANE):
+    """
+    把线段裁剪到近裁剪面以内(深度 w = f - z ≥ near)
+    
+    一端在近裁剪面之外的线段, 该端点换成线段与平面 w = near 的交点(按深度线性插值);
+    两端都在之外的线段被丢弃。
+    
+    Args:
+        segments: 线段端点 (M, 2, 3)
+    
+    Returns:
+        裁剪后的线段 (K, 2, 3), K ≤ M
+    """
+    w = focal - segments[..., 2]
+    inside = w >= near
+    keep = inside.any(axis=1)
+    segments, w, inside = segments[keep], w[keep], inside[keep]
+    clipped = segments.copy()
+    for end, other in ((0, 1), (1, 0)):
+        out = ~inside[:, end]
+        # 外侧端点 w < near ≤ 内侧端点 w, 插值参数在 (0, 1] 内
+        t = (w[out, end] - near) / (w[out, end] - w[out, other])
+        clipped[out, end] += t[:, np.newaxis] * (segments[out, other] - segments[out, end])
+    return clipped
+
+
+def clip_polygon_near(polygon, focal, near=NEAR_PLANE):
+    """
+    用 Sutherland–Hodgman 算法把平面多边形裁剪到近裁剪面以内
+    
+    依次处理每条边 P→Q: P 在内侧时保留 P; P、Q 分处两侧时加入边与平面 w = near 的交点。
+    
+    Args:
+        polygon: 多边形顶点 (K, 3), 按边界顺序排列
+    
+    Returns:
+        裁剪后的多边形顶点 (L, 3); 完全在近裁剪面之外时 L = 0
+    """
+    w = focal - polygon[:, 2]
+    inside = w >= near
+    if inside.all():
+        return polygon
+    points = []
+    for i in range(len(polygon)):
+        j = (i + 1) % len(polygon)
+        if inside[i]:
+            points.append(polygon[i])
+        if inside[i] != inside[j]:
+            t = (w[i] - near) / (w[i] - w[j])
+            points.append(polygon[i] + t * (polygon[j] - polygon[i]))
+    return np.array(points, dtype=polygon.dtype).reshape(-1, 3)
+
+
+def perspective_points(points, focal, center):
+    """透视投影任意形状的点数组 (..., 3); 调用方保证点都在近裁剪面以内"""
+    matrix = perspective_matrix(focal, center)[:3, :3].astype(points.dtype)
+    projected = points @ matrix.T
+    projected /= (focal - points[..., 2])[..., np.newaxis]
+    return projected
+
+
+def project_views(vertices, views, angle_deg, out=None, focal=DEFAULT_FOCAL, near=NEAR_PLANE, center=None):
+    """
+    对同一组顶点一次性批量计算多个视图的投影
+    
+    平行投影视图一起交给 projection_core.project, 以系数数组的形式一次算出;
+    透视视图再用 perspective_matrix 的前三行前三列覆盖对应的结果, 原地做齐次除法。
+    
+    Args:
+        vertices: 共享的顶点数组 (N, 3)
+        views: 视图名称列表
+        angle_deg: 斜投影角度(度)
+        out: 可选的输出数组 (V, N, 3)
+        focal: 透视视图的焦距(视点到投影面的距离)
+        near: 透视视图的近裁剪面距离
+        center: 透视视点在投影面上的垂足, 默认取顶点的xy中心
+        
+    Returns:
+        各视图的投影点 (V, N, 3), 透视视图中近裁剪面之外的顶点为NaN(棱和面的截断见 clip_segments_near)
+    """
+    coefficients = np.array([(0.0, 0.0) if view == "perspective" else view_coefficients(view, angle_deg)
+                             for view in views], dtype=vertices.dtype).reshape(-1, 2)
+    result = project(vertices, coefficients[:, 0], coefficients[:, 1], SIGN_ADD, out=out)
+    for i, view in enumerate(views):
+        if view == "perspective":
+            if center is None:
+                center = vertices[:, :2].mean(axis=0)
+            matrix = perspective_matrix(focal, center)[:3, :3].astype(vertices.dtype)
+            np.matmul(vertices, matrix.T, out=result[i])
+            perspective_divide(result[i], vertices[:, 2], focal, near)
+    return result
+
+
+def added_artists(ax, before):
+    """子图中不在 before 里的图元(即刚刚新建的图元)"""
+    return [artist for artist in ax.get_children() if artist not in before]
+
+
+def add_segments(ax, segments, **style):
+    """用一个 Line3DCollection 绘制一组线段 (M, 2, 3), 返回该图元"""
+    lines = Line3DCollection(segments, **style)
+    ax.add_collection3d(lines)
+    return lines
+
+
+def remove_artists(artists):
+    """从图中移除图元"""
+    for artist in artists:
+        artist.remove()
 
 
 class ProjectionExperiment:
     """投影实验主类"""
     
-    def __init__(self, root):
+    POLL_INTERVAL_MS = 15  # 后台计算结果的轮询间隔(毫秒)
+    SPRING_FRAME_MS = 16  # 弹簧动画的帧间隔(毫秒), 约60帧/秒
+    SPRING_STATUS_EVERY = 15  # 弹簧模式下每隔多少帧刷新一次测量数据
+    
+    def __init__(self, root, dashboard_views=None):
+        """
+        Args:
+            root: Tk 根窗口
+            dashboard_views: 多视图模式显示的视图(VIEW_STYLES 中的名称), 默认 DASHBOARD_VIEWS;
+                运行中可以通过"多视图"菜单或 set_dashboard_views 修改
+        """
         self.root = root
         self.root.title("正投影与斜投影对比实验")
         self.root.geometry("1200x800")
         
-        # 实验参数
-        self.cube_size = 4.0  # 正方体边长
-        self.projection_angle = 30.0  # 斜投影角度(度)
-        self.projection_mode = "orthogonal"  # orthogonal或oblique
-        self.elevation = 20  # 视角仰角
-        self.azimuth = 45  # 视角方位角
+        # 性能分析钩子(默认关闭, 环境变量 PROJECTION_PROFILE=1 或菜单开启); 必须在绑定回调和建立依赖图之前包装
+        profiler.instrument(self, ["update_plot", "compute_scene", "render_scene", "draw_projection",
+                                   "draw_static", "draw_projected", "update_measurement_data"])
+        
+        self.init_state(dashboard_views)
         
         # 创建界面
+        self.create_menu()
         self.create_widgets()
         
+        # 几何与报告计算在后台线程中进行, 结果通过队列交回主循环
+        self.worker = LatestRequestWorker(self.compute_scene)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_worker)
+        
         # 绘制初始图形
         self.update_plot()
     
+    def init_state(self, dashboard_views=None):
+        """初始化实验参数(不涉及界面, 无窗口的脚本也可以调用)"""
+        self.cube_size = 4.0  # 正方体边长
+        self.dtype = resolve_dtype()  # 计算精度(可通过环境变量 PROJECTION_DTYPE 设置)
+        self.projection_angle = 30.0  # 斜投影角度(度)
+        self.projection_mode = "orthogonal"  # orthogonal或oblique
+        self.elevation = 20  # 视角仰角
+        self.azimuth = 45  # 视角方位角
+        # 多视图模式显示的视图
+        self.dashboard_views = check_dashboard_views(DASHBOARD_VIEWS if dashboard_views is None else dashboard_views)
+        self.dashboard_vars = {}  # "多视图"菜单中各视图的勾选状态(没有菜单时为空)
+        self.near_plane = NEAR_PLANE  # 透视投影的近裁剪面距离
+        self.spring_view = None  # 弹簧模式的动画视图
+        self.spring_job = None  # 弹簧动画的定时任务
+        self.rotate_cid = None  # 鼠标拖动旋转视角的回调连接
+        self.scene_lock = threading.Lock()  # compute_scene 可能同时被后台线程和主线程调用
+        self.scene_flow = self.build_scene_flow()  # 计算部分的依赖图(后台线程)
+        self.render_flow = self.build_render_flow()  # 绘图部分的依赖图(主线程)
+    
+    def create_menu(self):
+        """创建菜单栏"""
+        menubar = tk.Menu(self.root)
+        views_menu = tk.Menu(menubar, tearoff=0)
+        for view, (title, _, _) in VIEW_STYLES.items():
+            var = tk.BooleanVar(value=view in self.dashboard_views)
+            views_menu.add_checkbutton(label=title, variable=var, command=self.on_dashboard_views_change)
+            self.dashboard_vars[view] = var
+        menubar.add_cascade(label="多视图", menu=views_menu)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        self.profile_var = tk.BooleanVar(value=profiler.enabled)
+        tools_menu.add_checkbutton(label="性能分析", variable=self.profile_var, command=self.on_profile_toggle)
+        tools_menu.add_command(label="性能摘要", command=self.show_profile_summary)
+        menubar.add_cascade(label="工具", menu=tools_menu)
+        self.root.config(menu=menubar)
+    
     def create_widgets(self):
         """创建界面组件"""
         
@@ -61,6 +334,12 @@ class ProjectionExperiment:
                        value="oblique", command=self.on_mode_change).pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(mode_frame, text="对比模式", variable=self.mode_var, 
                        value="both", command=self.on_mode_change).pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(mode_frame, text="透视", variable=self.mode_var, 
+                       value="perspective", command=self.on_mode_change).pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(mode_frame, text="多视图", variable=self.mode_var, 
+                       value="dashboard", command=self.on_mode_change).pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(mode_frame, text="弹簧", variable=self.mode_var, 
+                       value="spring", command=self.on_mode_change).pack(side=tk.LEFT, padx=5)
         
         # 斜投影角度调节
         ttk.Label(control_frame, text="斜投影角度 (度):", font=("Arial", 12)).grid(row=3, column=0, sticky=tk.W, pady=5)
@@ -72,30 +351,40 @@ class ProjectionExperiment:
         self.angle_label = ttk.Label(control_frame, text=f"{self.angle_var.get():.1f}°")
         self.angle_label.grid(row=5, column=0, columnspan=2, pady=5)
         
+        # 透视焦距调节
+        focal_frame = ttk.Frame(control_frame)
+        focal_frame.grid(row=6, column=0, columnspan=2, sticky=tk.W+tk.E, pady=5)
+        ttk.Label(focal_frame, text="透视焦距:").pack(side=tk.LEFT)
+        self.focal_var = tk.DoubleVar(value=DEFAULT_FOCAL)
+        ttk.Scale(focal_frame, from_=2, to=40, variable=self.focal_var, 
+                 orient=tk.HORIZONTAL, command=self.on_focal_change).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.focal_label = ttk.Label(focal_frame, text=f"{self.focal_var.get():.1f}")
+        self.focal_label.pack(side=tk.LEFT)
+        
         # 视角控制
-        ttk.Label(control_frame, text="视角控制:", font=("Arial", 12, "bold")).grid(row=6, column=0, sticky=tk.W, pady=(20, 5))
+        ttk.Label(control_frame, text="视角控制:", font=("Arial", 12, "bold")).grid(row=7, column=0, sticky=tk.W, pady=(20, 5))
         
-        ttk.Label(control_frame, text="仰角:").grid(row=7, column=0, sticky=tk.W, pady=5)
+        ttk.Label(control_frame, text="仰角:").grid(row=8, column=0, sticky=tk.W, pady=5)
         self.elev_var = tk.DoubleVar(value=20)
         elev_scale = ttk.Scale(control_frame, from_=0, to=90, variable=self.elev_var, 
                               orient=tk.HORIZONTAL, command=self.on_view_change)
-        elev_scale.grid(row=8, column=0, columnspan=2, sticky=tk.W+tk.E, pady=5)
+        elev_scale.grid(row=9, column=0, columnspan=2, sticky=tk.W+tk.E, pady=5)
         
-        ttk.Label(control_frame, text="方位角:").grid(row=9, column=0, sticky=tk.W, pady=5)
+        ttk.Label(control_frame, text="方位角:").grid(row=10, column=0, sticky=tk.W, pady=5)
         self.azim_var = tk.DoubleVar(value=45)
         azim_scale = ttk.Scale(control_frame, from_=0, to=360, variable=self.azim_var, 
                               orient=tk.HORIZONTAL, command=self.on_view_change)
-        azim_scale.grid(row=10, column=0, columnspan=2, sticky=tk.W+tk.E, pady=5)
+        azim_scale.grid(row=11, column=0, columnspan=2, sticky=tk.W+tk.E, pady=5)
         
         # 测量数据显示
-        ttk.Label(control_frame, text="测量数据:", font=("Arial", 12, "bold")).grid(row=11, column=0, sticky=tk.W, pady=(20, 5))
+        ttk.Label(control_frame, text="测量数据:", font=("Arial", 12, "bold")).grid(row=12, column=0, sticky=tk.W, pady=(20, 5))
         
         self.data_text = tk.Text(control_frame, height=15, width=40, font=("Courier", 10))
-        self.data_text.grid(row=12, column=0, columnspan=2, pady=5)
+        self.data_text.grid(row=13, column=0, columnspan=2, pady=5)
         
         # 按钮
         button_frame = ttk.Frame(control_frame)
-        button_frame.grid(row=13, column=0, columnspan=2, pady=20)
+        button_frame.grid(row=14, column=0, columnspan=2, pady=20)
         
         ttk.Button(button_frame, text="刷新", command=self.update_plot).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="重置视角", command=self.reset_view).pack(side=tk.LEFT, padx=5)
@@ -114,37 +403,58 @@ class ProjectionExperiment:
         self.root.columnconfigure(1, weight=1)
         self.root.rowconfigure(0, weight=1)
     
-    def create_cube_vertices(self):
-        """创建正方体顶点"""
-        s = self.cube_size
+    def create_cube_vertices(self, cube_size):
+        """创建正方体顶点(边长由参数给出, 可在后台线程中调用)"""
+        s = cube_size
         vertices = np.array([
             [0, 0, 0], [s, 0, 0], [s, s, 0], [0, s, 0],  # 底面
             [0, 0, s], [s, 0, s], [s, s, s], [0, s, s]   # 顶面
-        ])
+        ], dtype=self.dtype)
         return vertices
     
     def create_cube_faces(self, vertices):
-        """创建正方体面"""
-        faces = [
-            [vertices[0], vertices[1], vertices[2], vertices[3]],  # 底面
-            [vertices[4], vertices[5], vertices[6], vertices[7]],  # 顶面
-            [vertices[0], vertices[1], vertices[5], vertices[4]],  # 前面
-            [vertices[2], vertices[3], vertices[7], vertices[6]],  # 后面
-            [vertices[0], vertices[3], vertices[7], vertices[4]],  # 左面
-            [vertices[1], vertices[2], vertices[6], vertices[5]]   # 右面
-        ]
-        return faces
+        """创建正方体面, 形状 (6, 4, 3)"""
+        return vertices[CUBOID_FACES]
+    
+    def create_static_geometry(self, vertices, cube_size):
+        """
+        预先计算与投影无关的静态几何: 正方体面、投影面网格和坐标轴范围
+        
+        只依赖顶点和 cube_size, 在依赖图中缓存; 切换模式重建子图时直接复用
+        """
+        grid = np.arange(-1, int(cube_size) + 2, dtype=self.dtype)
+        xx, yy = np.meshgrid(grid, grid)
+        x_range, y_range = self.default_limits(cube_size)
+        return {
+            'vertices': vertices,
+            'faces': self.create_cube_faces(vertices),
+            'plane': (xx, yy, np.zeros_like(xx)),
+            'xlim': x_range,
+            'ylim': y_range,
+            'zlim': [-1, cube_size + 2],
+        }
     
-    def orthogonal_projection(self, point):
-        """正投影: 垂直投影到xy平面"""
-        return np.array([point[0], point[1], 0])
+    def orthogonal_projection(self, point, out=None):
+        """正投影: 垂直投影到xy平面
+        
+        point可以是单个点或 (N, 3) 点数组(包括实现缓冲区协议的对象),
+        out为可选的输出数组, 结果直接写入其中
+        """
+        points = as_point_array(point, self.dtype)
+        result = project(points, 0.0, 0.0, SIGN_ADD, out=out)
+        return result[0] if np.ndim(point) == 1 and len(points) == 1 else result
     
-    def oblique_projection(self, point, angle_deg):
-        """斜投影: 按角度投影到xy平面，只在x方向产生变形"""
-        angle_rad = math.radians(angle_deg)
-        k = math.tan(angle_rad)
+    def oblique_projection(self, point, angle_deg, out=None):
+        """斜投影: 按角度投影到xy平面，只在x方向产生变形
+        
+        point可以是单个点或 (N, 3) 点数组(包括实现缓冲区协议的对象),
+        out为可选的输出数组, 结果直接写入其中
+        """
         # 只在x方向产生变形，y方向保持垂直投影
-        return np.array([point[0] + k * point[2], point[1], 0])
+        kx, ky = angle_coefficients(angle_deg)
+        points = as_point_array(point, self.dtype)
+        result = project(points, kx, ky, SIGN_ADD, out=out)
+        return result[0] if np.ndim(point) == 1 and len(points) == 1 else result
     
     def calculate_projection_length(self, vertices_proj):
         """计算投影边长"""
@@ -157,38 +467,298 @@ class ProjectionExperiment:
         ]
         return edges
     
-    def update_plot(self):
-        """更新绘图"""
-        self.fig.clear()
+    def snapshot_params(self):
+        """在主线程中读取当前界面参数和实验参数(后台线程不能访问Tk变量, 也不读取 self 上的属性)"""
+        return {
+            'cube_size': self.cube_size,
+            'near': self.near_plane,
+            'mode': self.mode_var.get(),
+            'angle': self.angle_var.get(),
+            'elev': self.elev_var.get(),
+            'azim': self.azim_var.get(),
+            'focal': self.focal_var.get(),
+            'dashboard_views': tuple(self.dashboard_views),
+        }
+    
+    def build_scene_flow(self):
+        """
+        计算部分的依赖图(在后台线程中使用)
         
-        mode = self.mode_var.get()
+        cube_size → vertices
+        vertices, views, angle, focal, near → projected → areas
+        cube_size, views, projected, areas, angle, focal, near → report
+        
+        各阶段只使用依赖图传入的参数, 不读取 self 上可能被主线程修改的属性
+        """
+        flow = Dataflow()
+        for name in ("cube_size", "views", "angle", "focal", "near"):
+            flow.add_param(name)
+        flow.add_stage("vertices", self.create_cube_vertices, ["cube_size"])
+        flow.add_stage("projected", lambda vertices, views, angle, focal, near:
+                       project_views(vertices, views, angle, focal=focal, near=near),
+                       ["vertices", "views", "angle", "focal", "near"])
+        flow.add_stage("areas", self.calculate_projection_areas, ["views", "projected"])
+        flow.add_stage("report", self.build_report,
+                       ["cube_size", "views", "projected", "areas", "angle", "focal", "near"])
+        return flow
+    
+    def scene_views(self, mode, dashboard_views=()):
+        """模式需要计算的视图; dashboard_views 为多视图模式显示的视图"""
+        views = ["orthogonal", "oblique"]
+        if mode == "dashboard":
+            views += [view for view in dashboard_views if view not in views]
+        elif mode == "perspective":
+            views.append("perspective")
+        return tuple(views)
+    
+    def calculate_projection_areas(self, views, projected):
+        """各视图投影体的轮廓面积(凸包面积); 含有近裁剪面之外顶点的视图为NaN"""
+        areas = hull_area(projected[..., :2])
+        areas[~np.isfinite(projected).all(axis=(1, 2))] = np.nan
+        return dict(zip(views, areas))
+    
+    def build_report(self, cube_size, views, projected, areas, angle, focal, near):
+        """由投影结果生成测量数据文本"""
+        scene = dict(zip(views, projected))
+        report = self.generate_measurement_report(cube_size, angle, scene['orthogonal'], scene['oblique'], areas)
+        if "perspective" in views:
+            report += self.generate_perspective_report(cube_size, focal, scene['perspective'], near)
+        return report
+    
+    def compute_scene(self, params):
+        """计算绘图和测量所需的全部数据(在后台线程中运行, 不访问界面组件)
+        
+        通过依赖图只重新计算参数改变所影响的阶段, 例如只改变视角时既不重新投影也不重新生成报告
+        """
+        views = self.scene_views(params['mode'], params.get('dashboard_views', DASHBOARD_VIEWS))
+        with self.scene_lock:
+            flow = self.scene_flow
+            # 没有透视视图时焦距不影响任何结果, 不让它使结果过期
+            flow.update(cube_size=params['cube_size'], views=views, angle=params['angle'],
+                        focal=params.get('focal', DEFAULT_FOCAL) if "perspective" in views else None,
+                        near=params.get('near', NEAR_PLANE))
+            (vertices, projected, areas, report), changed = flow.pull("vertices", "projected", "areas", "report")
+        
+        # 所有视图共用同一组顶点, 一次批量投影
+        scene = {
+            'params': params,
+            'vertices': vertices,
+            'views': list(views),
+            'projected': projected,
+            'areas': areas,
+            'report': report,
+            'changed': changed,  # 本次重新计算了的阶段
+        }
+        scene.update(zip(views, projected))
+        return scene
+    
+    def update_plot(self):
+        """更新绘图: 提交后台计算, 结果由 poll_worker 取回后绘制; 弹簧模式由动画定时器绘制"""
+        if self.mode_var.get() == "spring":
+            self.show_spring_view()
+            return
+        self.stop_spring_view()
+        self.worker.submit(self.snapshot_params())
+    
+    def show_spring_view(self):
+        """进入弹簧模式或更新其参数; 动画已在运行时只改变角度和视角, 不重建图形"""
+        angle, elev, azim = self.angle_var.get(), self.elev_var.get(), self.azim_var.get()
+        if self.spring_view is None:
+            # 弹簧视图会清空图形, 先释放依赖图中缓存的子图和图元, 回到其他模式时重新建立;
+            # 静态几何不依赖子图, 继续保留
+            self.render_flow.clear("axes")
+            self.spring_view = SpringAnimationView(self.fig, self.canvas, angle, elev, azim, dtype=self.dtype)
+            self.connect_rotation_sync()
+            self.spring_job = self.root.after(self.SPRING_FRAME_MS, self.spring_tick)
+        else:
+            self.spring_view.set_angle(angle)
+            self.spring_view.set_view(elev, azim)
+    
+    def stop_spring_view(self):
+        """离开弹簧模式: 停止动画"""
+        if self.spring_job is not None:
+            self.root.after_cancel(self.spring_job)
+            self.spring_job = None
+        if self.spring_view is not None:
+            self.spring_view.close()
+            self.spring_view = None
+    
+    def spring_tick(self):
+        """弹簧动画的一帧: 推进仿真, 用blitting只重绘曲线"""
+        view = self.spring_view
+        if view is None:
+            return
+        view.tick()
+        if view.frame_count % self.SPRING_STATUS_EVERY == 1:
+            self.update_measurement_data(view.status_text())
+        self.spring_job = self.root.after(self.SPRING_FRAME_MS, self.spring_tick)
+    
+    def poll_worker(self):
+        """定时检查后台计算结果, 过期的结果已被丢弃"""
+        item = self.worker.poll()
+        if item is not None:
+            generation, scene, error = item
+            if error is not None:
+                self.data_text.delete(1.0, tk.END)
+                self.data_text.insert(1.0, f"计算出错: {error}\n")
+            elif self.spring_view is None:
+                # 切换到弹簧模式之前提交的计算结果不再绘制
+                self.render_scene(scene)
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_worker)
+    
+    def build_render_flow(self):
+        """
+        绘图部分的依赖图(在主线程中使用)
         
+        vertices, cube_size → static_geometry: 正方体面、投影面网格和坐标轴范围(数组), 不随布局改变
+        layout → axes → static_artists: 正方体、顶点和投影面, 只随子图和静态几何改变
+                      → projection_artists: 投射线和投影图形, 随投影点改变
+                      → camera_view: 只调用 view_init
+        report → report_text
+        """
+        flow = Dataflow()
+        for name in ("layout", "cube_size", "vertices", "views", "projected", "focal", "near", "camera", "report"):
+            flow.add_param(name)
+        flow.add_stage("axes", self.build_axes, ["layout"])
+        flow.add_stage("static_geometry", self.create_static_geometry, ["vertices", "cube_size"])
+        flow.add_stage("static_artists", self.draw_static_scene, ["axes", "static_geometry"],
+                       dispose=remove_artists)
+        flow.add_stage("projection_artists", self.draw_projection_artists,
+                       ["axes", "static_artists", "cube_size", "vertices", "views", "projected", "focal", "near"],
+                       dispose=remove_artists)
+        flow.add_stage("camera_view", self.apply_camera, ["axes", "camera"])
+        flow.add_stage("report_text", self.update_measurement_data, ["report"])
+        return flow
+    
+    def render_scene(self, scene):
+        """在主线程中根据计算结果绘图; 只重建参数改变所影响的图元"""
+        params = scene['params']
+        mode = params['mode']
+        views = tuple(scene['views'])
+        self.render_flow.update(
+            layout=(mode, tuple(params.get('dashboard_views', DASHBOARD_VIEWS)) if mode == "dashboard" else ()),
+            cube_size=params['cube_size'],
+            vertices=scene['vertices'],
+            views=views,
+            projected=scene['projected'],
+            focal=params.get('focal', DEFAULT_FOCAL) if "perspective" in views else None,
+            near=params.get('near', NEAR_PLANE) if "perspective" in views else None,
+            # 视角以滑块的当前值为准: 计算期间滑块或鼠标改变了视角时, 旧结果不会把视角拉回去
+            camera=(self.elev_var.get(), self.azim_var.get()),
+            report=scene['report'],
+        )
+        _, changed = self.render_flow.pull("projection_artists", "camera_view", "report_text")
+        if changed - {"report_text"}:
+            # 合并到下一次空闲时重绘, 避免连续事件反复阻塞主循环
+            self.canvas.draw_idle()
+    
+    def build_axes(self, layout):
+        """按布局重建子图, 返回 [(子图, 视图名称)]"""
+        mode, dashboard_views = layout
+        self.fig.clear()
         if mode == "both":
             # 对比模式: 左右两个子图
-            ax1 = self.fig.add_subplot(121, projection='3d')
-            ax2 = self.fig.add_subplot(122, projection='3d')
-            self.draw_projection(ax1, "orthogonal")
-            self.draw_projection(ax2, "oblique")
-            ax1.set_title("正投影", fontsize=14, fontweight='bold')
-            ax2.set_title("斜投影", fontsize=14, fontweight='bold')
+            views, rows, cols, fontsize = ["orthogonal", "oblique"], 1, 2, 14
+        elif mode == "dashboard":
+            # 多视图模式: 网格排列, 所有视图来自同一次批量投影
+            views = list(dashboard_views)
+            cols = math.ceil(math.sqrt(len(views)))
+            rows = math.ceil(len(views) / cols)
+            fontsize = 11
         else:
             # 单一模式
-            ax = self.fig.add_subplot(111, projection='3d')
-            self.draw_projection(ax, mode)
-            title = "正投影" if mode == "orthogonal" else "斜投影"
-            ax.set_title(title, fontsize=14, fontweight='bold')
+            views, rows, cols, fontsize = [mode], 1, 1, 14
+        axes = []
+        for i, view in enumerate(views):
+            ax = self.fig.add_subplot(rows, cols, i + 1, projection='3d')
+            ax.set_title(VIEW_STYLES[view][0], fontsize=fontsize, fontweight='bold')
+            axes.append((ax, view))
+        self.connect_rotation_sync()
+        return axes
+    
+    def draw_static_scene(self, axes, geometry):
+        """在所有子图中绘制与投影无关的部分, 返回新建的图元"""
+        artists = []
+        for ax, _ in axes:
+            artists += self.draw_static(ax, geometry)
+        return artists
+    
+    def draw_projection_artists(self, axes, static_artists, cube_size, vertices, views, projected, focal, near):
+        """在各子图中绘制对应视图的投影部分, 返回新建的图元"""
+        scene = {'vertices': vertices, 'params': {'cube_size': cube_size, 'focal': focal, 'near': near}}
+        scene.update(zip(views, projected))
+        artists = []
+        for ax, view in axes:
+            artists += self.draw_projected(ax, view, scene)
+        return artists
+    
+    def apply_camera(self, axes, camera):
+        """只改变各子图的视角"""
+        elev, azim = camera
+        for ax, _ in axes:
+            ax.view_init(elev=elev, azim=azim)
+        return camera
+    
+    def apply_view(self, elev, azim):
+        """只改变视角(所有子图或弹簧视图), 不重新计算几何和报告"""
+        if self.spring_view is not None:
+            self.spring_view.set_view(elev, azim)
+            return False
+        if self.render_flow.is_dirty("axes"):
+            # 还没有建立子图, 下一次 render_scene 会使用滑块的当前值
+            return False
+        self.render_flow.set("camera", (elev, azim))
+        _, changed = self.render_flow.pull("camera_view")
+        return bool(changed)
+    
+    def connect_rotation_sync(self):
+        """
+        连接鼠标拖动旋转的同步回调
         
-        self.canvas.draw()
-        self.update_measurement_data()
+        Axes3D 在创建时连接自己的旋转回调, 所以每次重建子图后重新连接,
+        保证本回调在 matplotlib 旋转之后执行、读到的是新视角
+        """
+        if self.rotate_cid is not None:
+            self.canvas.mpl_disconnect(self.rotate_cid)
+        self.rotate_cid = self.canvas.mpl_connect('motion_notify_event', self.on_mouse_rotate)
+    
+    def on_mouse_rotate(self, event):
+        """鼠标拖动旋转三维子图后把视角同步到滑块和其他子图"""
+        ax = event.inaxes
+        if event.button is None or ax is None or ax.name != '3d':
+            return
+        elev, azim = ax.elev, ax.azim % 360
+        if (elev, azim) == (self.elev_var.get(), self.azim_var.get()):
+            return
+        # 设置变量不会触发 ttk.Scale 的 command, 因此不会引起重新计算
+        self.elev_var.set(elev)
+        self.azim_var.set(azim)
+        # matplotlib 旋转后已经请求重绘, 这里只需同步其他子图的视角
+        self.apply_view(elev, azim)
+    
+    def default_limits(self, cube_size):
+        """坐标轴范围 - 扩大范围以适应斜投影"""
+        # 计算斜投影的最大可能范围
+        max_projection_extension = cube_size * math.tan(math.radians(MAX_PROJECTION_ANGLE))
+        max_range = cube_size + max_projection_extension + 2  # 额外留出空间
+        return [-2, max_range], [-2, max_range]
+    
+    def draw_projection(self, ax, mode, scene=None):
+        """在一个子图中完整绘制某个视图: 静态部分、投影部分和视角"""
+        if scene is None:
+            scene = self.compute_scene(self.snapshot_params())
+        params = scene['params']
+        self.draw_static(ax, self.create_static_geometry(scene['vertices'], params['cube_size']))
+        self.draw_projected(ax, mode, scene)
+        ax.view_init(elev=params['elev'], azim=params['azim'])
     
-    def draw_projection(self, ax, mode):
-        """绘制投影"""
-        # 创建正方体
-        vertices = self.create_cube_vertices()
-        faces = self.create_cube_faces(vertices)
+    def draw_static(self, ax, geometry):
+        """用预先计算的静态几何(见 create_static_geometry)绘制正方体、顶点、投影面并设置坐标轴, 返回新建的图元"""
+        before = set(ax.get_children())
+        vertices = geometry['vertices']
         
         # 绘制正方体
-        cube = Poly3DCollection(faces, alpha=0.3, facecolor='cyan', edgecolor='blue', linewidth=2)
+        cube = Poly3DCollection(geometry['faces'], alpha=0.3, facecolor='cyan', edgecolor='blue', linewidth=2)
         ax.add_collection3d(cube)
         
         # 绘制正方体顶点
@@ -196,189 +766,154 @@ class ProjectionExperiment:
                   color='blue', s=50, alpha=0.8)
         
         # 绘制投影面(xy平面)
-        xx, yy = np.meshgrid(range(-1, int(self.cube_size)+2), range(-1, int(self.cube_size)+2))
-        zz = np.zeros_like(xx)
-        ax.plot_surface(xx, yy, zz, alpha=0.2, color='lightgray')
-        
-        # 计算投影点
-        if mode == "orthogonal":
-            vertices_proj = np.array([self.orthogonal_projection(v) for v in vertices])
-            line_color = 'red'
-            face_color = 'lightcoral'  # 正投影面颜色
-        else:
-            angle = self.angle_var.get()
-            vertices_proj = np.array([self.oblique_projection(v, angle) for v in vertices])
-            line_color = 'green'
-            face_color = 'lightgreen'  # 斜投影面颜色
+        ax.plot_surface(*geometry['plane'], alpha=0.2, color='lightgray')
         
-        # 绘制投射线
-        for i, (v, vp) in enumerate(zip(vertices, vertices_proj)):
-            ax.plot([v[0], vp[0]], [v[1], vp[1]], [v[2], vp[2]], 
-                   color=line_color, linewidth=1.5, alpha=0.7)
+        # 设置坐标轴
+        ax.set_xlabel('X (cm)', fontsize=10)
+        ax.set_ylabel('Y (cm)', fontsize=10)
+        ax.set_zlabel('Z (cm)', fontsize=10)
+        
+        ax.set_xlim(geometry['xlim'])
+        ax.set_ylim(geometry['ylim'])
+        ax.set_zlim(geometry['zlim'])
+        
+        # 设置纵横比
+        ax.set_box_aspect([1, 1, 0.8])
+        return added_artists(ax, before)
+    
+    def draw_projected(self, ax, mode, scene):
+        """绘制某个视图的投射线和投影图形, 返回新建的图元"""
+        before = set(ax.get_children())
+        vertices = scene['vertices']
+        
+        # 投影点(已在后台计算)
+        vertices_proj = scene[mode]
+        _, line_color, face_color = VIEW_STYLES[mode]
+        
+        # 绘制投射线: 每个顶点到其投影点一条线段, 合并为一个图元
+        add_segments(ax, np.stack([vertices, vertices_proj], axis=1),
+                     colors=line_color, linewidths=1.5, alpha=0.7)
         
         # 绘制投影点
         ax.scatter(vertices_proj[:, 0], vertices_proj[:, 1], vertices_proj[:, 2], 
                   color=line_color, s=50, alpha=0.8)
         
-        # 绘制投影图形(底面四个点的投影)
-        proj_bottom = vertices_proj[:4]
-        
         # 绘制投影的边框，使其更加明显
-        for i in range(4):
-            j = (i + 1) % 4
-            ax.plot([proj_bottom[i, 0], proj_bottom[j, 0]], 
-                   [proj_bottom[i, 1], proj_bottom[j, 1]], 
-                   [proj_bottom[i, 2], proj_bottom[j, 2]], 
-                   color=line_color, linewidth=3, alpha=0.9)
-        
-        # 绘制投影面 - 连接四个投影点形成投影面
-        # 创建投影面的四个顶点（按顺序连接）
-        proj_face_vertices = [
-            proj_bottom[0],  # 第一个投影点
-            proj_bottom[1],  # 第二个投影点  
-            proj_bottom[2],  # 第三个投影点
-            proj_bottom[3]   # 第四个投影点
-        ]
+        bottom_edges = self.projected_edges(scene, mode, BOTTOM_EDGES)
+        add_segments(ax, bottom_edges, colors=line_color, linewidths=3, alpha=0.9)
         
-        # 使用Poly3DCollection绘制填充的投影面
-        proj_faces = [proj_face_vertices]
-        proj_surface = Poly3DCollection(proj_faces, alpha=0.4, facecolor=face_color, edgecolor=line_color, linewidth=3)
+        # 使用Poly3DCollection绘制填充的投影面(底面四个点的投影按顺序连接)
+        proj_surface = Poly3DCollection(self.projected_faces(scene, mode, CUBOID_FACES[:1]),
+                                        alpha=0.4, facecolor=face_color, edgecolor=line_color, linewidth=3)
         ax.add_collection3d(proj_surface)
         
-        # 额外绘制投影面的对角线，更清楚地显示投影面的形状
-        if mode == "oblique":
-            # 绘制对角线以更好地显示斜投影面的形状
-            ax.plot([proj_bottom[0, 0], proj_bottom[2, 0]], 
-                   [proj_bottom[0, 1], proj_bottom[2, 1]], 
-                   [proj_bottom[0, 2], proj_bottom[2, 2]], 
-                   color=line_color, linewidth=1, alpha=0.5, linestyle='--')
-            ax.plot([proj_bottom[1, 0], proj_bottom[3, 0]], 
-                   [proj_bottom[1, 1], proj_bottom[3, 1]], 
-                   [proj_bottom[1, 2], proj_bottom[3, 2]], 
-                   color=line_color, linewidth=1, alpha=0.5, linestyle='--')
-        
-        # 绘制完整的投影面（包括顶面投影）
-        # 对于斜投影，需要绘制完整的投影体，而不仅仅是底面
-        if mode == "oblique":
-            # 绘制顶面投影
-            proj_top = vertices_proj[4:]
-            for i in range(4):
-                j = (i + 1) % 4
-                ax.plot([proj_top[i, 0], proj_top[j, 0]], 
-                       [proj_top[i, 1], proj_top[j, 1]], 
-                       [proj_top[i, 2], proj_top[j, 2]], 
-                       color=line_color, linewidth=2, alpha=0.7)
-            
-            # 绘制侧面投影线
-            for i in range(4):
-                ax.plot([proj_bottom[i, 0], proj_top[i, 0]], 
-                       [proj_bottom[i, 1], proj_top[i, 1]], 
-                       [proj_bottom[i, 2], proj_top[i, 2]], 
-                       color=line_color, linewidth=2, alpha=0.7)
-            
-            # 绘制完整的投影体面
-            proj_faces = [
-                [proj_bottom[0], proj_bottom[1], proj_bottom[2], proj_bottom[3]],  # 底面
-                [proj_top[0], proj_top[1], proj_top[2], proj_top[3]],  # 顶面
-                [proj_bottom[0], proj_bottom[1], proj_top[1], proj_top[0]],  # 前面
-                [proj_bottom[2], proj_bottom[3], proj_top[3], proj_top[2]],  # 后面
-                [proj_bottom[0], proj_bottom[3], proj_top[3], proj_top[0]],  # 左面
-                [proj_bottom[1], proj_bottom[2], proj_top[2], proj_top[1]]   # 右面
-            ]
-            
-            proj_body = Poly3DCollection(proj_faces, alpha=0.2, facecolor=face_color, edgecolor=line_color, linewidth=1)
-            ax.add_collection3d(proj_body)
-        
-        # 对于正投影，也绘制完整的投影体
-        elif mode == "orthogonal":
-            # 绘制顶面投影（正投影的顶面投影与底面重合）
-            proj_top = vertices_proj[4:]
-            for i in range(4):
-                j = (i + 1) % 4
-                ax.plot([proj_top[i, 0], proj_top[j, 0]], 
-                       [proj_top[i, 1], proj_top[j, 1]], 
-                       [proj_top[i, 2], proj_top[j, 2]], 
-                       color=line_color, linewidth=2, alpha=0.7)
-            
-            # 绘制侧面投影线（正投影的侧面投影为垂直线）
-            for i in range(4):
-                ax.plot([proj_bottom[i, 0], proj_top[i, 0]], 
-                       [proj_bottom[i, 1], proj_top[i, 1]], 
-                       [proj_bottom[i, 2], proj_top[i, 2]], 
-                       color=line_color, linewidth=2, alpha=0.7)
-            
-            # 绘制完整的投影体面
-            proj_faces = [
-                [proj_bottom[0], proj_bottom[1], proj_bottom[2], proj_bottom[3]],  # 底面
-                [proj_top[0], proj_top[1], proj_top[2], proj_top[3]],  # 顶面
-                [proj_bottom[0], proj_bottom[1], proj_top[1], proj_top[0]],  # 前面
-                [proj_bottom[2], proj_bottom[3], proj_top[3], proj_top[2]],  # 后面
-                [proj_bottom[0], proj_bottom[3], proj_top[3], proj_top[0]],  # 左面
-                [proj_bottom[1], proj_bottom[2], proj_top[2], proj_top[1]]   # 右面
-            ]
-            
-            proj_body = Poly3DCollection(proj_faces, alpha=0.2, facecolor=face_color, edgecolor=line_color, linewidth=1)
-            ax.add_collection3d(proj_body)
+        # 额外绘制投影面的对角线，更清楚地显示斜投影面的形状
+        if mode != "orthogonal":
+            add_segments(ax, self.projected_edges(scene, mode, BOTTOM_DIAGONALS), colors=line_color,
+                         linewidths=1, alpha=0.5, linestyles='--')
         
-        # 设置坐标轴
-        ax.set_xlabel('X (cm)', fontsize=10)
-        ax.set_ylabel('Y (cm)', fontsize=10)
-        ax.set_zlabel('Z (cm)', fontsize=10)
+        # 绘制完整的投影体（包括顶面投影和侧面投影线）
+        # 正投影的顶面投影与底面重合, 侧面投影为垂直线
+        top_side_edges = self.projected_edges(scene, mode, TOP_SIDE_EDGES)
+        add_segments(ax, top_side_edges, colors=line_color, linewidths=2, alpha=0.7)
         
-        # 设置视角
-        ax.view_init(elev=self.elev_var.get(), azim=self.azim_var.get())
+        # 绘制完整的投影体面
+        proj_body = Poly3DCollection(self.projected_faces(scene, mode, CUBOID_FACES),
+                                     alpha=0.2, facecolor=face_color, edgecolor=line_color, linewidth=1)
+        ax.add_collection3d(proj_body)
         
-        # 设置坐标轴范围 - 扩大范围以适应斜投影
-        # 计算斜投影的最大可能范围
-        max_angle = 60  # 最大角度
-        max_projection_extension = self.cube_size * math.tan(math.radians(max_angle))
-        max_range = self.cube_size + max_projection_extension + 2  # 额外留出空间
-        
-        ax.set_xlim([-2, max_range])
-        ax.set_ylim([-2, max_range])
-        ax.set_zlim([-1, self.cube_size + 2])
-        
-        # 设置纵横比
-        ax.set_box_aspect([1, 1, 0.8])
+        if mode == "perspective":
+            # 透视放大后的顶面, 以及在近裁剪面处截断的棱(截断点放大 f/near 倍), 可能超出默认范围
+            self.draw_perspective_eye(ax, scene)
+            x_range, y_range = self.default_limits(scene['params']['cube_size'])
+            points = np.concatenate([bottom_edges, top_side_edges]).reshape(-1, 3)
+            if len(points):
+                x_range = [min(x_range[0], points[:, 0].min() - 1), max(x_range[1], points[:, 0].max() + 1)]
+                y_range = [min(y_range[0], points[:, 1].min() - 1), max(y_range[1], points[:, 1].max() + 1)]
+            ax.set_xlim(x_range)
+            ax.set_ylim(y_range)
+        return added_artists(ax, before)
+    
+    def perspective_params(self, scene):
+        """透视视图的焦距、近裁剪面距离和视点垂足(与 project_views 的默认值一致)"""
+        params = scene['params']
+        center = scene['vertices'][:, :2].mean(axis=0)
+        return params.get('focal', DEFAULT_FOCAL), params.get('near', NEAR_PLANE), center
     
-    def update_measurement_data(self):
+    def projected_edges(self, scene, mode, edges):
+        """视图中棱边 (M, 2) 的投影线段; 透视视图的棱先在近裁剪面处截断, 再投影截断后的端点"""
+        if mode != "perspective":
+            return scene[mode][edges]
+        focal, near, center = self.perspective_params(scene)
+        return perspective_points(clip_segments_near(scene['vertices'][edges], focal, near), focal, center)
+    
+    def projected_faces(self, scene, mode, faces):
+        """视图中各面 (F, K) 的投影多边形; 透视视图的面先在近裁剪面处截断, 完全在其外的面不绘制"""
+        if mode != "perspective":
+            return list(scene[mode][faces])
+        focal, near, center = self.perspective_params(scene)
+        polygons = [clip_polygon_near(face, focal, near) for face in scene['vertices'][faces]]
+        return [perspective_points(polygon, focal, center) for polygon in polygons if len(polygon) >= 3]
+    
+    def draw_perspective_eye(self, ax, scene):
+        """绘制透视视点以及视点到顶面顶点的视线"""
+        vertices = scene['vertices']
+        focal = scene['params'].get('focal', DEFAULT_FOCAL)
+        cx, cy = vertices[:, :2].mean(axis=0)
+        _, line_color, _ = VIEW_STYLES["perspective"]
+        ax.scatter([cx], [cy], [focal], color=line_color, s=80, marker='*')
+        eye = np.broadcast_to(np.array([cx, cy, focal], dtype=vertices.dtype), vertices[4:].shape)
+        add_segments(ax, np.stack([eye, vertices[4:]], axis=1), colors=line_color, linewidths=1,
+                     alpha=0.4, linestyles=':')
+    
+    def update_measurement_data(self, report=None):
         """更新测量数据"""
+        if report is None:
+            scene = self.compute_scene(self.snapshot_params())
+            report = scene['report']
         self.data_text.delete(1.0, tk.END)
+        self.data_text.insert(1.0, report)
+    
+    def generate_measurement_report(self, cube_size, angle, vertices_ortho, vertices_oblique, areas=None):
+        """生成测量数据文本(纯计算, 可在后台线程中调用)
         
-        vertices = self.create_cube_vertices()
-        
+        cube_size为正方体边长; areas为可选的各视图投影轮廓面积(见 calculate_projection_areas)
+        """
         # 正投影数据
-        vertices_ortho = np.array([self.orthogonal_projection(v) for v in vertices])
         edges_ortho = self.calculate_projection_length(vertices_ortho)
         
         # 斜投影数据
-        angle = self.angle_var.get()
-        vertices_oblique = np.array([self.oblique_projection(v, angle) for v in vertices])
         edges_oblique = self.calculate_projection_length(vertices_oblique)
         
         # 显示数据
         data = "=" * 35 + "\n"
         data += "正方体原始尺寸\n"
         data += "=" * 35 + "\n"
-        data += f"边长: {self.cube_size:.2f} cm\n"
-        data += f"体积: {self.cube_size**3:.2f} cm³\n\n"
+        data += f"边长: {cube_size:.2f} cm\n"
+        data += f"体积: {cube_size**3:.2f} cm³\n\n"
         
         data += "=" * 35 + "\n"
         data += "正投影测量数据\n"
         data += "=" * 35 + "\n"
         edge_names = ["AB", "BC", "CD", "DA"]
         for name, length in zip(edge_names, edges_ortho):
-            ratio = (length / self.cube_size) * 100
+            ratio = (length / cube_size) * 100
             data += f"{name}边: {length:.2f} cm ({ratio:.1f}%)\n"
-        data += f"平均长度: {np.mean(edges_ortho):.2f} cm\n\n"
+        data += f"平均长度: {np.mean(edges_ortho):.2f} cm\n"
+        if areas is not None:
+            data += f"投影面积: {areas['orthogonal']:.2f} cm²\n"
+        data += "\n"
         
         data += "=" * 35 + "\n"
         data += f"斜投影测量数据 (角度: {angle:.1f}°)\n"
         data += "=" * 35 + "\n"
         for name, length in zip(edge_names, edges_oblique):
-            ratio = (length / self.cube_size) * 100
+            ratio = (length / cube_size) * 100
             data += f"{name}边: {length:.2f} cm ({ratio:.1f}%)\n"
-        data += f"平均长度: {np.mean(edges_oblique):.2f} cm\n\n"
+        data += f"平均长度: {np.mean(edges_oblique):.2f} cm\n"
+        if areas is not None:
+            data += f"投影面积: {areas['oblique']:.2f} cm²\n"
+        data += "\n"
         
         # 理论变形系数
         theoretical_ratio = 1 / math.cos(math.radians(angle)) if angle > 0 else 1.0
@@ -386,10 +921,30 @@ class ProjectionExperiment:
         data += "理论分析\n"
         data += "=" * 35 + "\n"
         data += f"理论变形系数: {theoretical_ratio:.4f}\n"
-        data += f"实际变形系数: {np.mean(edges_oblique)/self.cube_size:.4f}\n"
-        data += f"误差: {abs(theoretical_ratio - np.mean(edges_oblique)/self.cube_size):.4f}\n"
+        data += f"实际变形系数: {np.mean(edges_oblique)/cube_size:.4f}\n"
+        data += f"误差: {abs(theoretical_ratio - np.mean(edges_oblique)/cube_size):.4f}\n"
         
-        self.data_text.insert(1.0, data)
+        return data
+    
+    def generate_perspective_report(self, cube_size, focal, vertices_persp, near=NEAR_PLANE):
+        """生成透视投影测量数据文本(纯计算, 可在后台线程中调用)"""
+        s = cube_size
+        edge_names = ["AB", "BC", "CD", "DA"]
+        data = "\n" + "=" * 35 + "\n"
+        data += f"透视投影测量数据 (焦距: {focal:.1f})\n"
+        data += "=" * 35 + "\n"
+        outside = int(np.isnan(vertices_persp).any(axis=1).sum())
+        if outside:
+            data += f"近裁剪面之外的顶点: {outside} 个 (相连的棱和面在近裁剪面处截断)\n"
+        for label, face in (("底面", vertices_persp[:4]), ("顶面", vertices_persp[4:])):
+            edges = self.calculate_projection_length(face)
+            data += f"{label}: " + ", ".join(f"{name} {length:.2f}" for name, length in zip(edge_names, edges)) + "\n"
+        # 距投影面 z 的平面被放大 f/(f - z) 倍
+        if focal - s >= near:
+            data += f"顶面理论放大系数: {focal / (focal - s):.4f}\n"
+        else:
+            data += "顶面位于近裁剪面之外\n"
+        return data
     
     def on_mode_change(self):
         """投影模式改变"""
@@ -398,18 +953,57 @@ class ProjectionExperiment:
     def on_angle_change(self, value):
         """角度改变"""
         self.angle_label.config(text=f"{self.angle_var.get():.1f}°")
-        if self.mode_var.get() in ["oblique", "both"]:
+        if self.mode_var.get() in ["oblique", "both", "dashboard", "spring"]:
+            self.update_plot()
+    
+    def on_focal_change(self, value):
+        """透视焦距改变"""
+        self.focal_label.config(text=f"{self.focal_var.get():.1f}")
+        mode = self.mode_var.get()
+        if mode == "perspective" or (mode == "dashboard" and "perspective" in self.dashboard_views):
+            self.update_plot()
+    
+    def on_dashboard_views_change(self):
+        """多视图菜单的勾选改变: 已选视图保持原有顺序, 新勾选的排在最后; 不允许全部取消"""
+        views = [view for view in self.dashboard_views if self.dashboard_vars[view].get()]
+        views += [view for view, var in self.dashboard_vars.items() if var.get() and view not in views]
+        if not views:
+            self.dashboard_vars[self.dashboard_views[0]].set(True)
+            return
+        self.set_dashboard_views(views)
+    
+    def set_dashboard_views(self, views):
+        """设置多视图模式显示的视图(VIEW_STYLES 中的名称), 处于多视图模式时重新绘制"""
+        self.dashboard_views = check_dashboard_views(views)
+        for view, var in self.dashboard_vars.items():
+            var.set(view in self.dashboard_views)
+        if self.mode_var.get() == "dashboard":
             self.update_plot()
     
     def on_view_change(self, value):
-        """视角改变"""
-        self.update_plot()
+        """视角改变: 只更新视角"""
+        if self.apply_view(self.elev_var.get(), self.azim_var.get()):
+            self.canvas.draw_idle()
     
     def reset_view(self):
         """重置视角"""
         self.elev_var.set(20)
         self.azim_var.set(45)
-        self.update_plot()
+        self.on_view_change(None)
+    
+    def on_profile_toggle(self):
+        """开启或关闭性能分析"""
+        profiler.set_enabled(self.profile_var.get())
+    
+    def show_profile_summary(self):
+        """显示最近的性能记录摘要"""
+        messagebox.showinfo("性能摘要", profiler.summary_text())
+    
+    def on_close(self):
+        """关闭窗口时停止后台线程和动画"""
+        self.stop_spring_view()
+        self.worker.stop()
+        self.root.destroy()
     
     def show_help(self):
         """显示帮助信息"""
@@ -422,9 +1016,9 @@ class ProjectionExperiment:
 3. 观察不同投影方式下物体形状的变化规律
 
 【使用说明】
-1. 选择投影模式: 正投影、斜投影或对比模式
-2. 调节斜投影角度滑块,观察投影变化
-3. 调节视角滑块,从不同角度观察
+1. 选择投影模式: 正投影、斜投影、对比模式、透视、多视图或弹簧
+2. 调节斜投影角度滑块,观察投影变化; 透视模式下调节焦距滑块
+3. 调节视角滑块或用鼠标拖动三维图形,从不同角度观察(两者保持同步)
 4. 查看右侧测量数据,分析投影特性
 
 【投影原理】
@@ -436,6 +1030,14 @@ class ProjectionExperiment:
   - 投影产生变形,变形系数 = 1/cos(θ)
   - 适用于艺术表现
 
+• 透视投影: 投射线汇聚于视点
+  - 近大远小, 放大系数 = f/(f - z)
+  - 离视点过近的部分被近裁剪面裁掉
+
+• 弹簧模式: 弹簧按胡克定律振动
+  - 螺旋线及其斜投影随长度实时伸缩
+  - 斜投影中轴线的偏移 = tan(θ)·L
+
 【开发者】
 实验教学辅助程序
 版本: 1.0
@@ -451,4 +1053,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的程序中, 误差分析的子进程从这里启动, 不能再打开一个窗口
+    multiprocessing.freeze_support()
     main()
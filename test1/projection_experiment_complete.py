@@ -14,6 +14,8 @@ from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
 import math
+from precision import as_point_array, resolve_dtype
+from projection_core import SIGN_ADD, angle_coefficients, project
 
 class ProjectionExperiment:
     """投影实验主类"""
@@ -25,6 +27,7 @@ class ProjectionExperiment:
         
         # 实验参数
         self.cube_size = 4.0  # 正方体边长
+        self.dtype = resolve_dtype()  # 计算精度(可通过环境变量 PROJECTION_DTYPE 设置)
         self.projection_angle = 30.0  # 斜投影角度(度)
         self.projection_mode = "orthogonal"  # orthogonal或oblique
         self.elevation = 20  # 视角仰角
@@ -114,7 +117,7 @@ class ProjectionExperiment:
         vertices = np.array([
             [0, 0, 0], [s, 0, 0], [s, s, 0], [0, s, 0],  # 底面
             [0, 0, s], [s, 0, s], [s, s, s], [0, s, s]   # 顶面
-        ])
+        ], dtype=self.dtype)
         return vertices
     
     def create_cube_faces(self, vertices):
@@ -129,16 +132,27 @@ class ProjectionExperiment:
         ]
         return faces
     
-    def orthogonal_projection(self, point):
-        """正投影: 垂直投影到xy平面"""
-        return np.array([point[0], point[1], 0])
+    def orthogonal_projection(self, point, out=None):
+        """正投影: 垂直投影到xy平面
+        
+        point可以是单个点或 (N, 3) 点数组(包括实现缓冲区协议的对象),
+        out为可选的输出数组, 结果直接写入其中
+        """
+        points = as_point_array(point, self.dtype)
+        result = project(points, 0.0, 0.0, SIGN_ADD, out=out)
+        return result[0] if np.ndim(point) == 1 and len(points) == 1 else result
     
-    def oblique_projection(self, point, angle_deg):
-        """正确的斜投影算法: 只在x方向产生变形"""
-        angle_rad = math.radians(angle_deg)
-        k = math.tan(angle_rad)
+    def oblique_projection(self, point, angle_deg, out=None):
+        """正确的斜投影算法: 只在x方向产生变形
+        
+        point可以是单个点或 (N, 3) 点数组(包括实现缓冲区协议的对象),
+        out为可选的输出数组, 结果直接写入其中
+        """
         # 只在x方向产生变形，y方向保持不变
-        return np.array([point[0] + k * point[2], point[1], 0])
+        kx, ky = angle_coefficients(angle_deg)
+        points = as_point_array(point, self.dtype)
+        result = project(points, kx, ky, SIGN_ADD, out=out)
+        return result[0] if np.ndim(point) == 1 and len(points) == 1 else result
     
     def calculate_polygon_area(self, vertices):
         """使用shoelace公式计算多边形面积"""
@@ -208,12 +222,12 @@ class ProjectionExperiment:
         
         # 计算投影点
         if mode == "orthogonal":
-            vertices_proj = np.array([self.orthogonal_projection(v) for v in vertices])
+            vertices_proj = self.orthogonal_projection(vertices)
             line_color = 'red'
             face_color = 'lightcoral'  # 正投影面颜色
         else:
             angle = self.angle_var.get()
-            vertices_proj = np.array([self.oblique_projection(v, angle) for v in vertices])
+            vertices_proj = self.oblique_projection(vertices, angle)
             line_color = 'green'
             face_color = 'lightgreen'  # 斜投影面颜色
         
@@ -277,12 +291,12 @@ class ProjectionExperiment:
         s = self.cube_size
         
         # 正投影数据
-        vertices_ortho = np.array([self.orthogonal_projection(v) for v in vertices])
+        vertices_ortho = self.orthogonal_projection(vertices)
         ortho_face_areas = self.calculate_face_areas(vertices_ortho, faces)
         
         # 斜投影数据
         angle = self.angle_var.get()
-        vertices_oblique = np.array([self.oblique_projection(v, angle) for v in vertices])
+        vertices_oblique = self.oblique_projection(vertices, angle)
         oblique_face_areas = self.calculate_face_areas(vertices_oblique, faces)
         
         # 理论计算
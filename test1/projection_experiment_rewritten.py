@@ -14,6 +14,9 @@ from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
 import math
+from precision import as_point_array, resolve_dtype
+from projection_core import SIGN_SUBTRACT, angle_coefficients, project
+from silhouette import CUBOID_FACES, shadow_area
 
 class ProjectionExperiment:
     """投影实验主类 - 完全重写版"""
@@ -25,6 +28,7 @@ class ProjectionExperiment:
         
         # 实验参数
         self.cube_size = 4.0  # 正方体边长
+        self.dtype = resolve_dtype()  # 计算精度(可通过环境变量 PROJECTION_DTYPE 设置)
         self.projection_angle = 30.0  # 斜投影角度(度)
         self.projection_mode = "orthogonal"  # orthogonal或oblique或both
         self.elevation = 20  # 视角仰角
@@ -129,7 +133,7 @@ class ProjectionExperiment:
         vertices = np.array([
             [0, 0, 0], [s, 0, 0], [s, s, 0], [0, s, 0],  # 底面 0,1,2,3
             [0, 0, s], [s, 0, s], [s, s, s], [0, s, s]   # 顶面 4,5,6,7
-        ])
+        ], dtype=self.dtype)
         return vertices
     
     def get_cube_faces(self):
@@ -144,17 +148,28 @@ class ProjectionExperiment:
         }
         return faces
     
-    def orthogonal_projection(self, point):
-        """正投影: 垂直投影到xy平面"""
-        return np.array([point[0], point[1], 0])
+    def orthogonal_projection(self, point, out=None):
+        """正投影: 垂直投影到xy平面
+        
+        point可以是单个点或 (N, 3) 点数组(包括实现缓冲区协议的对象),
+        out为可选的输出数组, 结果直接写入其中
+        """
+        points = as_point_array(point, self.dtype)
+        result = project(points, 0.0, 0.0, SIGN_SUBTRACT, out=out)
+        return result[0] if np.ndim(point) == 1 and len(points) == 1 else result
     
-    def oblique_projection(self, point, angle_deg):
-        """斜投影: 基于数学原理的从上往下斜投影算法"""
-        angle_rad = math.radians(angle_deg)
-        k = math.tan(angle_rad)
+    def oblique_projection(self, point, angle_deg, out=None):
+        """斜投影: 基于数学原理的从上往下斜投影算法
+        
+        point可以是单个点或 (N, 3) 点数组(包括实现缓冲区协议的对象),
+        out为可选的输出数组, 结果直接写入其中
+        """
         # 数学原理: x' = x - kx * z, y' = y - ky * z
         # 对于从上往下的斜投影，kx = tan(θ), ky = 0
-        return np.array([point[0] - k * point[2], point[1], 0])
+        kx, ky = angle_coefficients(angle_deg)
+        points = as_point_array(point, self.dtype)
+        result = project(points, kx, ky, SIGN_SUBTRACT, out=out)
+        return result[0] if np.ndim(point) == 1 and len(points) == 1 else result
     
     def calculate_polygon_area(self, vertices):
         """使用shoelace公式计算多边形面积"""
@@ -258,12 +273,12 @@ class ProjectionExperiment:
         
         # 计算投影点
         if mode == "orthogonal":
-            vertices_proj = np.array([self.orthogonal_projection(v) for v in vertices])
+            vertices_proj = self.orthogonal_projection(vertices)
             line_color = 'red'
             proj_color = 'lightcoral'
         else:
             angle = self.angle_var.get()
-            vertices_proj = np.array([self.oblique_projection(v, angle) for v in vertices])
+            vertices_proj = self.oblique_projection(vertices, angle)
             line_color = 'green'
             proj_color = 'lightgreen'
         
@@ -332,19 +347,24 @@ class ProjectionExperiment:
         angle = self.angle_var.get()
         
         # 计算投影数据
-        vertices_ortho = np.array([self.orthogonal_projection(v) for v in vertices])
-        vertices_oblique = np.array([self.oblique_projection(v, angle) for v in vertices])
+        vertices_ortho = self.orthogonal_projection(vertices)
+        vertices_oblique = self.oblique_projection(vertices, angle)
         
         # 只计算底面的投影面积（光线直接照射的面）
         ortho_area = self.calculate_single_face_area(vertices_ortho, "底面")
         oblique_area = self.calculate_single_face_area(vertices_oblique, "底面")
         
+        # 投影体整体轮廓（影子）面积
+        kx = math.tan(math.radians(angle))
+        ortho_shadow, oblique_shadow = shadow_area(vertices, CUBOID_FACES, [0.0, kx], 0.0)
+        
         # 理论计算
         cos_theta = math.cos(math.radians(angle)) if angle > 0 else 1.0
         theoretical_ratio = 1 / cos_theta
         
         # 生成报告
         report = self.generate_single_face_report(s, angle, ortho_area, oblique_area, theoretical_ratio)
+        report += self.generate_shadow_report(s, angle, ortho_shadow, oblique_shadow)
         
         self.data_text.insert(1.0, report)
     
@@ -541,6 +561,21 @@ class ProjectionExperiment:
         
         return report
     
+    def generate_shadow_report(self, cube_size, angle, ortho_shadow, oblique_shadow):
+        """生成投影体整体轮廓（影子）面积的分析报告"""
+        report = "\n【投影体整体轮廓（影子）面积】\n"
+        report += f"正投影轮廓面积: {ortho_shadow:.2f} cm²\n"
+        report += f"斜投影轮廓面积: {oblique_shadow:.2f} cm²\n"
+        
+        # 长方体的斜投影轮廓 = 底面 + 侧面在投影方向上扫过的面积
+        theoretical = cube_size * cube_size + cube_size * cube_size * math.tan(math.radians(angle))
+        report += f"理论轮廓面积: {theoretical:.2f} cm² (s² + s²·tanθ)\n"
+        if ortho_shadow > 0:
+            report += f"轮廓面积比: {oblique_shadow / ortho_shadow:.4f}\n"
+        report += "• 底面面积不变，但整个立体的影子随角度增大而变大\n"
+        
+        return report
+    
     def on_mode_change(self):
         """投影模式改变"""
         self.update_plot()
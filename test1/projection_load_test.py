@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投影服务的负载测试: 吞吐量与尾部延迟
+
+模拟多个学生端同时请求: 每个客户端保持一个 keep-alive 连接, 连续发送请求,
+参数从 --distinct 组中随机选取。默认组数远多于请求数, 几乎每个请求都要经过凑批计算,
+测到的是微批处理本身; 组数很少时几乎全部命中缓存, 测到的是缓存路径。--no-cache 关闭
+本进程服务的结果缓存(相同参数的并发请求仍会合并)。结果中同时给出缓存命中率。
+默认在本进程中启动一个服务再测量; 给出 --port 时测量已经运行的服务。
+
+    python projection_load_test.py --clients 64 --requests 200
+    python projection_load_test.py --distinct 50        # 缓存路径
+    python projection_load_test.py --distinct 50 --no-cache   # 关闭缓存, 只剩凑批和合并
+    python projection_load_test.py --port 8765               # 已运行的服务
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from projection_service import DEFAULT_HOST, ENDPOINTS, MicroBatcher, ProjectionService
+
+DIRECTIONS = ["isometric", "dimetric", "trimetric"]
+DEFAULT_DISTINCT = 100000  # 默认参数组数: 远多于默认请求数, 测量不命中缓存时的凑批路径
+
+
+def make_bodies(distinct, seed=0):
+    """生成 distinct 组不同的请求参数(JSON字节串)"""
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(distinct):
+        body = {
+            'length': rng.choice([4, 6, 8, 10]),
+            'width': rng.choice([3, 4, 6]),
+            'height': rng.choice([2, 4, 5]),
+            # 角度取到小数点后6位, 组数很多时各组参数也互不相同
+            'angle': round(rng.uniform(5, 60), 6),
+            'direction': rng.choice(DIRECTIONS),
+        }
+        bodies.append(json.dumps(body).encode())
+    return bodies
+
+
+async def client(host, port, bodies, count, latencies, seed):
+    """一个客户端: 在同一连接上依次发送 count 个请求, 记录每个请求的延迟"""
+    rng = random.Random(seed)
+    paths = list(ENDPOINTS)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            body = rng.choice(bodies)
+            request = (f"POST {rng.choice(paths)} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b" 200 " not in status:
+                raise RuntimeError(f"请求失败: {status.decode().strip()}")
+    finally:
+        writer.close()
+
+
+async def fetch_stats(host, port):
+    """读取服务端 /stats"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET /stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        response = await reader.read()
+    finally:
+        writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def run_load_test(host=DEFAULT_HOST, port=None, clients=64, requests=200, distinct=DEFAULT_DISTINCT,
+                        **options):
+    """
+    运行负载测试
+
+    Args:
+        port: 已运行服务的端口; 为None时在本进程中启动服务
+        clients: 并发客户端数
+        requests: 每个客户端的请求数
+        distinct: 参数组数
+        options: 本进程服务的 MicroBatcher 参数(如 cache_size=0 关闭缓存)
+
+    Returns:
+        字典: 请求数、用时、吞吐量、延迟分位数(毫秒)、缓存命中率,
+        以及本次测试期间服务端统计的增量
+    """
+    service = None
+    if port is None:
+        service = await ProjectionService(MicroBatcher(**options)).start(host, 0)
+        port = service.port
+    bodies = make_bodies(distinct)
+    latencies = []
+    try:
+        before = await fetch_stats(host, port)
+        start = time.perf_counter()
+        await asyncio.gather(*(client(host, port, bodies, requests, latencies, seed)
+                               for seed in range(clients)))
+        elapsed = time.perf_counter() - start
+        after = await fetch_stats(host, port)
+    finally:
+        if service is not None:
+            await service.stop()
+    server = {key: after[key] - before[key] for key in ('requests', 'cache_hits', 'coalesced', 'batches', 'computed')}
+    server['mean_batch'] = server['computed'] / server['batches'] if server['batches'] else 0.0
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed,
+        'p50': float(np.percentile(ms, 50)),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+        'max': float(ms.max()),
+        'cache_hit_ratio': server['cache_hits'] / server['requests'] if server['requests'] else 0.0,
+        'server': server,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="投影服务负载测试")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=None, help="已运行服务的端口, 默认在本进程中启动服务")
+    parser.add_argument("--clients", type=int, default=64, help="并发客户端数")
+    parser.add_argument("--requests", type=int, default=200, help="每个客户端的请求数")
+    parser.add_argument("--distinct", type=int, default=DEFAULT_DISTINCT,
+                        help="不同参数组数(少时主要测缓存路径)")
+    parser.add_argument("--no-cache", action="store_true", help="关闭本进程服务的结果缓存")
+    args = parser.parse_args(argv)
+    if args.no_cache and args.port is not None:
+        parser.error("--no-cache 只适用于本进程中启动的服务")
+
+    options = {'cache_size': 0} if args.no_cache else {}
+    result = asyncio.run(run_load_test(args.host, args.port, args.clients, args.requests, args.distinct,
+                                       **options))
+    server = result['server']
+    print(f"请求 {result['requests']} 个, 用时 {result['elapsed']:.2f} s, 吞吐量 {result['throughput']:.0f} 请求/秒")
+    print(f"延迟(ms): p50 {result['p50']:.2f}, p95 {result['p95']:.2f}, "
+          f"p99 {result['p99']:.2f}, 最大 {result['max']:.2f}, 缓存命中率 {result['cache_hit_ratio']:.1%}")
+    print(f"服务端: 批次 {server['batches']} (平均 {server['mean_batch']:.1f} 组), "
+          f"计算 {server['computed']} 组, 缓存命中 {server['cache_hits']}, 合并重复请求 {server['coalesced']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
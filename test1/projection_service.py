@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地投影计算服务(asyncio + HTTP/JSON, 只用标准库)
+
+实验课上很多学生端会同时请求同类的投影计算。服务把同一时刻到达的请求合并成小批次,
+用 CuboidObliqueProjector.batch_metrics 一次算完, 重复的参数直接从内存缓存返回:
+- 请求先查缓存; 相同参数的计算正在进行时, 等待同一个结果而不是重复计算
+- 未命中的请求进入队列, 第一个请求到达后最多再等 max_delay 秒或凑满 max_batch 个, 然后一次计算
+- 结果按最近使用保留 cache_size 组
+
+接口(POST, 请求体为JSON; 尺寸默认 10×6×4, 投影参数给出 kx/ky 或 angle/direction, 默认 kx=ky=0.5):
+
+    POST /project     {"length": 10, "width": 6, "height": 4, "angle": 45, "direction": "isometric"}
+                      → {"kx", "ky", "vertices_2d"}
+    POST /dimensions  → {"kx", "ky", "base_length", "base_width", "top_length", "top_width", "height_projection"}
+    POST /area        → {"kx", "ky", "face_areas", "shadow_area"}
+    GET  /stats       → 请求数、批次数、平均批大小和缓存命中数
+
+启动:
+
+    python projection_service.py --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+
+from cuboid_metrics import DIMENSION_KEYS
+from oblique_projection_top_down import PROJECTION_PRESETS, CuboidObliqueProjector, preset_coefficients
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 256  # 每批最多合并的请求数
+MAX_DELAY = 0.002  # 第一个请求到达后最多等待的秒数
+CACHE_SIZE = 4096  # 内存缓存保留的参数组数
+MAX_BODY = 64 * 1024  # 请求体大小上限(字节)
+MAX_SIZE = 1e6  # 长方体尺寸上限
+MAX_COEFFICIENT = 1e6  # 投影系数绝对值上限; 与尺寸上限一起保证所有结果都是有限数值
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(ValueError):
+    """请求内容无效, 以 HTTP 状态码返回给客户端"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_params(body):
+    """
+    把请求体转换为参数元组 (length, width, height, kx, ky), 同时作为缓存键
+
+    Raises:
+        RequestError: 参数缺失、类型错误或超出范围
+    """
+    if not isinstance(body, dict):
+        raise RequestError("请求体必须是JSON对象")
+
+    def number(name, default):
+        value = body.get(name, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RequestError(f"{name} 必须是有限的数值")
+        try:
+            value = float(value)
+        except OverflowError:
+            value = math.inf
+        if not math.isfinite(value):
+            raise RequestError(f"{name} 必须是有限的数值")
+        return value
+
+    length, width, height = number("length", 10), number("width", 6), number("height", 4)
+    if not 0 < min(length, width, height) or max(length, width, height) > MAX_SIZE:
+        raise RequestError(f"长方体尺寸必须在 (0, {MAX_SIZE:g}] 之间")
+    if "angle" in body:
+        direction = body.get("direction", "isometric")
+        if not isinstance(direction, str) or direction not in PROJECTION_PRESETS:
+            raise RequestError(f"未知的投影方向: {direction!r}, 可选 {sorted(PROJECTION_PRESETS)}")
+        angle = number("angle", None)
+        if not 0 <= angle < 90:
+            raise RequestError("angle 必须在 [0, 90) 度之间")
+        kx, ky = preset_coefficients(angle, direction)
+    else:
+        kx, ky = number("kx", 0.5), number("ky", 0.5)
+    if max(abs(kx), abs(ky)) > MAX_COEFFICIENT:
+        raise RequestError(f"投影系数的绝对值不能超过 {MAX_COEFFICIENT:g}")
+    return (length, width, height, float(kx), float(ky))
+
+
+def batch_results(params, dtype=None):
+    """一批参数元组 → 每组的完整结果字典(一次向量化计算)"""
+    lengths, widths, heights, kx, ky = zip(*params)
+    metrics = CuboidObliqueProjector.batch_metrics(lengths, widths, heights, kx, ky, dtype)
+    vertices = metrics['vertices_2d'].tolist()
+    dimensions = {key: metrics[key].tolist() for key in DIMENSION_KEYS}
+    face_areas = {name: area.tolist() for name, area in metrics['face_areas'].items()}
+    shadow = metrics['shadow_area'].tolist()
+    return [{
+        'kx': p[3],
+        'ky': p[4],
+        'vertices_2d': vertices[i],
+        'dimensions': {key: values[i] for key, values in dimensions.items()},
+        'face_areas': {name: values[i] for name, values in face_areas.items()},
+        'shadow_area': shadow[i],
+    } for i, p in enumerate(params)]
+
+
+class MicroBatcher:
+    """
+    把并发请求合并成小批次计算, 并缓存结果
+
+    只能在一个事件循环中使用。
+    """
+
+    def __init__(self, compute=batch_results, max_batch=MAX_BATCH, max_delay=MAX_DELAY, cache_size=CACHE_SIZE):
+        self.compute = compute
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # 参数 -> 结果
+        self.pending = {}  # 参数 -> 等待结果的 future(排队或正在计算)
+        self.queue = asyncio.Queue()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'batches': 0, 'computed': 0}
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, params):
+        """取得一组参数的结果: 缓存命中直接返回, 否则与同一批的其他请求一起计算"""
+        self.stats['requests'] += 1
+        result = self.cache.get(params)
+        if result is not None:
+            self.cache.move_to_end(params)
+            self.stats['cache_hits'] += 1
+            return result
+        future = self.pending.get(params)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[params] = future
+            self.queue.put_nowait(params)
+        else:
+            self.stats['coalesced'] += 1
+        # shield: 一个客户端断开时不取消其他客户端共享的 future
+        return await asyncio.shield(future)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._finish(batch)
+
+    def _finish(self, batch):
+        """计算一批并把结果交给等待的请求"""
+        try:
+            results = self.compute(batch)
+        except Exception as error:
+            for params in batch:
+                future = self.pending.pop(params)
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.stats['batches'] += 1
+        self.stats['computed'] += len(batch)
+        for params, result in zip(batch, results):
+            self.cache[params] = result
+            future = self.pending.pop(params)
+            if not future.done():
+                future.set_result(result)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def stats_snapshot(self):
+        stats = dict(self.stats)
+        stats['mean_batch'] = stats['computed'] / stats['batches'] if stats['batches'] else 0.0
+        stats['cache_entries'] = len(self.cache)
+        return stats
+
+
+# 各接口从完整结果中取出的字段
+ENDPOINTS = {
+    "/project": lambda result: {'kx': result['kx'], 'ky': result['ky'], 'vertices_2d': result['vertices_2d']},
+    "/dimensions": lambda result: {'kx': result['kx'], 'ky': result['ky'], **result['dimensions']},
+    "/area": lambda result: {'kx': result['kx'], 'ky': result['ky'], 'face_areas': result['face_areas'],
+                             'shadow_area': result['shadow_area']},
+}
+
+
+class ProjectionService:
+    """HTTP/1.1 JSON 服务(支持 keep-alive), 计算交给 MicroBatcher"""
+
+    def __init__(self, batcher=None):
+        self.batcher = batcher or MicroBatcher()
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """开始监听; port 为 0 时由系统分配, 实际端口见 self.port"""
+        self.batcher.start()
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        await self.batcher.stop()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except RequestError as error:
+                    # 请求格式错误时无法确定下一个请求从哪里开始, 回复后关闭连接
+                    self.write_response(writer, error.status, {'error': str(error)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await self.dispatch(method, path, body)
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """
+        读取一个请求, 连接关闭时返回None
+
+        Raises:
+            RequestError: Content-Length 无效(400)或请求体过大(413)
+        """
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        path = target.split("?", 1)[0]
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise RequestError("Content-Length 无效") from None
+        if length < 0:
+            raise RequestError("Content-Length 无效")
+        if length > MAX_BODY:
+            raise RequestError("请求体过大", 413)
+        body = await reader.readexactly(length)
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, path, body, keep_alive
+
+    async def dispatch(self, method, path, body):
+        """按路径处理请求, 返回 (状态码, JSON对象)"""
+        if path == "/stats":
+            return 200, self.batcher.stats_snapshot()
+        select = ENDPOINTS.get(path)
+        if select is None:
+            return 404, {'error': f"未知的接口: {path}"}
+        if method != "POST":
+            return 405, {'error': "只支持POST"}
+        try:
+            params = parse_params(json.loads(body or b"{}"))
+        except RequestError as error:
+            return error.status, {'error': str(error)}
+        except ValueError as error:
+            # JSONDecodeError 以及请求体不是UTF-8时的 UnicodeDecodeError
+            return 400, {'error': f"JSON格式错误: {error}"}
+        try:
+            result = await self.batcher.get(params)
+        except Exception as error:
+            # 批计算失败时同一批的每个请求都收到错误状态, 而不是断开连接
+            return 500, {'error': f"计算出错: {error}"}
+        return 200, select(result)
+
+    @staticmethod
+    def write_response(writer, status, payload, keep_alive):
+        try:
+            # allow_nan=False: NaN/Infinity 不是合法的JSON
+            data = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        except ValueError:
+            status = 500
+            data = json.dumps({'error': "结果不是有限数值"}, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """启动服务并一直运行"""
+    service = await ProjectionService(MicroBatcher(**options)).start(host, port)
+    print(f"投影服务已启动: http://{host}:{service.port} (Ctrl+C 停止)")
+    started = time.monotonic()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        stats = service.batcher.stats_snapshot()
+        print(f"运行 {time.monotonic() - started:.0f} s, 请求 {stats['requests']}, "
+              f"批次 {stats['batches']} (平均 {stats['mean_batch']:.1f}), 缓存命中 {stats['cache_hits']}")
+        await service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地投影计算服务")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="每批最多合并的请求数")
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY * 1000, help="凑批最多等待的毫秒数")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="内存缓存保留的参数组数")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, max_batch=args.max_batch,
+                          max_delay=args.max_delay / 1000, cache_size=args.cache_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重绘路径的内存泄漏与分配回归检查
+
+不创建窗口, 用 Agg 画布反复执行 update_plot → 后台计算 → render_scene 的完整重绘循环,
+测量预热之后:
+- tracemalloc 统计的 Python 内存增长
+- 进程常驻内存(RSS)增长
+- 存活的 matplotlib Artist 对象数和图中的子图/图元数
+
+任一项的每循环增长超过预算时以非零状态退出。默认的短检查(200次循环, 开启 tracemalloc 时约5分钟)
+用于持续集成; 长检查(2000次循环, 约45分钟)用于发布前或怀疑有缓慢泄漏时:
+
+    python redraw_leak_check.py
+    python redraw_leak_check.py --long
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from background_worker import LatestRequestWorker
+from projection_experiment import DEFAULT_FOCAL, ProjectionExperiment
+
+MODES = ["orthogonal", "oblique", "both", "perspective", "dashboard"]
+
+DEFAULT_CYCLES = 200  # 短检查的循环次数
+LONG_CYCLES = 2000  # --long 长检查的循环次数
+
+# 测量期间等间隔取样的区间数; 每循环增长取各区间增长的中位数
+MEASURE_INTERVALS = 10
+
+
+class _Value:
+    """代替 Tk 变量的简单取值对象"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class _TextBuffer:
+    """代替测量数据文本框"""
+
+    def __init__(self):
+        self.text = ""
+
+    def delete(self, *args):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+
+
+class HeadlessExperiment(ProjectionExperiment):
+    """无窗口的实验对象: 保留计算、绘图和测量路径, 界面组件换成简单对象"""
+
+    def __init__(self):
+        self.init_state()
+        self.mode_var = _Value("both")
+        self.angle_var = _Value(30.0)
+        self.elev_var = _Value(20.0)
+        self.azim_var = _Value(45.0)
+        self.focal_var = _Value(DEFAULT_FOCAL)
+        self.data_text = _TextBuffer()
+        self.fig = Figure(figsize=(10, 8), dpi=100)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.worker = LatestRequestWorker(self.compute_scene)
+
+    def cycle(self, index, modes=MODES, timeout=10.0):
+        """执行一次完整的重绘循环: 改变参数, 提交计算, 等待结果并绘制"""
+        self.mode_var.set(modes[index % len(modes)])
+        self.angle_var.set(5.0 + (index * 7) % 55)
+        self.elev_var.set(10.0 + (index * 3) % 70)
+        self.azim_var.set((index * 11) % 360)
+        self.update_plot()
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self.worker.poll()
+            if item is not None:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError("后台计算超时")
+            time.sleep(0.0005)
+        _, scene, error = item
+        if error is not None:
+            raise error
+        self.render_scene(scene)
+
+    def close(self):
+        self.worker.stop()
+
+
+def current_rss():
+    """当前进程常驻内存(字节); 无法获取时返回None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def count_artists():
+    """存活的 matplotlib Artist 对象数"""
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Artist))
+
+
+def figure_artist_count(fig):
+    """图中子图及其图元的数量"""
+    return len(fig.axes) + sum(len(ax.get_children()) for ax in fig.axes)
+
+
+def measure(app):
+    gc.collect()
+    return {
+        'traced': tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        'rss': current_rss(),
+        'artists': count_artists(),
+        'figure_artists': figure_artist_count(app.fig),
+    }
+
+
+def run_leak_check(cycles=DEFAULT_CYCLES, warmup=50, modes=MODES, trace=True, progress=True, intervals=MEASURE_INTERVALS):
+    """
+    运行重绘循环并测量增长
+
+    预热阶段之后记录起点, 之后每个区间结束时取样; 为了让各取样点处于相同模式,
+    循环次数和区间长度都取为模式个数的整数倍。tracemalloc 在预热之前开启, 否则预热时已存在的
+    对象被释放、重新分配后会被误计为增长。
+
+    每循环增长取各区间增长的中位数: 真正的泄漏在每个区间都增长, 而一次性的增长只落在一个区间里。
+    例如 matplotlib 每次创建坐标轴都会驻留并随即释放一些字符串(pathlib 拆分字体路径), 几百次循环后
+    解释器的驻留字符串表按当前的字符串数重新分配一次, 一次增长约1MB, 之后表的大小不再改变;
+    按首尾两点计算时这一次就会在短的检查中超出预算。
+
+    Args:
+        trace: 是否用 tracemalloc 统计(会使重绘变慢数倍)
+        intervals: 取样的区间数
+
+    Returns:
+        字典: 'cycles' 以及各项指标的 'start'、'end'、'per_cycle' (各区间每循环增长的中位数)
+    """
+    step = len(modes)
+    cycles = max(step, cycles - cycles % step)
+    warmup = warmup + (-warmup) % step
+    interval = max(step, cycles // max(1, intervals) // step * step)
+    app = HeadlessExperiment()
+    if trace:
+        tracemalloc.start()
+    try:
+        for i in range(warmup):
+            app.cycle(i, modes)
+        samples = [(0, measure(app))]
+        for i in range(cycles):
+            app.cycle(warmup + i, modes)
+            if (i + 1) % interval == 0 or i + 1 == cycles:
+                samples.append((i + 1, measure(app)))
+                if progress:
+                    print(f"  {i + 1}/{cycles}", file=sys.stderr)
+    finally:
+        app.close()
+        if trace:
+            tracemalloc.stop()
+
+    result = {'cycles': cycles}
+    for key in samples[0][1]:
+        if any(sample[key] is None for _, sample in samples):
+            result[key] = None
+            continue
+        growth = [(b[key] - a[key]) / (j - i) for (i, a), (j, b) in zip(samples, samples[1:])]
+        result[key] = {
+            'start': samples[0][1][key],
+            'end': samples[-1][1][key],
+            'per_cycle': float(np.median(growth)),
+        }
+    return result
+
+
+def check_budget(result, traced_budget=1024, rss_budget=16384, artist_budget=0.0):
+    """
+    对照预算检查增长
+
+    Args:
+        traced_budget: tracemalloc 内存每循环增长上限(字节)
+        rss_budget: RSS 每循环增长上限(字节); RSS受分配器影响波动较大, 预算较宽
+        artist_budget: Artist 对象数和图元数每循环增长上限
+
+    Returns:
+        超出预算的项目说明列表, 为空表示通过
+    """
+    budgets = {
+        'traced': traced_budget,
+        'rss': rss_budget,
+        'artists': artist_budget,
+        'figure_artists': artist_budget,
+    }
+    failures = []
+    for key, budget in budgets.items():
+        if result.get(key) is None:
+            continue
+        growth = result[key]['per_cycle']
+        if growth > budget:
+            failures.append(f"{key}: 每循环增长 {growth:.1f}, 超过预算 {budget}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="重绘路径的内存泄漏回归检查")
+    parser.add_argument("--cycles", type=int, default=None,
+                        help=f"测量的重绘循环次数(默认 {DEFAULT_CYCLES}, --long 时 {LONG_CYCLES})")
+    parser.add_argument("--long", action="store_true", help=f"长检查: 默认循环 {LONG_CYCLES} 次")
+    parser.add_argument("--warmup", type=int, default=50, help="预热循环次数(不计入测量)")
+    parser.add_argument("--traced-budget", type=float, default=1024, help="tracemalloc 每循环增长上限(字节)")
+    parser.add_argument("--rss-budget", type=float, default=16384, help="RSS 每循环增长上限(字节)")
+    parser.add_argument("--artist-budget", type=float, default=0.0, help="Artist 数每循环增长上限")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="不统计 tracemalloc(运行更快)")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES, help="循环使用的投影模式")
+    args = parser.parse_args(argv)
+
+    cycles = args.cycles if args.cycles is not None else LONG_CYCLES if args.long else DEFAULT_CYCLES
+    result = run_leak_check(cycles, args.warmup, args.modes, trace=not args.no_tracemalloc)
+    print(f"重绘循环: {result['cycles']} 次")
+    for key in ('traced', 'rss', 'artists', 'figure_artists'):
+        if result[key] is None:
+            print(f"{key}: 无法测量")
+        else:
+            r = result[key]
+            print(f"{key}: {r['start']} → {r['end']} (每循环 {r['per_cycle']:+.2f}, 各区间的中位数)")
+
+    failures = check_budget(result, args.traced_budget, args.rss_budget, args.artist_budget)
+    for failure in failures:
+        print("失败:", failure)
+    print("通过" if not failures else "未通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按内容寻址的磁盘缓存: 保存参数扫描的测量表和渲染好的图像
+
+- 缓存键是输入内容的 SHA-256: 几何参数、投影参数、视图设置以及计算代码的版本(源文件哈希)
+- 写入先写临时文件再用 os.replace 原子替换, 多个进程共享同一缓存目录时不会读到半个文件
+- 总大小超过上限时按最近使用时间(文件修改时间, 命中时更新)淘汰最旧的条目
+- 淘汰时顺带删除写入中途退出的进程留下的过期临时文件
+
+缓存目录默认取环境变量 PROJECTION_CACHE_DIR, 否则为 ~/.cache/sanshitu-projection。
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+STALE_TEMP_SECONDS = 3600  # 超过这个时间没有修改的临时文件视为写入中途退出留下的
+_SUFFIX = ".pkl"
+_TEMP_SUFFIX = ".tmp"
+
+
+def _update_hash(digest, value):
+    """把值按类型和内容写入哈希(与对象的内存地址和字典顺序无关)"""
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        digest.update(b"ndarray")
+        digest.update(str(value.dtype).encode())
+        digest.update(str(value.shape).encode())
+        digest.update(value.tobytes())
+    elif isinstance(value, np.generic):
+        _update_hash(digest, value.item())
+    elif isinstance(value, dict):
+        digest.update(b"dict%d" % len(value))
+        for key in sorted(value, key=repr):
+            _update_hash(digest, key)
+            _update_hash(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"seq%d" % len(value))
+        for item in value:
+            _update_hash(digest, item)
+    elif isinstance(value, bytes):
+        digest.update(b"bytes%d" % len(value))
+        digest.update(value)
+    elif isinstance(value, float):
+        digest.update(b"float" + repr(value).encode())
+    elif value is None or isinstance(value, (bool, int, str)):
+        digest.update(type(value).__name__.encode() + repr(value).encode())
+    else:
+        raise TypeError(f"无法作为缓存键的类型: {type(value).__name__}")
+
+
+def cache_key(*parts, **named):
+    """
+    计算输入内容的缓存键
+
+    Args:
+        parts, named: 数组、数值、字符串以及它们组成的列表/字典
+
+    Returns:
+        64位十六进制字符串
+    """
+    digest = hashlib.sha256()
+    _update_hash(digest, parts)
+    _update_hash(digest, named)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path, mtime):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def code_version(*modules):
+    """
+    计算代码的源文件哈希, 作为缓存键的一部分; 代码修改后旧的缓存条目自动失效
+
+    Args:
+        modules: 参与计算的模块对象
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        path = os.path.abspath(module.__file__)
+        digest.update(_file_hash(path, os.path.getmtime(path)).encode())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    大小受限的LRU磁盘缓存
+
+    可以保存任意可pickle的对象: 测量表(数组字典)、图像数组、PNG/SVG字节串等。
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: 缓存目录, 默认取 PROJECTION_CACHE_DIR 或 ~/.cache/sanshitu-projection
+            max_bytes: 缓存总大小上限(字节)
+        """
+        if directory is None:
+            directory = os.environ.get("PROJECTION_CACHE_DIR",
+                                       os.path.join(os.path.expanduser("~"), ".cache", "sanshitu-projection"))
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._size_estimate = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + _SUFFIX)
+
+    def get(self, key, default=None):
+        """
+        读取缓存条目, 命中时更新其最近使用时间
+
+        Returns:
+            缓存的对象, 不存在(或已被其他进程淘汰、文件损坏)时返回default
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """写入缓存条目(原子替换), 必要时淘汰旧条目"""
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=_TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp_path)
+            # 覆盖已有条目时总大小只改变两者之差
+            try:
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        if self._size_estimate is None:
+            self._size_estimate = self.total_size()
+        else:
+            self._size_estimate += size
+        if self._size_estimate > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, key, compute):
+        """
+        读取缓存, 未命中时调用 compute() 计算并写入
+
+        Args:
+            key: cache_key 的结果
+            compute: 无参数的计算函数
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        """列出 (修改时间, 大小, 路径); 其他进程同时删除的文件被跳过"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_size(self):
+        """缓存条目的总大小(字节)"""
+        return sum(size for _, size, _ in self._entries())
+
+    def remove_stale_temp_files(self, max_age=STALE_TEMP_SECONDS):
+        """
+        删除超过 max_age 秒没有修改的临时文件(写入中途退出的进程留下的)
+
+        Returns:
+            删除的文件数
+        """
+        cutoff = time.time() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(_TEMP_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+    def evict(self, max_bytes=None):
+        """按最近使用时间淘汰最旧的条目, 直到总大小不超过上限; 同时删除过期的临时文件"""
+        self.remove_stale_temp_files()
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size_estimate = total
+
+    def clear(self):
+        """删除全部缓存条目"""
+        self.evict(0)
+
+
+_default_cache = None
+
+
+def default_cache():
+    """进程内共享的默认缓存实例"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
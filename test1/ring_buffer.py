@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+固定容量的数组环形缓冲区
+
+预先分配 (capacity, *item_shape) 的存储, 之后的写入和读取都不再分配内存:
+- 写入方用 reserve()/reserve_many() 取得下一帧(几帧)的存储视图, 直接把结果写进去(如投影函数的 out 参数),
+  或用 push()/extend() 复制已有数据
+- 读取方用 latest()/views() 取得存储的视图, 不复制; 需要长期保存时再用 to_array() 复制
+
+写满后最旧的帧被覆盖。total 记录累计写入的帧数, 读取方可以据此判断看到的帧是否已被覆盖。
+只有一个写入方; 其他线程读取时, 在 lock 内取视图并使用, 写入方不会同时改写这些帧。
+"""
+
+import threading
+
+import numpy as np
+
+from precision import resolve_dtype
+
+
+class RingBuffer:
+    """固定容量的数组环形缓冲区"""
+
+    def __init__(self, capacity, item_shape=(), dtype=None):
+        """
+        Args:
+            capacity: 最多保留的帧数
+            item_shape: 每一帧的数组形状
+            dtype: 元素精度, 默认使用全局默认精度
+        """
+        if capacity < 1:
+            raise ValueError(f"容量必须为正数, 实际为 {capacity}")
+        self.capacity = int(capacity)
+        self.item_shape = tuple(item_shape)
+        self.data = np.zeros((self.capacity,) + self.item_shape, dtype=resolve_dtype(dtype))
+        self.total = 0
+        self.lock = threading.RLock()
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def clear(self):
+        """清空(不释放存储)"""
+        with self.lock:
+            self.total = 0
+
+    def reserve(self):
+        """
+        占用下一帧并返回其存储视图, 调用方直接写入
+
+        Returns:
+            形状为 item_shape 的可写视图
+        """
+        with self.lock:
+            slot = self.data[self.total % self.capacity, ...]
+            self.total += 1
+            return slot
+
+    def push(self, item):
+        """复制一帧数据写入缓冲区"""
+        self.reserve()[...] = item
+
+    def reserve_many(self, count):
+        """
+        占用接下来的 count 帧, 返回按时间顺序的存储视图, 调用方直接写入
+
+        Args:
+            count: 帧数, 不能超过容量
+
+        Returns:
+            一段或两段(跨越存储末尾时)视图的列表, 总长度为 count
+        """
+        if count > self.capacity:
+            raise ValueError(f"一次最多占用 {self.capacity} 帧, 实际为 {count}")
+        with self.lock:
+            start = self.total % self.capacity
+            first = min(count, self.capacity - start)
+            self.total += count
+            segments = [self.data[start:start + first]]
+            if count > first:
+                segments.append(self.data[:count - first])
+            return segments
+
+    def extend(self, items):
+        """
+        批量写入多帧(一次或两次切片复制)
+
+        Args:
+            items: 形状 (M, *item_shape); 超过容量时只保留最后 capacity 帧
+        """
+        items = np.asarray(items, dtype=self.dtype)
+        if items.shape[1:] != self.item_shape:
+            raise ValueError(f"帧形状应为 {self.item_shape}, 实际为 {items.shape[1:]}")
+        with self.lock:
+            if len(items) > self.capacity:
+                self.total += len(items) - self.capacity
+                items = items[-self.capacity:]
+            start = 0
+            for segment in self.reserve_many(len(items)):
+                segment[...] = items[start:start + len(segment)]
+                start += len(segment)
+
+    def latest(self, n=None):
+        """
+        最新的一帧或最近 n 帧
+
+        Args:
+            n: None 返回最新一帧的视图; 否则返回最近 n 帧(按时间顺序),
+               没有跨越存储末尾时是视图, 否则是拼接后的副本
+
+        Raises:
+            IndexError: 缓冲区为空
+        """
+        with self.lock:
+            if self.total == 0:
+                raise IndexError("缓冲区为空")
+            if n is None:
+                return self.data[(self.total - 1) % self.capacity, ...]
+            older, newer = self.views(n)
+            return newer if len(older) == 0 else np.concatenate([older, newer])
+
+    def views(self, n=None):
+        """
+        按时间顺序的两段存储视图(不复制)
+
+        Args:
+            n: 只取最近 n 帧, 默认取全部保留的帧
+
+        Returns:
+            (较旧的一段, 较新的一段), 拼接起来即为按时间顺序的帧; 没有跨越存储末尾时较旧的一段为空
+        """
+        with self.lock:
+            count = len(self) if n is None else min(int(n), len(self))
+            end = self.total % self.capacity
+            start = (self.total - count) % self.capacity
+            if start + count <= self.capacity:
+                return self.data[:0], self.data[start:start + count]
+            return self.data[start:], self.data[:end]
+
+    def to_array(self, n=None):
+        """按时间顺序复制出最近 n 帧(默认全部)"""
+        older, newer = self.views(n)
+        return np.concatenate([older, newer])
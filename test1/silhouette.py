@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投影体轮廓(影子)与阴影面积计算
+基于斜投影公式 x' = x - kx * z, y' = y - ky * z
+
+- 凸体: 批量凸包 + 面积公式, 可同时处理多个角度和多个物体
+- 场景: 多个凸多边形的精确并集轮廓与面积
+"""
+
+import numpy as np
+
+from precision import as_float_array
+from projection_core import SIGN_SUBTRACT, project
+
+# 长方体六个面的顶点索引(与 get_3d_vertices 的顶点顺序一致)
+CUBOID_FACES = np.array([
+    [0, 1, 2, 3],  # 底面
+    [4, 5, 6, 7],  # 顶面
+    [0, 1, 5, 4],  # 前面
+    [2, 3, 7, 6],  # 后面
+    [0, 3, 7, 4],  # 左面
+    [1, 2, 6, 5],  # 右面
+])
+
+# 长方体十二条棱边的顶点索引
+CUBOID_EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],  # 底面棱边
+    [4, 5], [5, 6], [6, 7], [7, 4],  # 顶面棱边
+    [0, 4], [1, 5], [2, 6], [3, 7],  # 侧面棱边
+])
+
+# 投影图中画虚线的棱边(顶面棱边), 与 draw_projection 的约定一致
+CUBOID_DASHED_EDGES = np.all(CUBOID_EDGES >= 4, axis=1)
+
+
+def project_oblique(vertices, kx, ky, dtype=None):
+    """
+    批量斜投影
+
+    Args:
+        vertices: 三维顶点, 形状 (..., N, 3)
+        kx: x方向投影系数, 标量或任意形状的数组(如多个角度)
+        ky: y方向投影系数, 形状与kx可广播
+        dtype: 计算精度, 默认沿用顶点的浮点类型
+
+    Returns:
+        二维投影点, 形状 kx.shape + vertices.shape[:-1] + (2,)
+    """
+    return project(vertices, kx, ky, SIGN_SUBTRACT, width=2, dtype=dtype)
+
+
+def signed_polygon_area(polygons):
+    """
+    批量计算多边形有向面积(shoelace公式, 逆时针为正)
+
+    Args:
+        polygons: 多边形顶点, 形状 (..., N, 2)
+
+    Returns:
+        有向面积, 形状 (...)
+    """
+    polygons = as_float_array(polygons)
+    x, y = polygons[..., 0], polygons[..., 1]
+    return 0.5 * np.sum(x * np.roll(y, -1, axis=-1) - np.roll(x, -1, axis=-1) * y, axis=-1)
+
+
+def _tolerance(points, tol):
+    """根据坐标量级确定几何判断的容差"""
+    # fmax 忽略NaN(被裁剪的点), 与 nanmax(initial=...) 相同但 NumPy 1.21 即可使用
+    scale = np.fmax.reduce(np.abs(points), axis=(-2, -1), initial=1.0)
+    return tol * scale * scale
+
+
+def _hull_successors(points, tol=1e-12):
+    """
+    计算凸包边: 对每个点给出其逆时针方向的下一个凸包顶点
+
+    对于点数较少的点集(例如长方体的8个顶点), 直接枚举所有有向边 i->j,
+    当其余点全部位于边的左侧(共线点需落在线段内)时, 该边即为凸包边。
+    这种方法完全向量化, 适合大批量的小点集。
+
+    Returns:
+        (succ, valid): succ形状 (..., N), 无后继的点为 -1; valid为边有效性矩阵 (..., N, N)
+    """
+    points = as_float_array(points)
+    eps = _tolerance(points, tol)[..., None, None, None]
+
+    d = points[..., None, :, :] - points[..., :, None, :]          # d[i, j] = p_j - p_i
+    cross = (d[..., :, :, None, 0] * d[..., :, None, :, 1]
+             - d[..., :, :, None, 1] * d[..., :, None, :, 0])    # cross[i, j, k]
+    dot = np.sum(d[..., :, :, None, :] * d[..., :, None, :, :], axis=-1)
+    length2 = np.sum(d * d, axis=-1)[..., None]
+
+    # 共线的点必须落在线段 [p_i, p_j] 之内
+    collinear = np.abs(cross) <= eps
+    between = (dot >= -eps) & (dot <= length2 + eps)
+    ok = (cross > eps) | (collinear & between)
+
+    # 重复点只保留索引最小的一个
+    same = np.sum(d * d, axis=-1) <= eps[..., 0]
+    duplicate = np.any(np.tril(same, k=-1), axis=-1)
+    distinct = ~same
+
+    valid = np.all(ok, axis=-1) & distinct
+    valid &= ~duplicate[..., :, None] & ~duplicate[..., None, :]
+
+    has_succ = np.any(valid, axis=-1)
+    succ = np.where(has_succ, np.argmax(valid, axis=-1), -1)
+    return succ, valid
+
+
+def hull_area(points, tol=1e-12):
+    """
+    批量计算点集凸包面积(无需对凸包顶点排序)
+
+    Args:
+        points: 二维点集, 形状 (..., N, 2)
+
+    Returns:
+        凸包面积, 形状 (...)
+    """
+    points = as_float_array(points)
+    _, valid = _hull_successors(points, tol)
+    x, y = points[..., 0], points[..., 1]
+    cross = x[..., :, None] * y[..., None, :] - x[..., None, :] * y[..., :, None]
+    # 全部共线时正反两条边相互抵消, 面积为0
+    return 0.5 * np.sum(np.where(valid, cross, 0.0), axis=(-2, -1))
+
+
+def convex_hull(points, tol=1e-12):
+    """
+    批量计算凸包多边形(逆时针顺序)
+
+    Args:
+        points: 二维点集, 形状 (..., N, 2)
+
+    Returns:
+        (hull, count): hull形状 (..., N, 2), 未使用的位置填充NaN; count为凸包顶点数
+    """
+    points = as_float_array(points)
+    n = points.shape[-2]
+    succ, valid = _hull_successors(points, tol)
+
+    # 以x最小(其次y最小)的凸包顶点为起点
+    on_hull = succ >= 0
+    key_x = np.where(on_hull, points[..., 0], np.inf)
+    key_y = np.where(on_hull & (key_x == key_x.min(axis=-1, keepdims=True)), points[..., 1], np.inf)
+    start = np.argmin(key_y, axis=-1)
+
+    count = np.sum(on_hull, axis=-1)
+    # 所有点重合时只有一个顶点
+    count = np.where(count == 0, 1, count)
+
+    order = np.empty(points.shape[:-1], dtype=int)
+    idx = start
+    for step in range(n):
+        order[..., step] = idx
+        idx = np.take_along_axis(succ, idx[..., None], axis=-1)[..., 0]
+        idx = np.where(idx < 0, start, idx)
+
+    hull = np.take_along_axis(points, order[..., None], axis=-2)
+    hull[np.arange(n) >= count[..., None]] = np.nan
+    return hull, count
+
+
+def shadow_area(vertices, faces, kx, ky, dtype=None):
+    """
+    凸多面体投影轮廓面积的快速算法
+
+    对于封闭凸多面体, 投影区域内的每一点恰好被两个面(朝向与背向)覆盖,
+    因此轮廓面积等于各面投影有向面积绝对值之和的一半。
+
+    Args:
+        vertices: 三维顶点, 形状 (..., N, 3), 可包含多个物体
+        faces: 面的顶点索引, 形状 (F, 4) 或 (F, K)
+        kx, ky: 投影系数, 可为多个角度的数组
+        dtype: 计算精度, 默认沿用顶点的浮点类型
+
+    Returns:
+        阴影面积, 形状 kx.shape + vertices.shape[:-2]
+    """
+    projected = project_oblique(vertices, kx, ky, dtype)
+    face_polygons = projected[..., np.asarray(faces), :]
+    return 0.5 * np.sum(np.abs(signed_polygon_area(face_polygons)), axis=-1)
+
+
+def silhouette(vertices, kx, ky, tol=1e-12, dtype=None):
+    """
+    凸体投影轮廓(影子)多边形与面积
+
+    Args:
+        vertices: 三维顶点, 形状 (..., N, 3)
+        kx, ky: 投影系数, 标量或多个角度的数组
+        dtype: 计算精度, 默认沿用顶点的浮点类型
+
+    Returns:
+        (polygon, count, area): 轮廓多边形(逆时针, NaN填充)、顶点数、面积
+    """
+    projected = project_oblique(vertices, kx, ky, dtype)
+    polygon, count = convex_hull(projected, tol)
+    area = hull_area(projected, tol)
+    return polygon, count, area
+
+
+def _polygon_edges(polygons):
+    """把NaN填充的多边形列表展开为有向边数组"""
+    starts, ends, owners = [], [], []
+    for index, polygon in enumerate(polygons):
+        polygon = np.asarray(polygon, dtype=float)
+        polygon = polygon[~np.isnan(polygon).any(axis=-1)]
+        if len(polygon) < 3:
+            continue
+        if signed_polygon_area(polygon) < 0:
+            polygon = polygon[::-1]
+        starts.append(polygon)
+        ends.append(np.roll(polygon, -1, axis=0))
+        owners.append(np.full(len(polygon), index))
+    if not starts:
+        empty = np.empty((0, 2))
+        return empty, empty, np.empty(0, dtype=int)
+    return np.concatenate(starts), np.concatenate(ends), np.concatenate(owners)
+
+
+def union_segments(polygons, tol=1e-9):
+    """
+    多个凸多边形并集的边界线段
+
+    每条边在与其他多边形的交点处被切分, 只保留不在其他多边形内部的部分。
+    与其他多边形重合的边: 同向重合只保留一次, 反向重合(相邻的两个多边形)均丢弃。
+    为保证求交判断的稳健性, 并集计算始终使用双精度。
+
+    Args:
+        polygons: 凸多边形列表, 每个形状 (K, 2), 允许NaN填充
+
+    Returns:
+        (segments, owners): 边界线段 (S, 2, 2), 保持逆时针方向; 所属多边形索引 (S,)
+    """
+    a, b, owners = _polygon_edges(polygons)
+    if len(a) == 0:
+        return np.empty((0, 2, 2)), owners
+    scale = max(1.0, float(np.max(np.abs(np.concatenate([a, b])))))
+    eps = tol * scale
+
+    # 所有边两两求交, 得到每条边上的切分参数
+    d = b - a
+    denom = d[:, None, 0] * d[None, :, 1] - d[:, None, 1] * d[None, :, 0]
+    w = a[None, :, :] - a[:, None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (w[..., 0] * d[None, :, 1] - w[..., 1] * d[None, :, 0]) / denom
+        u = (w[..., 0] * d[:, None, 1] - w[..., 1] * d[:, None, 0]) / denom
+    hit = (np.abs(denom) > eps * eps) & (t > 0) & (t < 1) & (u >= 0) & (u <= 1)
+    hit &= owners[:, None] != owners[None, :]
+    cuts = np.where(hit, t, np.nan)
+    cuts = np.sort(np.concatenate([np.zeros((len(a), 1)), cuts, np.ones((len(a), 1))], axis=1), axis=1)
+
+    t0, t1 = cuts[:, :-1], cuts[:, 1:]
+    keep = ~np.isnan(t1) & (t1 - t0 > tol)
+    edge_index = np.nonzero(keep)[0]
+    t0, t1 = t0[keep], t1[keep]
+    seg_a = a[edge_index] + t0[:, None] * d[edge_index]
+    seg_b = a[edge_index] + t1[:, None] * d[edge_index]
+    seg_owner = owners[edge_index]
+    mid = 0.5 * (seg_a + seg_b)
+
+    # 线段中点到各条边所在直线的有向距离(左侧为正)
+    length = np.linalg.norm(d, axis=1)
+    normal_dist = ((d[None, :, 0] * (mid[:, None, 1] - a[None, :, 1])
+                    - d[None, :, 1] * (mid[:, None, 0] - a[None, :, 0])) / length[None, :])
+
+    n_poly = int(owners.max()) + 1
+    onehot = owners[None, :] == np.arange(n_poly)[:, None]           # (M, E)
+    outside = (normal_dist < -eps)[:, None, :] & onehot[None, :, :]
+    inside_or_on = ~np.any(outside, axis=-1)                         # (S, M)
+    on_line = (np.abs(normal_dist) <= eps)
+
+    # 中点落在其他多边形边界上时, 判断边的方向
+    seg_dir = d[edge_index]
+    parallel = np.einsum('sk,ek->se', seg_dir, d) / (length[edge_index][:, None] * length[None, :])
+    same_dir = on_line & (parallel > 0)
+    opposite = on_line & (parallel < 0)
+    on_boundary = np.any(on_line[:, None, :] & onehot[None, :, :], axis=-1)
+    same_on = np.any(same_dir[:, None, :] & onehot[None, :, :], axis=-1)
+    opposite_on = np.any(opposite[:, None, :] & onehot[None, :, :], axis=-1)
+
+    other = np.arange(n_poly)[None, :] != seg_owner[:, None]
+    earlier = np.arange(n_poly)[None, :] < seg_owner[:, None]
+    strictly_inside = inside_or_on & ~on_boundary & other
+    duplicated = inside_or_on & same_on & earlier
+    shared = inside_or_on & opposite_on & other
+    drop = np.any(strictly_inside | duplicated | shared, axis=1)
+
+    segments = np.stack([seg_a, seg_b], axis=1)[~drop]
+    return segments, seg_owner[~drop]
+
+
+def segments_to_rings(segments, tol=1e-9):
+    """
+    把首尾相接的有向线段串接为闭合环
+
+    Returns:
+        环列表, 每个环形状 (K, 2)
+    """
+    if len(segments) == 0:
+        return []
+    scale = max(1.0, float(np.max(np.abs(segments))))
+    keys = np.round(segments / (tol * scale * 100)).astype(np.int64)
+    outgoing = {}
+    for index, key in enumerate(map(tuple, keys[:, 0])):
+        outgoing.setdefault(key, []).append(index)
+
+    used = np.zeros(len(segments), dtype=bool)
+    rings = []
+    for first in range(len(segments)):
+        if used[first]:
+            continue
+        ring = []
+        current = first
+        while current is not None and not used[current]:
+            used[current] = True
+            ring.append(segments[current, 0])
+            candidates = [i for i in outgoing.get(tuple(keys[current, 1]), []) if not used[i]]
+            current = candidates[0] if candidates else None
+        if len(ring) >= 3:
+            rings.append(np.array(ring))
+    return rings
+
+
+def union_area(polygons, tol=1e-9):
+    """
+    多个凸多边形并集的精确面积(格林公式沿并集边界积分, 孔洞自动扣除)
+    """
+    segments, _ = union_segments(polygons, tol)
+    if len(segments) == 0:
+        return 0.0
+    p, q = segments[:, 0], segments[:, 1]
+    return 0.5 * float(np.sum(p[:, 0] * q[:, 1] - q[:, 0] * p[:, 1]))
+
+
+def scene_silhouette(objects, kx, ky, tol=1e-9):
+    """
+    多物体场景的投影轮廓与阴影面积
+
+    每个物体视为凸体, 先批量求出所有角度、所有物体的凸包, 再逐个角度求并集。
+
+    Args:
+        objects: 物体顶点, 形状 (M, N, 3)
+        kx, ky: 投影系数, 标量或一维数组(多个角度)
+
+    Returns:
+        (rings, areas): 每个角度的轮廓环列表与面积数组
+    """
+    kx = np.atleast_1d(np.asarray(kx, dtype=float))
+    ky = np.atleast_1d(np.asarray(ky, dtype=float))
+    hulls, _, _ = silhouette(objects, kx, ky)
+    rings, areas = [], []
+    for per_angle in hulls.reshape((-1,) + hulls.shape[-3:]):
+        segments, _ = union_segments(list(per_angle), tol)
+        rings.append(segments_to_rings(segments, tol))
+        areas.append(0.5 * float(np.sum(segments[:, 0, 0] * segments[:, 1, 1]
+                                        - segments[:, 1, 0] * segments[:, 0, 1])) if len(segments) else 0.0)
+    return rings, np.array(areas).reshape(np.broadcast(kx, ky).shape)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+弹簧模式的实时动画视图
+
+左侧为三维螺旋线及其在xy平面上的斜投影, 右侧为投影面内的投影图形; 弹簧由
+spring_dynamics 的动力学仿真驱动, 按实际经过的时间以固定步长积分。
+
+绘制采用 blitting: 坐标轴、投影面等静态部分只在建立视图或改变视角时完整绘制一次,
+并保存为背景; 之后每帧只恢复背景、更新曲线数据并重绘这几条曲线,
+不再像 update_plot 那样清空整个图形重建。
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from projection_core import SIGN_ADD, angle_coefficients
+from spring_dynamics import SpringProjectionStream, SpringSystem
+
+SPRING_TURNS = 10
+SPRING_SAMPLES_PER_TURN = 2000  # 共约两万个采样点
+SPRING_DIAMETER = 8.0
+SPRING_REST_LENGTH = 12.0
+SPRING_AMPLITUDE = 0.35  # 初始压缩量占自由长度的比例
+SPRING_STIFFNESS = 20.0
+SPRING_MASS = 1.0
+SIMULATION_DT = 1 / 240  # 积分步长(秒)
+MAX_STEPS_PER_FRAME = 24  # 界面卡顿时每帧最多追赶的步数, 避免越积越多
+MAX_ANGLE = 60  # 角度滑块的最大值, 用于确定固定的坐标范围
+
+
+class SpringAnimationView:
+    """弹簧动画视图: 静态背景只绘制一次, 每帧只更新曲线并局部重绘"""
+
+    def __init__(self, fig, canvas, angle=30.0, elev=20, azim=45,
+                 samples_per_turn=SPRING_SAMPLES_PER_TURN, dtype=None):
+        """
+        Args:
+            fig: matplotlib 图形
+            canvas: 图形所在的画布(支持 copy_from_bbox/restore_region/blit)
+            angle: 斜投影角度(度), 投影公式与实验程序一致: x' = x + tan(θ)·z
+            elev, azim: 三维视角
+            samples_per_turn: 每圈采样点数
+            dtype: 计算精度
+        """
+        self.fig = fig
+        self.canvas = canvas
+        self.system = SpringSystem(1, stiffness=SPRING_STIFFNESS, mass=SPRING_MASS,
+                                   rest_length=SPRING_REST_LENGTH, diameter=SPRING_DIAMETER,
+                                   turns=SPRING_TURNS, samples_per_turn=samples_per_turn,
+                                   initial_length=SPRING_REST_LENGTH * (1 - SPRING_AMPLITUDE), dtype=dtype)
+        kx, ky = angle_coefficients(angle)
+        self.stream = SpringProjectionStream(self.system, kx, ky, capacity=2, sign=SIGN_ADD)
+        self.angle = angle
+        self.background = None
+        self.frame_count = 0
+        self.fps = 0.0
+        self._accumulator = 0.0
+        self._last_tick = None
+        self._zeros = np.zeros(self.system.samples, dtype=self.system.dtype)
+        self._build(elev, azim)
+
+    def _build(self, elev, azim):
+        """建立坐标轴和静态元素, 曲线设为 animated, 不参与普通重绘"""
+        self.fig.clear()
+        self.ax3d = self.fig.add_subplot(121, projection='3d')
+        self.ax2d = self.fig.add_subplot(122)
+        radius = SPRING_DIAMETER / 2
+        top = SPRING_REST_LENGTH * (1 + SPRING_AMPLITUDE) + 1
+        reach = radius + top * angle_coefficients(MAX_ANGLE)[0]
+
+        ax = self.ax3d
+        xx, yy = np.meshgrid([-radius - 1, reach + 1], [-radius - 1, radius + 1])
+        ax.plot_surface(xx, yy, np.zeros_like(xx), alpha=0.2, color='lightgray')
+        ax.plot([0, 0], [0, 0], [0, top], color='gray', linewidth=1, linestyle='--')
+        ax.set_xlim([-radius - 1, reach + 1])
+        ax.set_ylim([-radius - 1, radius + 1])
+        ax.set_zlim([0, top])
+        ax.set_xlabel('X (cm)', fontsize=10)
+        ax.set_ylabel('Y (cm)', fontsize=10)
+        ax.set_zlabel('Z (cm)', fontsize=10)
+        ax.set_box_aspect([reach + radius + 2, 2 * radius + 2, top])
+        ax.view_init(elev=elev, azim=azim)
+        ax.set_title("弹簧与斜投影", fontsize=14, fontweight='bold')
+
+        ax = self.ax2d
+        ax.set_xlim([-radius - 1, reach + 1])
+        ax.set_ylim([-radius - 1, radius + 1])
+        ax.set_aspect('equal')
+        ax.grid(True, alpha=0.3)
+        ax.set_xlabel("x'")
+        ax.set_ylabel("y'")
+        ax.set_title("投影面内的斜投影", fontsize=14, fontweight='bold')
+
+        self.helix_line, = self.ax3d.plot([], [], [], color='blue', linewidth=1, animated=True)
+        self.shadow_line, = self.ax3d.plot([], [], [], color='green', linewidth=1, alpha=0.7, animated=True)
+        self.projection_line, = self.ax2d.plot([], [], color='green', linewidth=1, animated=True)
+        self.artists = (self.helix_line, self.shadow_line, self.projection_line)
+
+        self.stream.capture()
+        self._update_lines()
+        self._draw_cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.draw()
+
+    def _on_draw(self, event):
+        """完整重绘(建立视图、改变视角或窗口大小)后重新保存背景"""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            artist.axes.draw_artist(artist)
+
+    def _update_lines(self):
+        """用最新一帧的几何和投影更新曲线数据"""
+        helix = self.stream.geometry[0]
+        projected = self.stream.frames.latest()[0]
+        self.helix_line.set_data_3d(helix[:, 0], helix[:, 1], helix[:, 2])
+        self.shadow_line.set_data_3d(projected[:, 0], projected[:, 1], self._zeros)
+        self.projection_line.set_data(projected[:, 0], projected[:, 1])
+
+    def set_angle(self, angle):
+        """改变斜投影角度: 只影响曲线, 下一帧生效"""
+        self.angle = angle
+        self.stream.kx, self.stream.ky = angle_coefficients(angle)
+
+    def set_view(self, elev, azim):
+        """改变三维视角: 背景随之改变, 需要一次完整重绘"""
+        if (elev, azim) != (self.ax3d.elev, self.ax3d.azim):
+            self.ax3d.view_init(elev=elev, azim=azim)
+            self.canvas.draw_idle()
+
+    def advance(self, now=None):
+        """
+        按实际经过的时间推进仿真
+
+        Args:
+            now: 当前时间(秒), 默认取 time.perf_counter()
+
+        Returns:
+            本次积分的步数
+        """
+        now = time.perf_counter() if now is None else now
+        if self._last_tick is not None:
+            elapsed = now - self._last_tick
+            self._accumulator += elapsed
+            if elapsed > 0:
+                self.fps = 0.9 * self.fps + 0.1 / elapsed if self.fps else 1 / elapsed
+        self._last_tick = now
+        steps = min(int(self._accumulator / SIMULATION_DT), MAX_STEPS_PER_FRAME)
+        self._accumulator = min(self._accumulator - steps * SIMULATION_DT, SIMULATION_DT)
+        if steps:
+            self.stream.run(steps, SIMULATION_DT, frame_every=steps)
+        return steps
+
+    def render(self):
+        """恢复背景, 只重绘曲线并局部刷新"""
+        if self.background is None:
+            return
+        self._update_lines()
+        self.canvas.restore_region(self.background)
+        for artist in self.artists:
+            artist.axes.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+        self.frame_count += 1
+
+    def tick(self, now=None):
+        """推进仿真并绘制一帧"""
+        self.advance(now)
+        self.render()
+
+    def status_text(self):
+        """当前状态的测量数据文本"""
+        system = self.system
+        length = float(system.length[0])
+        extension = length - float(system.rest_length[0])
+        data = "=" * 35 + "\n"
+        data += "弹簧动力学\n"
+        data += "=" * 35 + "\n"
+        data += f"中径: {SPRING_DIAMETER:.2f} cm, 圈数: {SPRING_TURNS}\n"
+        data += f"采样点数: {system.samples}\n"
+        data += f"自由长度: {SPRING_REST_LENGTH:.2f} cm\n"
+        data += f"当前长度: {length:.2f} cm\n"
+        data += f"变形量: {extension:+.2f} cm\n"
+        data += f"弹力: {-float(system.stiffness[0]) * extension:+.2f} N\n"
+        data += f"机械能: {float(system.energy()[0]):.3f} J\n"
+        data += f"仿真时间: {system.time:.2f} s\n\n"
+        data += "=" * 35 + "\n"
+        data += f"斜投影 (角度: {self.angle:.1f}°)\n"
+        data += "=" * 35 + "\n"
+        data += f"轴线投影偏移: {self.stream.kx * length:.2f} cm\n"
+        data += f"帧率: {self.fps:.0f} FPS\n"
+        return data
+
+    def close(self):
+        """停止响应重绘事件"""
+        self.canvas.mpl_disconnect(self._draw_cid)
+        self.background = None
+
+
+def main(argv=None):
+    """不创建窗口, 用 Agg 画布测量每帧的耗时"""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    frames = 600
+    fig = Figure(figsize=(10, 8), dpi=100)
+    view = SpringAnimationView(fig, FigureCanvasAgg(fig))
+    now = 0.0
+    start = time.perf_counter()
+    for _ in range(frames):
+        now += 1 / 60
+        view.tick(now)
+    elapsed = time.perf_counter() - start
+    print(f"采样点数 {view.system.samples}, {frames} 帧用时 {elapsed:.2f} s, "
+          f"平均每帧 {elapsed / frames * 1000:.1f} ms (上限 {1000 / 60:.1f} ms)")
+    return 0 if elapsed / frames < 1 / 60 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投影图的矢量导出(SVG / PDF), 不经过matplotlib
+
+- 直接由投影后的二维顶点和棱边列表生成, 按比例输出, 适合打印
+- 实线、虚线两种线型, 可选顶点标注和面填充
+- 流式写出: 线段按块格式化后立即写入文件, 大规模图形不会整体保存在内存中
+
+比例 scale 表示每个模型单位对应的毫米数, 例如模型单位为cm时 scale=10 即 1:1 输出。
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from profiling import profiled
+from silhouette import CUBOID_DASHED_EDGES, CUBOID_EDGES
+
+MM_TO_PT = 72 / 25.4  # 毫米 → PDF点
+
+# 默认样式
+LINE_COLOR = (0, 0, 255)
+HIDDEN_COLOR = (255, 0, 0)
+FILL_COLOR = (173, 216, 230)
+DASH_PATTERN = (3.0, 2.0)  # 虚线: 实线段长度, 间隔长度(毫米)
+LINE_WIDTH = 0.5  # 线宽(毫米)
+LABEL_SIZE = 3.0  # 标注字号(毫米)
+
+# 每次格式化写出的线段数
+CHUNK_SIZE = 4096
+
+
+def drawing_bounds(points):
+    """二维点集的范围 (xmin, ymin, xmax, ymax), 忽略NaN"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    points = points[np.isfinite(points).all(axis=1)]
+    if len(points) == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    return float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])
+
+
+def _chunks(segments):
+    """把单个数组或数组的可迭代对象统一为 (S, 2, 2) 块的迭代"""
+    if isinstance(segments, np.ndarray) or (isinstance(segments, (list, tuple)) and len(segments)
+                                            and np.ndim(segments[0]) == 2):
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+        for start in range(0, len(segments), CHUNK_SIZE):
+            yield segments[start:start + CHUNK_SIZE]
+    else:
+        for block in segments:
+            yield from _chunks(np.asarray(block, dtype=np.float64))
+
+
+def _finite(segments):
+    return segments[np.isfinite(segments).all(axis=(1, 2))]
+
+
+class _VectorWriter(ABC):
+    """SVG/PDF写出器的公共部分: 页面尺寸与坐标变换; 绘图和收尾由子类实现"""
+
+    def __init__(self, file, bounds, scale=10.0, margin=10.0):
+        """
+        Args:
+            file: 文件路径或以二进制方式打开的文件对象
+            bounds: 图形范围 (xmin, ymin, xmax, ymax), 模型单位
+            scale: 每个模型单位对应的毫米数
+            margin: 页边距(毫米)
+        """
+        self._own_file = isinstance(file, (str, os.PathLike))
+        self.file = open(file, "wb") if self._own_file else file
+        xmin, ymin, xmax, ymax = bounds
+        self.scale = float(scale)
+        self.margin = float(margin)
+        self.origin = (float(xmin), float(ymin))
+        self.width = (xmax - xmin) * self.scale + 2 * self.margin
+        self.height = (ymax - ymin) * self.scale + 2 * self.margin
+
+    def to_page(self, points):
+        """模型坐标 → 页面坐标(毫米, 原点在左下角)"""
+        points = np.asarray(points, dtype=np.float64)
+        page = np.empty(points.shape, dtype=np.float64)
+        page[..., 0] = (points[..., 0] - self.origin[0]) * self.scale + self.margin
+        page[..., 1] = (points[..., 1] - self.origin[1]) * self.scale + self.margin
+        return page
+
+    def write(self, text):
+        self.file.write(text.encode("utf-8") if isinstance(text, str) else text)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.finish()
+        if self._own_file:
+            self.file.close()
+
+    @abstractmethod
+    def segments(self, segments, color=LINE_COLOR, width=LINE_WIDTH, dash=None):
+        """写出一组线段 (S, 2, 2) 或线段块的可迭代对象"""
+
+    @abstractmethod
+    def polygons(self, polygons, color=FILL_COLOR, opacity=0.35):
+        """写出一组填充多边形"""
+
+    @abstractmethod
+    def labels(self, points, labels, size=LABEL_SIZE, color=(0, 0, 0)):
+        """在各点处写出文字标注"""
+
+    @abstractmethod
+    def finish(self):
+        """写出文件结尾(由 close 调用)"""
+
+
+class SvgWriter(_VectorWriter):
+    """流式SVG写出器, 页面单位为毫米"""
+
+    def __init__(self, file, bounds, scale=10.0, margin=10.0):
+        super().__init__(file, bounds, scale, margin)
+        self.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width:.3f}mm" '
+                   f'height="{self.height:.3f}mm" viewBox="0 0 {self.width:.3f} {self.height:.3f}">\n')
+        self._finished = False
+
+    def _svg_points(self, points):
+        """页面坐标的y轴翻转为SVG坐标(原点在左上角)"""
+        page = self.to_page(points)
+        page[..., 1] = self.height - page[..., 1]
+        return page
+
+    @staticmethod
+    def _color(color):
+        return "rgb({},{},{})".format(*color)
+
+    def segments(self, segments, color=LINE_COLOR, width=LINE_WIDTH, dash=None):
+        """
+        写出一组线段, 每块线段合并为一个 <path> 元素
+
+        Args:
+            segments: 线段 (S, 2, 2), 或这种数组的可迭代对象(流式输入)
+            color: RGB颜色
+            width: 线宽(毫米)
+            dash: 虚线样式 (实线段长度, 间隔长度), None为实线
+        """
+        style = f'fill="none" stroke="{self._color(color)}" stroke-width="{width:g}"'
+        if dash is not None:
+            style += ' stroke-dasharray="{:g} {:g}"'.format(*dash)
+        for block in _chunks(segments):
+            block = _finite(block)
+            if len(block) == 0:
+                continue
+            coords = self._svg_points(block).ravel()
+            path = ("M%.3f %.3fL%.3f %.3f" * len(block)) % tuple(coords)
+            self.write(f'<path {style} d="{path}"/>\n')
+
+    def polygons(self, polygons, color=FILL_COLOR, opacity=0.35):
+        """写出填充多边形 (P, K, 2)"""
+        polygons = np.asarray(polygons, dtype=np.float64)
+        polygons = polygons[np.isfinite(polygons).all(axis=(1, 2))]
+        if len(polygons) == 0:
+            return
+        coords = self._svg_points(polygons)
+        k = polygons.shape[1]
+        fmt = "M%.3f %.3f" + "L%.3f %.3f" * (k - 1) + "Z"
+        path = (fmt * len(polygons)) % tuple(coords.ravel())
+        self.write(f'<path fill="{self._color(color)}" fill-opacity="{opacity:g}" stroke="none" d="{path}"/>\n')
+
+    def labels(self, points, labels, size=LABEL_SIZE, color=(0, 0, 0)):
+        """在点旁写出文字标注"""
+        coords = self._svg_points(points)
+        self.write(f'<g font-family="sans-serif" font-size="{size:g}" fill="{self._color(color)}">\n')
+        for (x, y), label in zip(coords, labels):
+            if np.isfinite(x) and np.isfinite(y):
+                text = str(label).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                self.write(f'<text x="{x + size * 0.3:.3f}" y="{y - size * 0.3:.3f}">{text}</text>\n')
+        self.write("</g>\n")
+
+    def finish(self):
+        if not self._finished:
+            self.write("</svg>\n")
+            self._finished = True
+
+
+class PdfWriter(_VectorWriter):
+    """
+    流式单页PDF写出器
+
+    页面内容流直接写入文件, 流长度写在内容之后的间接对象中,
+    因此不需要先在内存中生成整个内容流。标注只支持ASCII文字(内置Helvetica字体)。
+    """
+
+    def __init__(self, file, bounds, scale=10.0, margin=10.0):
+        super().__init__(file, bounds, scale, margin)
+        self._offsets = {}
+        self._position = 0
+        self._finished = False
+        width_pt = self.width * MM_TO_PT
+        height_pt = self.height * MM_TO_PT
+
+        self._raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(2, "<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
+        self._object(3, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.3f} {height_pt:.3f}] "
+                        "/Resources << /Font << /F1 6 0 R >> >> /Contents 4 0 R >>")
+        self._object(6, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+        # 内容流: 长度由对象5给出
+        self._offsets[4] = self._position
+        self._raw(b"4 0 obj\n<< /Length 5 0 R >>\nstream\n")
+        self._stream_start = self._position
+        # 以毫米为用户单位
+        self.write(f"{MM_TO_PT:.6f} 0 0 {MM_TO_PT:.6f} 0 0 cm\n1 J 1 j\n")
+
+    def _raw(self, data):
+        self.file.write(data)
+        self._position += len(data)
+
+    def write(self, text):
+        self._raw(text.encode("latin-1") if isinstance(text, str) else text)
+
+    def _object(self, number, body):
+        self._offsets[number] = self._position
+        self._raw(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+
+    @staticmethod
+    def _color(color):
+        return "{:.4f} {:.4f} {:.4f}".format(*(c / 255 for c in color))
+
+    def segments(self, segments, color=LINE_COLOR, width=LINE_WIDTH, dash=None):
+        """写出一组线段, 参数同 SvgWriter.segments"""
+        dash_op = "[{:g} {:g}] 0 d".format(*dash) if dash is not None else "[] 0 d"
+        self.write(f"{self._color(color)} RG {width:g} w {dash_op}\n")
+        for block in _chunks(segments):
+            block = _finite(block)
+            if len(block) == 0:
+                continue
+            coords = self.to_page(block).ravel()
+            self.write(("%.3f %.3f m %.3f %.3f l\n" * len(block)) % tuple(coords) + "S\n")
+
+    def polygons(self, polygons, color=FILL_COLOR, opacity=0.35):
+        """写出填充多边形 (P, K, 2); PDF 1.4 的基本内容流不含透明度, 颜色按白底预先混合"""
+        polygons = np.asarray(polygons, dtype=np.float64)
+        polygons = polygons[np.isfinite(polygons).all(axis=(1, 2))]
+        if len(polygons) == 0:
+            return
+        blended = tuple(255 - (255 - c) * opacity for c in color)
+        k = polygons.shape[1]
+        fmt = "%.3f %.3f m " + "%.3f %.3f l " * (k - 1) + "h\n"
+        coords = self.to_page(polygons).ravel()
+        self.write(f"{self._color(blended)} rg\n" + (fmt * len(polygons)) % tuple(coords) + "f\n")
+
+    def labels(self, points, labels, size=LABEL_SIZE, color=(0, 0, 0)):
+        """在点旁写出文字标注(ASCII)"""
+        coords = self.to_page(points)
+        self.write(f"{self._color(color)} rg\n")
+        for (x, y), label in zip(coords, labels):
+            if np.isfinite(x) and np.isfinite(y):
+                text = str(label).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+                self.write(f"BT /F1 {size:g} Tf {x + size * 0.3:.3f} {y + size * 0.3:.3f} Td ({text}) Tj ET\n")
+
+    def finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        length = self._position - self._stream_start
+        self._raw(b"\nendstream\nendobj\n")
+        self._object(5, str(length))
+
+        xref_position = self._position
+        count = max(self._offsets) + 1
+        entries = ["0000000000 65535 f \n"] + [f"{self._offsets[i]:010d} 00000 n \n" for i in range(1, count)]
+        self._raw(f"xref\n0 {count}\n{''.join(entries)}".encode("latin-1"))
+        self._raw(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n".encode("latin-1"))
+
+
+def open_writer(path, bounds, scale=10.0, margin=10.0, fmt=None):
+    """
+    按格式(或文件扩展名)创建写出器
+
+    Args:
+        fmt: 'svg' 或 'pdf', None时按扩展名判断
+    """
+    if fmt is None:
+        fmt = os.path.splitext(str(path))[1].lstrip(".").lower()
+    if fmt == "svg":
+        return SvgWriter(path, bounds, scale, margin)
+    if fmt == "pdf":
+        return PdfWriter(path, bounds, scale, margin)
+    raise ValueError(f"不支持的导出格式: {fmt}")
+
+
+@profiled
+def export_projection(path, vertices_2d, edges=CUBOID_EDGES, dashed=CUBOID_DASHED_EDGES, faces=None,
+                      labels=True, scale=10.0, margin=10.0, fmt=None,
+                      line_color=LINE_COLOR, hidden_color=HIDDEN_COLOR, fill_color=FILL_COLOR,
+                      line_width=LINE_WIDTH, dash=DASH_PATTERN):
+    """
+    把投影图导出为SVG或PDF
+
+    Args:
+        path: 输出文件路径或二进制文件对象(此时需给出fmt)
+        vertices_2d: 投影后的二维顶点 (N, 2)
+        edges: 棱边的顶点索引 (E, 2)
+        dashed: 每条棱边是否画虚线 (E,)
+        faces: 需要填充的面的顶点索引 (F, K), None表示不填充
+        labels: True时标注 V0, V1, ...; 也可以给出标注列表; False不标注
+        scale: 每个模型单位对应的毫米数
+        margin: 页边距(毫米)
+        fmt: 'svg' 或 'pdf'
+    """
+    vertices_2d = np.asarray(vertices_2d, dtype=np.float64)
+    edges = np.asarray(edges)
+    dashed = np.zeros(len(edges), dtype=bool) if dashed is None else np.asarray(dashed, dtype=bool)
+    segments = vertices_2d[edges]
+
+    with open_writer(path, drawing_bounds(vertices_2d), scale, margin, fmt) as writer:
+        if faces is not None:
+            writer.polygons(vertices_2d[np.asarray(faces)], fill_color)
+        writer.segments(segments[~dashed], line_color, line_width)
+        writer.segments(segments[dashed], hidden_color, line_width, dash)
+        if labels is not False:
+            names = [f"V{i}" for i in range(len(vertices_2d))] if labels is True else labels
+            writer.labels(vertices_2d, names)
+
+
+@profiled
+def export_segments(path, segment_chunks, bounds, scale=10.0, margin=10.0, fmt=None,
+                    color=LINE_COLOR, line_width=LINE_WIDTH, dash=None):
+    """
+    流式导出大规模线段图
+
+    Args:
+        path: 输出文件路径
+        segment_chunks: 线段块 (S, 2, 2) 的可迭代对象(例如生成器), 逐块写出
+        bounds: 图形范围 (xmin, ymin, xmax, ymax); 流式输入无法预先计算范围, 需由调用方给出
+        其余参数同 export_projection
+    """
+    with open_writer(path, bounds, scale, margin, fmt) as writer:
+        writer.segments(segment_chunks, color, line_width, dash)